@@ -0,0 +1,81 @@
+"""
+Non-blocking console I/O for interactive asyncio loops.
+
+input() inside a coroutine blocks the whole event loop until the user hits
+Enter, so prefetches, cache warm-up and streamed output stall between turns.
+AsyncLineReader reads stdin on a daemon thread and hands lines to the loop
+through a queue; the loop keeps running while the user types.
+
+    reader = AsyncLineReader()
+    line = await reader.readline("You: ")      # EOFError at end of input
+    text = await print_stream(agent_chunks())  # prints chunks as they arrive
+"""
+
+import asyncio
+import sys
+import threading
+
+
+class AsyncLineReader:
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self._queue = None
+        self._loop = None
+        self._thread = None
+
+    def _start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._thread = threading.Thread(target=self._pump, name="stdin-reader", daemon=True)
+        self._thread.start()
+
+    def _pump(self):
+        # One blocking readline at a time on this thread; "" means end of input
+        while True:
+            try:
+                line = self.stream.readline()
+            except (OSError, ValueError):
+                line = ""
+            try:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, line)
+            except RuntimeError:  # loop closed
+                return
+            if not line:
+                return
+
+    async def readline(self, prompt: str = "") -> str:
+        """Next line without its newline. Raises EOFError at end of input."""
+        if self._thread is None:
+            self._start()
+        if prompt:
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
+        line = await self._queue.get()
+        if not line:
+            self._queue.put_nowait("")  # keep reporting EOF to later callers
+            raise EOFError
+        return line.rstrip("\r\n")
+
+
+async def print_stream(chunks, out=None) -> str:
+    """Writes each chunk of an async iterator as soon as it arrives; returns the full text."""
+    out = out or sys.stdout
+    parts = []
+    async for chunk in chunks:
+        if chunk:
+            out.write(chunk)
+            out.flush()
+            parts.append(chunk)
+    out.write("\n")
+    out.flush()
+    return "".join(parts)
+
+
+async def agent_chunks(agent, message: str):
+    """Streams agent.astream() when the agent supports it, otherwise yields arun()'s answer."""
+    if hasattr(agent, "astream"):
+        async for chunk in agent.astream(message):
+            yield chunk
+    else:
+        yield await agent.arun(message)
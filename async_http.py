@@ -0,0 +1,183 @@
+"""
+Minimal asyncio HTTP/1.1 plumbing for local JSON services.
+
+Only what the vacation server (and local test servers) need: request-line +
+header parsing, Content-Length bodies, keep-alive, JSON responses and
+streamed (chunked) responses. No third-party web framework required.
+
+    async def handler(request):
+        return 200, {"path": request.path}
+
+    server = await start_http_server(handler, "127.0.0.1", 8080)
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class HTTPError(Exception):
+    """Raise from a handler to answer with a JSON error body."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HTTPRequest:
+
+    def __init__(self, method, target, headers, body):
+        self.method = method
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Body must be valid JSON.")
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+class StreamingResponse:
+    """Return from a handler to stream an async iterator of str/bytes chunks."""
+
+    def __init__(self, chunks, status: int = 200, content_type: str = "text/plain; charset=utf-8"):
+        self.chunks = chunks
+        self.status = status
+        self.content_type = content_type
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """Parses one request; returns None when the client closed the connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Headers too large.")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.")
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+        if length < 0:
+            raise ValueError(length)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Body too large.")
+    body = await reader.readexactly(length) if length else b""
+
+    return HTTPRequest(method.upper(), target, headers, body)
+
+
+def _head(status, content_type, extra, keep_alive):
+    lines = [
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Unknown')}",
+        f"Content-Type: {content_type}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{k}: {v}" for k, v in extra.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def write_json(writer, status: int, payload, keep_alive: bool = True):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(_head(status, "application/json", {"Content-Length": len(body)}, keep_alive) + body)
+    await writer.drain()
+
+
+async def write_stream(writer, response: StreamingResponse, keep_alive: bool = True):
+    """Chunked transfer encoding: each chunk is flushed as soon as it is produced."""
+    writer.write(_head(response.status, response.content_type, {"Transfer-Encoding": "chunked"}, keep_alive))
+    await writer.drain()
+    async for chunk in response.chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if chunk:
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def start_http_server(handler, host: str = "127.0.0.1", port: int = 8080):
+    """
+    handler(request) -> (status, json_payload) | StreamingResponse, may raise HTTPError.
+    Connections are kept alive until the client closes them.
+    """
+
+    async def on_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await write_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                try:
+                    result = await handler(request)
+                except HTTPError as e:
+                    result = (e.status, {"error": e.message})
+                except Exception as e:
+                    result = (500, {"error": f"{type(e).__name__}: {e}"})
+
+                if isinstance(result, StreamingResponse):
+                    await write_stream(writer, result, request.keep_alive)
+                else:
+                    status, payload = result
+                    await write_json(writer, status, payload, request.keep_alive)
+
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: loop shutdown with keep-alive clients still connected
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    return await asyncio.start_server(on_connection, host, port, limit=MAX_HEADER_BYTES)
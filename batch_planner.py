@@ -0,0 +1,195 @@
+"""
+Bulk trip planning from a JSONL file.
+
+    python batch_planner.py queries.jsonl -o plans.jsonl --concurrency 4
+    python batch_planner.py queries.jsonl -o plans.jsonl --resume   # skip ids already done
+    python batch_planner.py queries.jsonl -o plans.jsonl --resume --retry-errors   # also rerun failures
+
+Input: one query per line, either {"id": "...", "query": "..."} or a bare
+JSON string (its line number becomes the id). A line that cannot be parsed
+becomes an error result under its line number instead of stopping the run.
+Output: one line per finished query, written as soon as it finishes:
+{"id", "query", "answer" | "error", "latency_s"}.
+
+All queries share one model, tool registry, executor and tool cache; each
+gets its own fresh memory. At most --concurrency queries run at once. With
+--resume, every id already in the output file is skipped, failed ones
+included, so an interrupted run picks up where it stopped; add
+--retry-errors to rerun the failed ids. When an id appears more than once
+the last line wins, and the file is compacted to one line per id at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from metrics import percentile
+from trip_prefetcher import TripPrefetcher
+from vacation_planner_agent import build_shared_components, build_vacation_agent
+from windowed_memory import WindowedMemory
+
+
+class BadInputLine(ValueError):
+    """Stands in for the query of an input line that could not be parsed."""
+
+
+def read_queries(path: str):
+    """
+    Yields (id, query) pairs; blank lines are skipped. A malformed line yields
+    (line number, BadInputLine) so one bad line does not end the batch.
+    """
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                if isinstance(item, str):
+                    yield str(lineno), item
+                elif isinstance(item, dict) and isinstance(item.get("query"), str):
+                    yield str(item.get("id", lineno)), item["query"]
+                else:
+                    raise ValueError('expected a string or {"id", "query"} object')
+            except ValueError as e:
+                yield str(lineno), BadInputLine(f"line {lineno}: {e}")
+
+
+def latest_results(path: str) -> dict:
+    """{id: row} from an output file, last line per id winning (a torn last line is ignored)."""
+    rows = {}
+    if not os.path.exists(path):
+        return rows
+    with open(path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                query_id = str(row["id"])
+            except (ValueError, TypeError, KeyError):
+                continue
+            rows[query_id] = row
+    return rows
+
+
+def completed_ids(path: str, include_errors: bool = False) -> set:
+    """Ids already written to an output file, judged by each id's latest line."""
+    return {
+        query_id for query_id, row in latest_results(path).items()
+        if include_errors or "error" not in row
+    }
+
+
+def compact_results(path: str) -> int:
+    """Rewrites an output file with one line per id (the latest). Returns the number of lines kept."""
+    rows = latest_results(path)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        for row in rows.values():
+            f.write(json.dumps(row) + "\n")
+    os.replace(tmp, path)
+    return len(rows)
+
+
+class BatchPlanner:
+
+    def __init__(self, shared=None, concurrency: int = 4, timeout: float = 300.0, prefetch: bool = True):
+        self.shared = shared or build_shared_components()
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.prefetcher = TripPrefetcher(self.shared.executor) if prefetch else None
+        self.latencies = []
+        self.errors = 0
+
+    async def plan_one(self, query_id: str, query: str) -> dict:
+        if isinstance(query, BadInputLine):
+            return {"id": query_id, "query": None, "error": f"bad input {query}", "latency_s": 0.0}
+        agent = build_vacation_agent(memory=WindowedMemory(), shared=self.shared)
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch(query)
+        start = time.perf_counter()
+        row = {"id": query_id, "query": query}
+        try:
+            row["answer"] = await asyncio.wait_for(agent.arun(query), self.timeout)
+        except asyncio.TimeoutError:
+            row["error"] = f"timed out after {self.timeout}s"
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        row["latency_s"] = round(time.perf_counter() - start, 3)
+        return row
+
+    async def run(self, queries, out, on_result=None):
+        """
+        Runs (id, query) pairs with bounded concurrency, writing each result
+        line to `out` as soon as it is ready. Returns the number of queries run.
+        """
+        queries = iter(queries)
+        count = 0
+
+        async def worker():
+            nonlocal count
+            for query_id, query in queries:  # workers share one iterator: no task per query
+                row = await self.plan_one(query_id, query)
+                out.write(json.dumps(row) + "\n")
+                out.flush()
+                count += 1
+                self.latencies.append(row["latency_s"])
+                if "error" in row:
+                    self.errors += 1
+                if on_result is not None:
+                    on_result(row)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return count
+
+    def report(self, count: int, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "queries": count,
+            "errors": self.errors,
+            "wall_s": round(elapsed, 2),
+            "throughput_qps": round(count / elapsed, 3) if elapsed > 0 else None,
+            "latency_p50_s": percentile(latencies, 50),
+            "latency_p95_s": percentile(latencies, 95),
+            "latency_max_s": latencies[-1] if latencies else None,
+        }
+
+
+# =========================
+#   MAIN ENTRY
+# =========================
+
+async def main():
+    parser = argparse.ArgumentParser(description="Plan trips for every query in a JSONL file")
+    parser.add_argument("input", help="JSONL of {\"id\", \"query\"} objects or strings")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results, appended as queries finish")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per query")
+    parser.add_argument("--resume", action="store_true", help="skip ids already in the output file")
+    parser.add_argument("--retry-errors", action="store_true", help="with --resume, rerun ids that failed")
+    parser.add_argument("--no-prefetch", action="store_true")
+    args = parser.parse_args()
+
+    done = completed_ids(args.output, include_errors=not args.retry_errors) if args.resume else set()
+    pending = ((qid, q) for qid, q in read_queries(args.input) if qid not in done)
+    if done:
+        print(f"Resuming: {len(done)} queries already in {args.output}", file=sys.stderr)
+
+    batch = BatchPlanner(concurrency=args.concurrency, timeout=args.timeout, prefetch=not args.no_prefetch)
+
+    def progress(row):
+        status = "ERROR " + row["error"] if "error" in row else "ok"
+        print(f"[{row['id']}] {row['latency_s']:.1f}s {status}", file=sys.stderr)
+
+    start = time.perf_counter()
+    with open(args.output, "a" if args.resume else "w") as out:
+        count = await batch.run(pending, out, on_result=progress)
+    if args.resume:
+        compact_results(args.output)
+    print(json.dumps(batch.report(count, time.perf_counter() - start), indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,360 @@
+"""
+Continuous batching for the local HuggingFace model.
+
+HuggingFaceAdapter generates one request at a time, so concurrent sessions
+queue behind each other and a multi-core CPU decodes a single sequence per
+forward pass. BatchingLLM runs one scheduler thread that owns the model:
+
+  * new requests are prefilled on their own (starting from a cached prefix
+    when a PrefixKVStore is given) and then join the running batch;
+  * every decode step runs one forward pass for all active requests - one
+    new token each, left-padded KV caches, per-row positions and masks;
+  * each request stops on its own (EOS or max_new_tokens) and leaves the
+    batch immediately, freeing its row for the next waiting request.
+
+Matrix-vector work in decode turns into matrix-matrix work, so aggregate
+tokens/s rises with the batch while per-request latency grows only a little.
+
+    llm = BatchingLLM(model_pool.get(MODEL_NAME), max_batch=8, prefix_store=PrefixKVStore())
+    VACATION_MODEL_MAX_BATCH=8 python vacation_server.py --max-concurrent-llm 8
+
+Metrics: batch_scheduler.batch_size (per decode step), .queue_wait_s,
+.prefill_s, .tokens, .cancelled and the batch_scheduler.active gauge.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from fairlib.core.message import Message
+
+from metrics import metrics
+from prefix_cache import encode_chat, is_hf_model
+
+
+def generation_params(llm, overrides: dict) -> dict:
+    """The adapter's default_gen_kwargs with call overrides (max_tokens -> max_new_tokens)."""
+    gen = {**getattr(llm, "default_gen_kwargs", {}), **overrides}
+    if "max_tokens" in gen:
+        gen["max_new_tokens"] = gen.pop("max_tokens")
+    gen.setdefault("max_new_tokens", 512)
+    return gen
+
+
+def _layer_tensors(cache) -> list:
+    """[(keys, values)] per layer, for any DynamicCache layout."""
+    if hasattr(cache, "layers"):          # transformers >= 4.56
+        return [(layer.keys, layer.values) for layer in cache.layers]
+    if hasattr(cache, "key_cache"):
+        return list(zip(cache.key_cache, cache.value_cache))
+    return list(cache)                    # legacy tuple of (k, v)
+
+
+def _make_cache(layers):
+    from transformers import DynamicCache
+
+    cache = DynamicCache()
+    for i, (k, v) in enumerate(layers):
+        cache.update(k, v, i)
+    return cache
+
+
+class _Request:
+
+    def __init__(self, ids: list, params: dict, streaming: bool):
+        self.ids = ids
+        self.params = params
+        self.generated = []
+        self.text = ""
+        self.pos = 0                 # tokens of this request held in the KV cache
+        self.next_token = None       # sampled but not yet fed to the model
+        self.future = Future()
+        self.chunks = queue.Queue() if streaming else None
+        self.submitted = time.perf_counter()
+        self.cancelled = False
+
+    def cancel(self):
+        """Caller gave up (timeout, disconnect): dropped from the queue or the batch."""
+        self.cancelled = True
+        self.future.cancel()   # only succeeds while still queued
+
+    def push(self, text: str):
+        if self.chunks is not None and text:
+            self.chunks.put(text)
+
+    def finish(self, error: Exception = None):
+        if not self.future.done():
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(self.text)
+        if self.chunks is not None:
+            self.chunks.put(None)
+
+
+class BatchingLLM:
+    """
+    HuggingFaceAdapter interface (invoke / ainvoke / stream -> assistant
+    Message / text chunks) over a continuous-batching scheduler thread.
+    Everything else is forwarded to the adapter.
+    """
+
+    async_streaming = False  # stream() below feeds llm_streaming from a thread
+
+    def __init__(self, llm, max_batch: int = 8, max_wait_ms: float = 5.0, prefix_store=None):
+        if not is_hf_model(llm):
+            raise TypeError("BatchingLLM needs a HuggingFace model with a tokenizer")
+        self._llm = llm
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.prefix_store = prefix_store
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        eos = getattr(getattr(llm.model, "generation_config", None), "eos_token_id", None)
+        eos = eos if isinstance(eos, (list, tuple)) else [eos]
+        self._eos = {t for t in [*eos, llm.tokenizer.eos_token_id] if t is not None}
+
+    # ---------- requests ----------
+
+    def submit(self, messages, streaming: bool = False, **kwargs) -> _Request:
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("BatchingLLM is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+                self._thread.start()
+        request = _Request(encode_chat(self._llm.tokenizer, messages), generation_params(self._llm, kwargs), streaming)
+        self._queue.put(request)
+        return request
+
+    def invoke(self, messages, **kwargs) -> Message:
+        return Message(role="assistant", content=self.submit(messages, **kwargs).future.result())
+
+    async def ainvoke(self, messages, **kwargs) -> Message:
+        request = self.submit(messages, **kwargs)
+        try:
+            text = await asyncio.wrap_future(request.future)
+        except asyncio.CancelledError:
+            request.cancel()
+            raise
+        return Message(role="assistant", content=text)
+
+    def stream(self, messages, **kwargs):
+        """Yields text chunks as the scheduler produces them."""
+        request = self.submit(messages, streaming=True, **kwargs)
+        try:
+            while (chunk := request.chunks.get()) is not None:
+                yield chunk
+        finally:
+            if not request.future.done():   # consumer closed the generator early
+                request.cancel()
+        request.future.result()   # re-raises a generation error
+
+    def close(self):
+        """Stops the scheduler thread (it holds the model); pending requests fail."""
+        with self._start_lock:
+            self._closed = True
+            running = self._thread is not None
+        if running:
+            self._queue.put(None)
+            self._thread.join()
+
+    # ---------- scheduler ----------
+
+    def _admit(self, active: list) -> list:
+        """Waiting requests that fit in the batch; blocks only when nothing is running."""
+        new = []
+        try:
+            if not active:
+                new.append(self._queue.get())
+                deadline = time.perf_counter() + self.max_wait   # let a burst arrive together
+            else:
+                deadline = 0
+            while len(active) + len(new) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                new.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return new
+
+    def _run(self):
+        import torch
+
+        active, layers, mask = [], None, None
+        while True:
+            admitted = self._admit(active)
+            if None in admitted:   # close()
+                closed = RuntimeError("BatchingLLM is closed")
+                for request in active + [r for r in admitted if r is not None]:
+                    request.finish(closed)
+                while not self._queue.empty():
+                    if (request := self._queue.get_nowait()) is not None:
+                        request.finish(closed)
+                return
+            for request in admitted:
+                # A running future can no longer be cancelled, so finish() cannot race the caller
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                metrics.observe("batch_scheduler.queue_wait_s", time.perf_counter() - request.submitted)
+                try:
+                    with torch.inference_mode():
+                        cache, logits = self._prefill(request)
+                    if self._emit(request, self._sample(logits, request.params)):
+                        self._store(request, _layer_tensors(cache))
+                        continue
+                    layers, mask = self._join(layers, mask, _layer_tensors(cache))
+                except Exception as e:
+                    request.finish(e)
+                    continue
+                active.append(request)
+
+            cancelled = [i for i, request in enumerate(active) if request.cancelled]
+            if cancelled:
+                metrics.incr("batch_scheduler.cancelled", len(cancelled))
+                for i in cancelled:
+                    active[i].finish()
+                layers, mask, active = self._drop(active, layers, mask, cancelled)
+            metrics.gauge("batch_scheduler.active", len(active))
+            if not active:
+                continue
+            try:
+                with torch.inference_mode():
+                    layers, mask, done = self._decode_step(active, layers, mask)
+            except Exception as e:
+                for request in active:
+                    request.finish(e)
+                active, layers, mask = [], None, None
+                continue
+            if done:
+                layers, mask, active = self._drop(active, layers, mask, done)
+
+    def _prefill(self, request: _Request):
+        import torch
+
+        start = time.perf_counter()
+        reused, cache = 0, None
+        if self.prefix_store is not None:
+            reused, cache = self.prefix_store.lookup(tuple(request.ids[:-1]))
+            if cache is not None:
+                cache.crop(reused)
+        if cache is None:
+            cache = _make_cache([])
+        model = self._llm.model
+        out = model(
+            input_ids=torch.tensor([request.ids[reused:]], device=model.device),
+            position_ids=torch.arange(reused, len(request.ids), device=model.device).unsqueeze(0),
+            past_key_values=cache,
+            use_cache=True,
+        )
+        request.pos = len(request.ids)
+        metrics.observe("batch_scheduler.prefill_s", time.perf_counter() - start)
+        return out.past_key_values, out.logits[0, -1, :]
+
+    def _decode_step(self, active: list, layers: list, mask):
+        """One forward pass, one token for every active request."""
+        import torch
+
+        model = self._llm.model
+        mask = torch.cat([mask, mask.new_ones((len(active), 1))], dim=1)
+        out = model(
+            input_ids=torch.tensor([[r.next_token] for r in active], device=model.device),
+            position_ids=torch.tensor([[r.pos] for r in active], device=model.device),
+            attention_mask=mask,
+            past_key_values=_make_cache(layers),
+            use_cache=True,
+        )
+        metrics.observe("batch_scheduler.batch_size", len(active))
+        metrics.incr("batch_scheduler.tokens", len(active))
+        logits = out.logits[:, -1, :]
+        done = []
+        for i, request in enumerate(active):
+            request.pos += 1
+            if self._emit(request, self._sample(logits[i], request.params)):
+                done.append(i)
+        return _layer_tensors(out.past_key_values), mask, done
+
+    @staticmethod
+    def _sample(logits, params: dict) -> int:
+        import torch
+
+        temperature = params.get("temperature") or 0
+        if not params.get("do_sample", False) or temperature <= 0:
+            return int(torch.argmax(logits))
+        probs = torch.softmax(logits.float() / temperature, dim=-1)
+        top_p = params.get("top_p", 1.0)
+        if top_p < 1.0:
+            sorted_probs, order = torch.sort(probs, descending=True)
+            sorted_probs = sorted_probs * (torch.cumsum(sorted_probs, 0) - sorted_probs < top_p)
+            return int(order[torch.multinomial(sorted_probs / sorted_probs.sum(), 1)])
+        return int(torch.multinomial(probs, 1))
+
+    def _emit(self, request: _Request, token: int) -> bool:
+        """Records a sampled token and streams its text; True when the request is done."""
+        finished = token in self._eos
+        if not finished:
+            request.generated.append(token)
+            request.next_token = token
+            finished = len(request.generated) >= request.params["max_new_tokens"]
+        text = self._llm.tokenizer.decode(request.generated, skip_special_tokens=True)
+        if finished or not text.endswith("\ufffd"):   # else wait for the rest of a multi-byte character
+            request.push(text[len(request.text):])
+            request.text = text
+        if finished:
+            request.finish()
+        return finished
+
+    # ---------- batch KV layout ----------
+
+    @staticmethod
+    def _join(layers, mask, new_layers):
+        """Adds one request's cache as a new row; the shorter side is left-padded."""
+        import torch
+        import torch.nn.functional as F
+
+        length = new_layers[0][0].shape[2]
+        new_mask = torch.ones((1, length), dtype=torch.long, device=new_layers[0][0].device)
+        if layers is None:
+            return new_layers, new_mask
+        current = layers[0][0].shape[2]
+        target = max(current, length)
+
+        def pad(t, n):
+            return F.pad(t, (0, 0, n, 0)) if n else t   # left-pad the sequence dim
+
+        joined = [
+            (torch.cat([pad(k, target - current), pad(nk, target - length)]),
+             torch.cat([pad(v, target - current), pad(nv, target - length)]))
+            for (k, v), (nk, nv) in zip(layers, new_layers)
+        ]
+        mask = torch.cat([F.pad(mask, (target - current, 0)), F.pad(new_mask, (target - length, 0))])
+        return joined, mask
+
+    def _drop(self, active, layers, mask, done):
+        """Removes finished rows and any leading columns that are now padding everywhere."""
+        import torch
+
+        for i in done:
+            start = int(mask[i].nonzero()[0])
+            self._store(active[i], [(k[i:i + 1, :, start:].clone(), v[i:i + 1, :, start:].clone()) for k, v in layers])
+        keep = [i for i in range(len(active)) if i not in set(done)]
+        active = [active[i] for i in keep]
+        if not active:
+            return None, None, []
+        index = torch.tensor(keep, device=mask.device)
+        mask = mask.index_select(0, index)
+        first = int(mask.sum(0).nonzero()[0])
+        layers = [(k.index_select(0, index)[:, :, first:], v.index_select(0, index)[:, :, first:]) for k, v in layers]
+        return layers, mask[:, first:], active
+
+    def _store(self, request: _Request, layers):
+        if self.prefix_store is not None:
+            ids = (request.ids + request.generated)[:request.pos]
+            self.prefix_store.put(tuple(ids), _make_cache(layers))
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
@@ -1,13 +1,22 @@
 import json
+import math
 from fairlib.core.interfaces.tools import AbstractTool
 
+from travel_matrix import TravelMatrix
+
 class BudgetTool(AbstractTool):
 
     name = "trip_budget"
     description = (
         "Calculates trip cost. Inputs: travelers, days, flight_cost, hotel_per_night, "
-        "food_per_day, activities_total, misc, tax_multiplier. Returns detailed breakdown."
+        "food_per_day, activities_total, misc, tax_multiplier. Returns detailed breakdown. "
+        "If flight_cost is omitted, pass 'origin' and 'destination' (IATA code or city) "
+        "and a round-trip fare is estimated offline."
     )
+    cache_ttl = math.inf
+
+    def __init__(self, travel_matrix: TravelMatrix = None):
+        self.travel = travel_matrix or TravelMatrix.load_airports()
 
     def use(self, tool_input: str) -> str:
         try:
@@ -25,6 +34,13 @@ class BudgetTool(AbstractTool):
         misc = data.get("misc", 0)
         tax_multiplier = data.get("tax_multiplier", 1.0)
 
+        # Estimate the per-traveler round-trip fare from the travel matrix
+        flight_estimate = None
+        if "flight_cost" not in data and data.get("origin") and data.get("destination"):
+            flight_estimate = self.travel.lookup(data["origin"], data["destination"])
+            if flight_estimate:
+                flight_cost = flight_estimate["round_trip_cost_usd"]
+
         # Compute categories
         hotel_total = hotel_per_night * days
         food_total = food_per_day * days * travelers
@@ -53,5 +69,7 @@ class BudgetTool(AbstractTool):
             "per_person_cost": per_person,
             "total_group_cost": total_cost
         }
+        if flight_estimate:
+            result["flight_estimate"] = flight_estimate
 
         return json.dumps(result, indent=2)
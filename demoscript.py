@@ -1,9 +1,11 @@
-from fairlib import SimpleAgent, ReActPlanner, ToolExecutor, ToolRegistry, HuggingFaceAdapter
+from fairlib import SimpleAgent, ReActPlanner, ToolExecutor, ToolRegistry
 from destination_matcher_tool import DestinationMatcherTool
 from structured_output_formatter_tool import StructuredOutputFormatterTool
+from model_pool import model_pool
 
-# 1. Load the small model (TinyLlama)
-llm = HuggingFaceAdapter(model_name="TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+# 1. Load the small model (TinyLlama) — shared with any other agent in this process.
+#    lazy() returns at once; weights load and warm up in the background until the first call.
+llm = model_pool.lazy("TinyLlama/TinyLlama-1.1B-Chat-v1.0")
 
 # 2. Register tools
 tool_registry = ToolRegistry()
@@ -0,0 +1,114 @@
+"""
+Recall-vs-latency benchmark: ANN destination backend vs the exact scorer.
+
+Builds a synthetic catalog (sparse random activity profiles, US-wide
+coordinates), indexes it with FAISS and, for a sweep of search settings,
+reports recall@k against exact scoring plus p50/p99 query latency.
+
+    python destination_ann_benchmark.py --size 1000000 --queries 500 --k 10
+    python destination_ann_benchmark.py --catalog data/destination_catalog
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from destination_ann_index import DestinationANNIndex
+from destination_catalog import (
+    ACTIVITY_KEYWORDS,
+    FEATURES,
+    DestinationCatalog,
+    build_catalog_arrays,
+)
+
+
+def build_synthetic_catalog(size: int, out_dir: str, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    dims = len(FEATURES)
+
+    # 2-5 active features per destination, like the hand-labelled seed data
+    features = np.zeros((size, dims), dtype=np.float32)
+    active = rng.random((size, dims)) < (rng.integers(2, 6, size=(size, 1)) / dims)
+    features[active] = rng.uniform(0.3, 1.0, size=int(active.sum())).astype(np.float32)
+
+    coords = np.column_stack([
+        rng.uniform(24.5, 49.0, size),
+        rng.uniform(-124.5, -67.0, size),
+    ]).astype(np.float32)
+    cost_index = rng.uniform(0.7, 2.0, size).astype(np.float32)
+
+    names = [f"poi-{i}" for i in range(size)]
+    states = [""] * size
+    return build_catalog_arrays(features, coords, cost_index, names, states, out_dir)
+
+
+def _queries(catalog, count, seed=1):
+    rng = np.random.default_rng(seed)
+    words = list(ACTIVITY_KEYWORDS)
+    states = catalog.travel.origins
+    return [
+        (list(rng.choice(words, size=rng.integers(1, 4), replace=False)),
+         states[rng.integers(len(states))])
+        for _ in range(count)
+    ]
+
+
+def _run(catalog, queries, k, index=None):
+    results, timings = [], []
+    for activities, state in queries:
+        start = time.perf_counter()
+        matches = catalog.match(activities, state, k=k, index=index)
+        timings.append(time.perf_counter() - start)
+        results.append({m["destination"] for m in matches})
+    return results, np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", help="existing catalog directory (default: build a synthetic one)")
+    parser.add_argument("--size", type=int, default=200_000, help="synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--kind", choices=["hnsw", "ivf"], default="hnsw")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.catalog
+        if path is None:
+            path = os.path.join(tmp, "catalog")
+            start = time.perf_counter()
+            build_synthetic_catalog(args.size, path)
+            print(f"built synthetic catalog ({args.size:,} rows) in {time.perf_counter() - start:.1f}s")
+
+        catalog = DestinationCatalog(path)
+        queries = _queries(catalog, args.queries)
+
+        start = time.perf_counter()
+        index = DestinationANNIndex.build(catalog, kind=args.kind)
+        print(f"built {args.kind} index in {time.perf_counter() - start:.1f}s")
+
+        exact, exact_ms = _run(catalog, queries, args.k)
+        print(f"\n{'backend':<26}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+        print(f"{'exact':<26}{1.0:>10.3f}{np.percentile(exact_ms, 50):>10.3f}{np.percentile(exact_ms, 99):>10.3f}")
+
+        sweep = [32, 64, 128, 256, 512] if args.kind == "hnsw" else [1, 4, 16, 64]
+        for oversample in (2, 10):
+            index.oversample = oversample
+            for setting in sweep:
+                if args.kind == "hnsw":
+                    index.ef_search = setting
+                    label = f"hnsw ef={setting} os={oversample}"
+                else:
+                    index.nprobe = setting
+                    label = f"ivf nprobe={setting} os={oversample}"
+
+                approx, ann_ms = _run(catalog, queries, args.k, index)
+                recall = np.mean([len(a & e) / max(1, len(e)) for a, e in zip(approx, exact)])
+                print(f"{label:<26}{recall:>10.3f}{np.percentile(ann_ms, 50):>10.3f}{np.percentile(ann_ms, 99):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
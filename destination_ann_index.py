@@ -0,0 +1,231 @@
+"""
+Approximate-nearest-neighbor backend for destination matching.
+
+Exact scoring in destination_catalog.py touches every row; that is fine for
+thousands of destinations but not for global POI-level catalogs with
+millions. This index retrieves the best `k * oversample` rows with FAISS
+and hands them back to the catalog, which re-scores just those candidates
+exactly.
+
+Each indexed vector is the destination's unit feature vector augmented with
+its cost-index penalty and its position on the unit sphere, so a single
+inner product with [prefs, 1, origin_xyz] reproduces the similarity and
+cost-index terms exactly and approximates the travel-cost term (closer
+destinations have a larger dot product with the origin). The exact
+re-score then fixes the ordering.
+
+    index = DestinationANNIndex.build(catalog, kind="hnsw")
+    index.save(catalog.path)                       # -> <catalog>/ann.faiss
+    index = DestinationANNIndex.load_or_build(catalog)
+    catalog.match(["beaches"], "CO", k=5, index=index)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from travel_matrix import save_json, temp_path
+
+try:
+    import faiss
+except ImportError:  # optional: only needed for the "ann" backend
+    faiss = None
+
+
+INDEX_FILE = "ann.faiss"
+INDEX_META_FILE = "ann.json"
+
+
+# Linearize the travel-cost slope around this distance (km) when folding it
+# into the inner product; the exact re-score corrects the rest.
+_TYPICAL_TRIP_KM = 1500.0
+_EARTH_RADIUS_KM = 6371.0
+_FARE_PER_KM = 0.23     # slope of trip_cost in travel_matrix.travel_metrics
+
+
+def _unit_xyz(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _geo_weight(catalog):
+    """Coefficient on cos(angle) that matches the catalog's travel-cost slope."""
+    per_rad = catalog.travel_weight / catalog.cost_scale * _FARE_PER_KM * _EARTH_RADIUS_KM
+    return float(per_rad / np.sin(_TYPICAL_TRIP_KM / _EARTH_RADIUS_KM))
+
+
+def _index_vectors(catalog, rows, geo_weight):
+    """Augmented vectors for `rows` (a slice or an array of row ids)."""
+    features = np.asarray(catalog.features[rows], dtype=np.float32)
+    penalty = -catalog.cost_weight * (np.asarray(catalog.cost_index[rows]) - 1.0)
+    coords = np.asarray(catalog.coords[rows], dtype=np.float64)
+    xyz = geo_weight * _unit_xyz(coords[:, 0], coords[:, 1])
+    return np.ascontiguousarray(
+        np.column_stack([features, penalty, xyz]), dtype=np.float32
+    )
+
+
+def _require_faiss():
+    if faiss is None:
+        raise ImportError("The ANN destination backend needs FAISS: pip install faiss-cpu")
+
+
+class DestinationANNIndex:
+    """
+    FAISS index over a DestinationCatalog's feature matrix.
+
+    kind="hnsw"  graph index, no training, best recall/latency at this dimensionality
+    kind="ivf"   inverted lists, cheaper to build for very large catalogs
+                 (nlist is capped so every list gets enough training points)
+    """
+
+    def __init__(self, index, kind: str, count: int, oversample: int = 10, geo_weight: float = 0.0,
+                 cost_weight: float = None, catalog_version: int = None):
+        self.index = index
+        self.kind = kind
+        self.count = count
+        self.oversample = oversample
+        self.geo_weight = geo_weight
+        self.cost_weight = cost_weight
+        self.catalog_version = catalog_version
+
+    # ---------- build / persist ----------
+
+    @classmethod
+    def build(cls, catalog, kind="hnsw", m=32, ef_construction=80, ef_search=128,
+              nlist=None, nprobe=16, oversample=10, chunk_size=100_000):
+        _require_faiss()
+        n = len(catalog)
+        dim = catalog.features.shape[1] + 4
+        geo_weight = _geo_weight(catalog)
+
+        if kind == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = ef_construction
+            index.hnsw.efSearch = ef_search
+        elif kind == "ivf":
+            # k-means wants ~39+ training points per list; small catalogs get fewer lists
+            nlist = nlist or max(1, min(int(4 * np.sqrt(n)), n // 39))
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            rng = np.random.default_rng(0)
+            sample = rng.choice(n, size=min(n, nlist * 64), replace=False)
+            index.train(_index_vectors(catalog, np.sort(sample), geo_weight))
+            index.nprobe = nprobe
+        else:
+            raise ValueError(f"Unknown ANN index kind '{kind}' (expected 'hnsw' or 'ivf').")
+
+        # Add in chunks so a memory-mapped catalog never has to be fully resident
+        for start in range(0, n, chunk_size):
+            index.add(_index_vectors(catalog, slice(start, start + chunk_size), geo_weight))
+
+        return cls(index, kind, n, oversample, geo_weight, catalog.cost_weight, catalog.meta.get("version", 1))
+
+    def save(self, directory: str):
+        _require_faiss()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, INDEX_FILE)
+        tmp = temp_path(path)
+        faiss.write_index(self.index, tmp)
+        os.replace(tmp, path)
+        save_json(os.path.join(directory, INDEX_META_FILE), {
+            "kind": self.kind,
+            "count": self.count,
+            "oversample": self.oversample,
+            "geo_weight": self.geo_weight,
+            "cost_weight": self.cost_weight,
+            "catalog_version": self.catalog_version,
+            "ef_search": self.ef_search,
+            "nprobe": self.nprobe,
+        })
+
+    @classmethod
+    def load(cls, directory: str):
+        _require_faiss()
+        with open(os.path.join(directory, INDEX_META_FILE)) as f:
+            meta = json.load(f)
+
+        index = faiss.read_index(os.path.join(directory, INDEX_FILE))
+        loaded = cls(index, meta["kind"], meta["count"], meta.get("oversample", 10),
+                     meta.get("geo_weight", 0.0), meta.get("cost_weight"), meta.get("catalog_version"))
+        if meta.get("ef_search"):
+            loaded.ef_search = meta["ef_search"]
+        if meta.get("nprobe"):
+            loaded.nprobe = meta["nprobe"]
+        return loaded
+
+    @classmethod
+    def load_or_build(cls, catalog, **build_kwargs):
+        """Loads <catalog>/ann.faiss, rebuilding it if missing or stale."""
+        if os.path.exists(os.path.join(catalog.path, INDEX_META_FILE)):
+            index = cls.load(catalog.path)
+            if index.matches(catalog):
+                return index
+
+        index = cls.build(catalog, **build_kwargs)
+        index.save(catalog.path)
+        return index
+
+    def matches(self, catalog) -> bool:
+        """False when the vectors were built for another catalog or other scoring weights."""
+        return (
+            self.count == len(catalog)
+            and self.catalog_version == catalog.meta.get("version", 1)
+            and self.cost_weight == catalog.cost_weight
+            and np.isclose(self.geo_weight, _geo_weight(catalog))
+        )
+
+    # ---------- search knobs ----------
+
+    @property
+    def ef_search(self):
+        return self.index.hnsw.efSearch if self.kind == "hnsw" else None
+
+    @ef_search.setter
+    def ef_search(self, value):
+        if self.kind == "hnsw":
+            self.index.hnsw.efSearch = int(value)
+
+    @property
+    def nprobe(self):
+        return self.index.nprobe if self.kind == "ivf" else None
+
+    @nprobe.setter
+    def nprobe(self, value):
+        if self.kind == "ivf":
+            self.index.nprobe = int(value)
+
+    # ---------- search ----------
+
+    def candidates(self, prefs: np.ndarray, k: int, origin_coords=None, allowed=None) -> np.ndarray:
+        """
+        Row ids of the best `k * oversample` destinations; origin_coords is (lat, lon).
+        allowed: optional boolean mask over rows (e.g. not in the home state). The
+        search widens until k allowed rows are found; if even a full-width search
+        can't find them (IVF probes only some lists) every allowed row is returned.
+        """
+        want = min(self.count, max(k, k * self.oversample))
+
+        origin = np.zeros(3)
+        if origin_coords is not None:
+            origin = _unit_xyz(*origin_coords)
+
+        query = np.ascontiguousarray(
+            np.concatenate([prefs, [1.0], origin]).reshape(1, -1), dtype=np.float32
+        )
+        while True:
+            _, ids = self.index.search(query, want)
+            ids = ids[0]
+            ids = ids[ids >= 0]
+            if allowed is not None:
+                ids = ids[allowed[ids]]
+            if len(ids) >= k or want >= self.count:
+                break
+            want = min(self.count, want * 4)
+
+        if len(ids) < k:   # nothing left to widen: the exact re-score sees every allowed row
+            rows = np.arange(self.count) if allowed is None else np.flatnonzero(allowed)
+            if len(rows) > len(ids):
+                return rows
+        return ids
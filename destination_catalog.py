@@ -0,0 +1,365 @@
+"""
+Destination catalog + vectorized matching engine.
+
+A catalog is a directory of .npy arrays plus a small meta.json:
+
+    meta.json          feature vocabulary, destination names and states
+    features.npy       (N, F) float32, rows L2-normalized
+    coords.npy         (N, 2) float32 lat/lon
+    cost_index.npy     (N,)   float32 relative on-the-ground cost (1.0 = avg)
+    travel/            origin × destination TravelMatrix (see travel_matrix.py)
+
+Arrays are opened with np.load(..., mmap_mode="r") so loading a catalog with
+thousands (or millions) of rows is instant and pages are shared between
+processes. Build a catalog from a JSONL file with one destination per line:
+
+    python destination_catalog.py build data/destinations.jsonl data/destination_catalog
+    python destination_catalog.py bench data/destination_catalog
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from travel_matrix import (
+    TravelMatrix,
+    build_travel_matrix,
+    default_origins,
+    home_state,
+    save_json,
+    save_npy,
+)
+
+# =========================
+#   VOCABULARY
+# =========================
+
+FEATURES = [
+    "beach",
+    "nightlife",
+    "food",
+    "budget",
+    "museums",
+    "history",
+    "hiking",
+    "nature",
+    "skiing",
+    "theme_parks",
+    "family",
+    "shopping",
+    "water_sports",
+    "music",
+]
+
+# Free-text activity keywords → feature weights
+ACTIVITY_KEYWORDS = {
+    "beach": {"beach": 1.0},
+    "beaches": {"beach": 1.0},
+    "ocean": {"beach": 0.8, "water_sports": 0.4},
+    "sun": {"beach": 0.6},
+    "surf": {"water_sports": 1.0, "beach": 0.5},
+    "surfing": {"water_sports": 1.0, "beach": 0.5},
+    "snorkel": {"water_sports": 1.0},
+    "snorkeling": {"water_sports": 1.0},
+    "diving": {"water_sports": 1.0},
+    "boating": {"water_sports": 0.8},
+    "kayaking": {"water_sports": 0.8, "nature": 0.4},
+    "nightlife": {"nightlife": 1.0},
+    "party": {"nightlife": 1.0},
+    "parties": {"nightlife": 1.0},
+    "bars": {"nightlife": 0.9},
+    "clubs": {"nightlife": 1.0, "music": 0.3},
+    "food": {"food": 1.0},
+    "restaurants": {"food": 1.0},
+    "dining": {"food": 1.0},
+    "foodie": {"food": 1.0},
+    "cheap": {"budget": 1.0},
+    "budget": {"budget": 1.0},
+    "affordable": {"budget": 1.0},
+    "museum": {"museums": 1.0},
+    "museums": {"museums": 1.0},
+    "art": {"museums": 0.8},
+    "history": {"history": 1.0},
+    "historic": {"history": 1.0},
+    "culture": {"history": 0.6, "museums": 0.6},
+    "hiking": {"hiking": 1.0, "nature": 0.5},
+    "hike": {"hiking": 1.0, "nature": 0.5},
+    "mountains": {"hiking": 0.7, "nature": 0.7},
+    "nature": {"nature": 1.0},
+    "parks": {"nature": 0.8, "hiking": 0.4},
+    "outdoors": {"nature": 0.8, "hiking": 0.6},
+    "camping": {"nature": 1.0, "hiking": 0.5},
+    "wildlife": {"nature": 1.0},
+    "ski": {"skiing": 1.0},
+    "skiing": {"skiing": 1.0},
+    "snowboarding": {"skiing": 1.0},
+    "snow": {"skiing": 0.8},
+    "theme": {"theme_parks": 1.0},
+    "rides": {"theme_parks": 1.0},
+    "disney": {"theme_parks": 1.0, "family": 0.6},
+    "family": {"family": 1.0},
+    "kids": {"family": 1.0},
+    "shopping": {"shopping": 1.0},
+    "music": {"music": 1.0},
+    "concerts": {"music": 1.0},
+    "fun": {"nightlife": 0.3, "theme_parks": 0.3},
+}
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "destinations.jsonl")
+DEFAULT_CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "destination_catalog")
+
+# Bump when the on-disk layout changes; older catalogs are rebuilt by load_default()
+CATALOG_VERSION = 2
+
+
+# =========================
+#   HELPERS
+# =========================
+
+def preference_vector(activities) -> np.ndarray:
+    """Turns a list (or comma string) of activities into a unit feature vector."""
+    if isinstance(activities, str):
+        activities = [activities]
+
+    vec = np.zeros(len(FEATURES), dtype=np.float32)
+    for activity in activities or []:
+        for word in re.findall(r"[a-z_]+", str(activity).lower()):
+            if word in FEATURES and word not in ACTIVITY_KEYWORDS:
+                vec[FEATURES.index(word)] += 1.0
+            for feature, weight in ACTIVITY_KEYWORDS.get(word, {}).items():
+                vec[FEATURES.index(feature)] += weight
+
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+# =========================
+#   BUILD
+# =========================
+
+def build_catalog(records, out_dir: str) -> str:
+    """
+    Writes a catalog directory from an iterable of destination dicts:
+    {"name", "state", "lat", "lon", "cost_index", "features": {feature: weight}}
+    """
+    records = list(records)
+    n = len(records)
+
+    features = np.zeros((n, len(FEATURES)), dtype=np.float32)
+    coords = np.zeros((n, 2), dtype=np.float32)
+    cost_index = np.ones(n, dtype=np.float32)
+    names, dest_states = [], []
+
+    for i, rec in enumerate(records):
+        for feature, weight in rec.get("features", {}).items():
+            if feature in FEATURES:
+                features[i, FEATURES.index(feature)] = float(weight)
+        coords[i] = (rec["lat"], rec["lon"])
+        cost_index[i] = rec.get("cost_index", 1.0)
+        names.append(rec["name"])
+        dest_states.append(rec.get("state", ""))
+
+    return build_catalog_arrays(features, coords, cost_index, names, dest_states, out_dir)
+
+
+def build_catalog_arrays(features, coords, cost_index, names, dest_states, out_dir: str) -> str:
+    """Array-level writer; also builds the catalog's travel matrix."""
+    n = len(names)
+
+    features = np.asarray(features, dtype=np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    features = features / np.where(norms > 0, norms, 1.0)
+    coords = np.asarray(coords, dtype=np.float32)
+
+    os.makedirs(out_dir, exist_ok=True)
+    save_npy(os.path.join(out_dir, "features.npy"), features)
+    save_npy(os.path.join(out_dir, "coords.npy"), coords)
+    save_npy(os.path.join(out_dir, "cost_index.npy"), np.asarray(cost_index, dtype=np.float32))
+
+    origin_keys, origin_coords = default_origins()
+    build_travel_matrix(origin_keys, origin_coords, list(names), coords, os.path.join(out_dir, "travel"))
+
+    meta = {
+        "version": CATALOG_VERSION,
+        "count": n,
+        "features": FEATURES,
+        "names": list(names),
+        "states": list(dest_states),
+    }
+    save_json(os.path.join(out_dir, "meta.json"), meta)   # last: marks the catalog complete
+
+    return out_dir
+
+
+def catalog_version(path: str):
+    """Version in <path>/meta.json (1 if unversioned), or None if there is no catalog."""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f).get("version", 1)
+    except (OSError, ValueError):
+        return None
+
+
+def build_catalog_from_jsonl(src_path: str, out_dir: str) -> str:
+    with open(src_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return build_catalog(records, out_dir)
+
+
+# =========================
+#   CATALOG
+# =========================
+
+class DestinationCatalog:
+    """
+    Memory-mapped destination catalog with vectorized scoring.
+
+    score = cosine(preferences, features)
+            - travel_weight * travel_cost / cost_scale
+            - cost_weight * (cost_index - 1)
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_DIR, travel_weight=0.25, cost_weight=0.1):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        if self.meta.get("version", 1) != CATALOG_VERSION:
+            raise ValueError(f"Catalog at {path} is version {self.meta.get('version', 1)}, "
+                             f"expected {CATALOG_VERSION}; rebuild it.")
+        if self.meta["features"] != FEATURES:
+            raise ValueError(f"Catalog at {path} was built with a different feature vocabulary.")
+
+        self.path = path
+        self.names = self.meta["names"]
+        self.states = self.meta["states"]
+        self._state_array = np.asarray(self.states)
+        self.travel_weight = travel_weight
+        self.cost_weight = cost_weight
+
+        self.features = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+        self.coords = np.load(os.path.join(path, "coords.npy"), mmap_mode="r")
+        self.cost_index = np.load(os.path.join(path, "cost_index.npy"), mmap_mode="r")
+        self.travel = TravelMatrix(os.path.join(path, "travel"))
+        self.cost_scale = self.travel.max_trip_cost
+
+    @classmethod
+    def load_default(cls, **kwargs) -> "DestinationCatalog":
+        """
+        Loads the bundled catalog, building it from data/destinations.jsonl on
+        first use or when the one on disk is from another catalog version.
+        """
+        if catalog_version(DEFAULT_CATALOG_DIR) != CATALOG_VERSION:
+            build_catalog_from_jsonl(DEFAULT_SOURCE, DEFAULT_CATALOG_DIR)
+        return cls(DEFAULT_CATALOG_DIR, **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def travel_costs(self, origin):
+        """(N,) round-trip cost row for an airport/state/city origin, or None if unknown."""
+        return self.travel.row(origin, "trip_cost")
+
+    def score(self, prefs: np.ndarray, starting_state=None, rows=None) -> np.ndarray:
+        """Scores every destination, or only `rows` (e.g. ANN candidates) when given."""
+        features = self.features if rows is None else self.features[rows]
+        cost_index = self.cost_index if rows is None else self.cost_index[rows]
+
+        scores = features @ prefs
+        scores -= self.cost_weight * (cost_index - 1.0)
+
+        costs = self.travel_costs(starting_state)
+        if costs is not None:
+            if rows is not None:
+                costs = costs[rows]
+            scores -= (self.travel_weight / self.cost_scale) * costs
+
+        return scores
+
+    def match(self, activities, starting_state=None, k=3, exclude_home_state=False, index=None):
+        """
+        Top-k destinations for a list of activities.
+        index: optional DestinationANNIndex; when given only its candidates are scored.
+        """
+        prefs = preference_vector(activities)
+        home = home_state(starting_state) if exclude_home_state else None
+
+        if index is not None:
+            allowed = self._state_array != home if home is not None else None
+            rows = index.candidates(prefs, k, self.travel.origin_coords(starting_state), allowed)
+        elif home is not None:
+            rows = np.flatnonzero(self._state_array != home)
+        else:
+            rows = None
+
+        scores = self.score(prefs, starting_state, rows)
+        best = top_k_indices(scores, k)
+        idx = best if rows is None else rows[best]
+        return self.describe(idx, scores[best], starting_state)
+
+    def describe(self, idx, scores, starting_state=None):
+        origin = self.travel.origin_index(starting_state)
+        results = []
+        for i, score in zip(idx, scores):
+            i = int(i)
+            entry = {
+                "destination": self.names[i],
+                "match": round(float(score), 3),
+                "cost_index": round(float(self.cost_index[i]), 2),
+            }
+            if origin is not None:
+                distance, hours, _, _, trip_cost = self.travel.matrix[:, origin, i]
+                entry["distance_km"] = int(round(float(distance)))
+                entry["flight_hours"] = round(float(hours), 1)
+                entry["est_travel_cost_usd"] = int(round(float(trip_cost)))
+            results.append(entry)
+        return results
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best-first, in O(N + k log k)."""
+    n = scores.shape[0]
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(n)
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+# =========================
+#   CLI
+# =========================
+
+def _bench(path: str, queries: int = 2000):
+    catalog = DestinationCatalog(path)
+    rng = np.random.default_rng(0)
+    words = list(ACTIVITY_KEYWORDS)
+    states = catalog.travel.origins
+
+    timings = []
+    for _ in range(queries):
+        activities = list(rng.choice(words, size=3, replace=False))
+        state = states[rng.integers(len(states))]
+        start = time.perf_counter()
+        catalog.match(activities, state, k=5)
+        timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings) * 1000
+    print(f"catalog: {len(catalog)} destinations, {queries} queries")
+    print(f"p50 {np.percentile(timings, 50):.3f} ms | p99 {np.percentile(timings, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == "build":
+        build_catalog_from_jsonl(sys.argv[2], sys.argv[3])
+        print(f"Built catalog at {sys.argv[3]}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "bench":
+        _bench(sys.argv[2] if len(sys.argv) > 2 else DestinationCatalog.load_default().path)
+    else:
+        print(__doc__)
@@ -1,31 +1,59 @@
 import json
+import math
 from fairlib.core.interfaces.tools import AbstractTool
 
+from destination_catalog import DestinationCatalog
+
 
 class DestinationMatcherTool(AbstractTool):
 
     name = "destination_matcher"
     description = (
         "Given a list of preferred activities and a starting state, "
-        "this tool picks 3 beach destinations that match the user's preferences. "
-        "Input must be a JSON string with 'activities' and 'starting_state'."
+        "ranks destinations from the destination catalog by how well they match "
+        "the user's preferences and how far they are from home. "
+        "Input must be a JSON string with 'activities' and 'starting_state' "
+        "(or an 'origin' airport code); optional 'top_k' (default 3)."
     )
+    cache_ttl = math.inf
+
+    def __init__(self, catalog: DestinationCatalog = None, catalog_path: str = None,
+                 backend: str = "exact", ann_index=None):
+        """
+        backend="exact"  score every destination (default, fine up to ~1e5 rows)
+        backend="ann"    FAISS candidates + exact re-score (see destination_ann_index.py)
+        """
+        if catalog is None:
+            catalog = DestinationCatalog(catalog_path) if catalog_path else DestinationCatalog.load_default()
+        self.catalog = catalog
+
+        if backend not in ("exact", "ann"):
+            raise ValueError(f"Unknown backend '{backend}' (expected 'exact' or 'ann').")
+        self.backend = backend
+
+        if backend == "ann" and ann_index is None:
+            from destination_ann_index import DestinationANNIndex
+            ann_index = DestinationANNIndex.load_or_build(catalog)
+        self.ann_index = ann_index
 
     def use(self, tool_input: str) -> str:
         try:
             data = json.loads(tool_input)
             activities = data.get("activities", [])
             starting_state = data.get("starting_state", "")
+            origin = data.get("origin") or starting_state
+            top_k = int(data.get("top_k", 3))
 
-            # fake simple logic — perfect for an MVP
-            beaches = [
-                {"destination": "Miami, Florida", "match": 0.92},
-                {"destination": "San Diego, California", "match": 0.87},
-                {"destination": "Myrtle Beach, South Carolina", "match": 0.81},
-            ]
+            matches = self.catalog.match(
+                activities,
+                origin,
+                k=top_k,
+                exclude_home_state=bool(data.get("exclude_home_state", False)),
+                index=self.ann_index if self.backend == "ann" else None,
+            )
 
             return json.dumps({
-                "recommended_destinations": beaches,
+                "recommended_destinations": matches,
                 "starting_state": starting_state,
                 "activities_considered": activities
             })
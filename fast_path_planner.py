@@ -0,0 +1,210 @@
+"""
+Deterministic fast path for "standard" trip requests.
+
+Most requests look like run_single(): destination, origin, days, travelers,
+budget, interests. For those the ReAct loop spends several LLM calls just to
+pick the same tools in the same order. FastPathPlanner instead:
+
+  1. parses the slots with regexes (parse_trip_request);
+  2. runs flight_search, hotel_search, restaurant_search, activity_search and
+     trip_budget concurrently through the shared executor (so the tool cache,
+     prefetches and per-group caps all apply);
+  3. makes one LLM call to write the itinerary from those results.
+
+If a required slot (destination, origin, days) is missing, or a lookup
+tool has no data for the destination or airports (executor.supports),
+arun() returns None and the caller falls back to the ReAct loop.
+
+    planner = FastPathPlanner(llm, executor)
+    answer = await planner.arun(message)   # None -> use agent.arun()
+"""
+
+import json
+import math
+import re
+import time
+
+from fairlib.core.message import Message
+
+from destination_catalog import ACTIVITY_KEYWORDS
+from llm_streaming import message_text
+from metrics import metrics
+from tracing import span
+from trip_prefetcher import extract_trip_entities
+
+# Rough per-unit costs used when the request doesn't say
+HOTEL_PER_ROOM_NIGHT = 150
+FOOD_PER_PERSON_DAY = 45
+ACTIVITIES_PER_PERSON_DAY = 30
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14,
+}
+_NUM = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+
+_DAYS = re.compile(_NUM + r"[\s-]*(day|days|night|nights)\b", re.I)
+_WEEKS = re.compile(r"\b(?:a|one|" + _NUM + r")[\s-]*weeks?\b", re.I)
+_TRAVELERS = re.compile(
+    _NUM + r"\s+(?:\w+\s+)?(?:people|persons|travelers|travellers|adults|friends|students|guests|of us)\b", re.I
+)
+_BUDGET = re.compile(r"budget\D{0,20}?\$?\s*([\d,]+(?:\.\d+)?)\s*(k\b)?", re.I)
+_DOLLARS = re.compile(r"\$\s*([\d,]+(?:\.\d+)?)\s*(k\b)?", re.I)
+_PER_PERSON = re.compile(r"per (?:person|traveler|head)|each\b", re.I)
+
+
+def _number(token) -> int:
+    token = token.lower()
+    return int(token) if token.isdigit() else NUMBER_WORDS.get(token, 0)
+
+
+def parse_trip_request(text: str):
+    """
+    Returns the slots of a standard trip request, or None if destination,
+    origin or trip length can't be found.
+    {"destination": {"city", "iata"}, "origin": {...}, "days", "travelers",
+     "budget_usd" (total, or None), "interests": [...]}
+    """
+    places = extract_trip_entities(text)
+    if places["origin"] is None or not places["destinations"]:
+        return None
+
+    days = None
+    if m := _DAYS.search(text):
+        days = _number(m.group(1))
+        if m.group(2).lower().startswith("night"):
+            days += 1
+    elif m := _WEEKS.search(text):
+        days = 7 * (_number(m.group(1)) if m.group(1) else 1)
+    if not days:
+        return None
+
+    travelers = 1
+    if m := _TRAVELERS.search(text):
+        travelers = _number(m.group(1)) or 1
+    elif re.search(r"\b(couple|honeymoon|my (wife|husband|partner))\b", text, re.I):
+        travelers = 2
+
+    budget = None
+    if m := _BUDGET.search(text) or _DOLLARS.search(text):
+        amount = float(m.group(1).replace(",", ""))
+        budget = amount * 1000 if m.group(2) else amount
+        if _PER_PERSON.search(text[m.end():m.end() + 24]):
+            budget *= travelers
+
+    words = re.findall(r"[a-z]+", text.lower())
+    interests = sorted({w for w in words if w in ACTIVITY_KEYWORDS} - {"budget"})  # "budget" is a slot here
+
+    return {
+        "destination": places["destinations"][0],
+        "origin": places["origin"],
+        "days": days,
+        "travelers": travelers,
+        "budget_usd": budget,
+        "interests": interests,
+    }
+
+
+def _results(observation: str, key: str, limit: int) -> list:
+    try:
+        items = json.loads(observation).get(key, [])
+    except (ValueError, AttributeError):
+        return []
+    return [i.get("name") for i in items if i.get("name") and i.get("name") != "Unnamed"][:limit]
+
+
+class FastPathPlanner:
+
+    SYSTEM_PROMPT = (
+        "You are a vacation planner. Using ONLY the facts provided, write a day-by-day "
+        "itinerary as a markdown table (Day | Activities | Food | Notes), then a short "
+        "cost summary that compares the estimate with the budget."
+    )
+
+    def __init__(self, llm, executor, timeout: float = None):
+        self.llm = llm
+        self.executor = executor
+        self.timeout = timeout
+
+    def tool_calls(self, slots: dict) -> list:
+        """The fixed DAG: five independent lookups, all run at once."""
+        city = slots["destination"]["city"]
+        days, travelers = slots["days"], slots["travelers"]
+        budget_input = {
+            "travelers": travelers,
+            "days": days,
+            "origin": slots["origin"]["iata"],
+            "destination": slots["destination"]["iata"],
+            "hotel_per_night": HOTEL_PER_ROOM_NIGHT * math.ceil(travelers / 2),
+            "food_per_day": FOOD_PER_PERSON_DAY,
+            "activities_total": ACTIVITIES_PER_PERSON_DAY * days * travelers,
+        }
+        return [
+            ("flight_search", json.dumps({"origin": slots["origin"]["iata"], "destination": slots["destination"]["iata"]})),
+            ("hotel_search", json.dumps({"city": city})),
+            ("restaurant_search", json.dumps({"city": city})),
+            ("activity_search", json.dumps({"city": city})),
+            ("trip_budget", json.dumps(budget_input)),
+        ]
+
+    def build_prompt(self, message: str, slots: dict, observations: dict) -> list:
+        try:
+            budget = json.loads(observations["trip_budget"])
+            estimate = {
+                "total_usd": round(budget["total_group_cost"]),
+                "per_person_usd": round(budget["per_person_cost"]),
+                "breakdown": {k: round(v) for k, v in budget["breakdown"].items() if isinstance(v, (int, float))},
+            }
+        except (ValueError, KeyError, TypeError):
+            estimate = None
+        try:
+            route = json.loads(observations["flight_search"]).get("route_estimate")
+        except (ValueError, AttributeError):
+            route = None
+
+        facts = {
+            "trip": {
+                "destination": slots["destination"]["city"].title(),
+                "origin_airport": slots["origin"]["iata"],
+                "days": slots["days"],
+                "travelers": slots["travelers"],
+                "budget_usd": slots["budget_usd"],
+                "interests": slots["interests"],
+            },
+            "flight": route,
+            "hotels": _results(observations["hotel_search"], "hotels", 5),
+            "restaurants": _results(observations["restaurant_search"], "restaurants", 8),
+            "activities": _results(observations["activity_search"], "activities", 8),
+            "cost_estimate": estimate,
+        }
+        return [
+            Message(role="system", content=self.SYSTEM_PROMPT),
+            Message(role="user", content=f"Request: {message}\n\nFacts:\n{json.dumps(facts, indent=1)}"),
+        ]
+
+    async def arun(self, message: str):
+        """Itinerary text, or None when the request doesn't fit the template."""
+        slots = parse_trip_request(message)
+        if slots is None:
+            metrics.incr("fast_path.fallbacks")
+            return None
+
+        calls = self.tool_calls(slots)
+        if not all(self.executor.supports(name, tool_input) for name, tool_input in calls):
+            metrics.incr("fast_path.unsupported")
+            metrics.incr("fast_path.fallbacks")
+            return None
+
+        start = time.perf_counter()
+        with span("fast_path.tools", "agent"):
+            results = await self.executor.aexecute_batch(calls, self.timeout, compact=False)  # parsed below, not prompted
+        observations = {name: result for (name, _), result in zip(calls, results)}
+        metrics.observe("fast_path.tools_s", time.perf_counter() - start)
+
+        prompt = self.build_prompt(message, slots, observations)
+        generate = getattr(self.llm, "ainvoke_answer", None) or self.llm.ainvoke
+        answer = message_text(await generate(prompt)).strip()
+
+        metrics.incr("fast_path.used")
+        metrics.observe("fast_path.total_s", time.perf_counter() - start)
+        return answer or None
@@ -1,7 +1,10 @@
 import json
-import requests
 from fairlib.core.interfaces.tools import AbstractTool
 
+from http_session import get_http_session
+from tracing import span
+from travel_matrix import TravelMatrix
+
 AIRPORT_COORDS = {
     "DEN": {"lat": 39.8561, "lon": -104.6737},
     "MIA": {"lat": 25.7959, "lon": -80.2871},
@@ -16,8 +19,14 @@ class FlightSearchTool(AbstractTool):
     name = "flight_search"
     description = (
         "Returns real currently-airborne flights near origin and destination airports "
-        "using the OpenSky API. No API key required."
+        "using the OpenSky API, plus an offline estimate of distance, flight time "
+        "and typical fare band. No API key required."
     )
+    concurrency_group = "opensky"
+    cache_ttl = 30
+
+    def __init__(self, travel_matrix: TravelMatrix = None):
+        self.travel = travel_matrix or TravelMatrix.load_airports()
 
     def _box(self, iata):
         if iata not in AIRPORT_COORDS:
@@ -34,18 +43,31 @@ class FlightSearchTool(AbstractTool):
     def _fetch_states(self, box):
         url = "https://opensky-network.org/api/states/all"
         try:
-            return requests.get(url, params=box, timeout=10).json().get("states", [])
+            with span("http.opensky", "http", tool=self.name):
+                return get_http_session().get(url, params=box, timeout=10).json().get("states", [])
         except:
             return []
 
+    def supports(self, payload: dict) -> bool:
+        """False unless both airports have live-traffic coordinates."""
+        codes = (str(payload.get(k) or "").strip().upper() for k in ("origin", "destination"))
+        return all(code in AIRPORT_COORDS for code in codes)
+
+    def normalize_input(self, payload: dict) -> dict:
+        """Cache-key form of an input (see tool_cache.py): IATA codes are case-insensitive."""
+        return {
+            "origin": str(payload.get("origin", "")).strip().upper(),
+            "destination": str(payload.get("destination", "")).strip().upper(),
+        }
+
     def use(self, tool_input: str) -> str:
         try:
             data = json.loads(tool_input)
         except:
             return json.dumps({"error": "Invalid JSON input"})
 
-        origin = data.get("origin")
-        dest = data.get("destination")
+        origin = str(data.get("origin") or "").strip().upper()
+        dest = str(data.get("destination") or "").strip().upper()
 
         if not origin or not dest:
             return json.dumps({"error": "origin and destination required"})
@@ -79,5 +101,6 @@ class FlightSearchTool(AbstractTool):
             "destination_airport": dest,
             "flights_near_origin": origin_list[:10],
             "flights_near_destination": dest_list[:10],
+            "route_estimate": self.travel.lookup(origin, dest),
             "note": "These are real aircraft currently near each airport (OpenSky live data).",
         }, indent=2)
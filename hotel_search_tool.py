@@ -1,7 +1,10 @@
 import json
-import requests
 from fairlib.core.interfaces.tools import AbstractTool
 
+from http_session import get_http_session
+from tool_cache import city_search_input
+from tracing import span
+
 # Same city → coordinates lookup used for restaurants + activities
 CITY_COORDS = {
     "miami": (25.7617, -80.1918),
@@ -20,6 +23,8 @@ class HotelSearchTool(AbstractTool):
         "Finds hotels, motels, guest houses, hostels, and lodging near a city "
         "using OpenStreetMap Overpass API. Requires 'city', optional 'radius_km'."
     )
+    concurrency_group = "overpass"
+    cache_ttl = 6 * 3600
 
     def _get_coords(self, city: str):
         city = city.lower()
@@ -41,14 +46,22 @@ class HotelSearchTool(AbstractTool):
         out;
         """
 
-        response = requests.post(
-            "https://overpass-api.de/api/interpreter",
-            data={"data": query},
-            timeout=25
-        )
+        with span("http.overpass", "http", tool=self.name):
+            response = get_http_session().post(
+                "https://overpass-api.de/api/interpreter",
+                data={"data": query},
+                timeout=25
+            )
 
         return response.json()
 
+    def supports(self, payload: dict) -> bool:
+        """False for cities this tool has no coordinates for."""
+        return self._get_coords(str(payload.get("city") or "").strip()) is not None
+
+    def normalize_input(self, payload: dict) -> dict:
+        return city_search_input(payload, default_radius_km=4)
+
     def use(self, tool_input: str) -> str:
         try:
             payload = json.loads(tool_input)
@@ -0,0 +1,28 @@
+"""
+Process-wide pooled HTTP session for the network tools.
+
+requests.post/get open a fresh connection (and TLS handshake) per call.
+Every tool instead goes through one shared requests.Session whose adapter
+keeps up to `pool_maxsize` keep-alive connections per host, so concurrent
+sessions reuse sockets to Overpass and OpenSky.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_http_session(pool_maxsize: int = 32) -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
@@ -0,0 +1,161 @@
+"""
+Lazy model handles with background loading and warm-up.
+
+Loading TinyLlama takes seconds, and doing it at import time or inside
+build_vacation_agent() kept the prompt (or the server socket) from coming
+up until the weights were in memory. LazyLLM returns immediately and
+loads on a background thread:
+
+  * the loader runs (e.g. model_pool.get or load_shared_model), then one
+    short warm-up generation so first-call costs (allocations, kernel
+    selection, connection setup) are paid before a user is waiting;
+  * invoke / ainvoke / stream / astream wait only for whatever of that is
+    still running - a call made after warm-up finished does not wait;
+  * a load error is raised by every call; a warm-up error is only counted.
+
+    llm = LazyLLM(lambda: model_pool.get(MODEL_NAME), name=MODEL_NAME)
+    llm = model_pool.lazy(MODEL_NAME)          # same, through the pool
+    llm.ready                                  # -> True once loaded and warm
+    llm.wait(timeout=60)                       # block explicitly, e.g. before a benchmark
+
+Agents call bind_* setup methods (e.g. bind_event_bus) when they are built;
+those are recorded and applied to the model once it is loaded. Any other
+attribute access waits for the model.
+
+Metrics: startup.load_s, startup.warmup_s and startup.ready_s (construction
+to ready) histograms, startup.call_wait_s (time calls spent waiting for
+the load), startup.warmup_errors and the startup.model_ready gauge.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from fairlib.core.message import Message
+
+from llm_streaming import astream_chunks
+from metrics import metrics
+
+WARMUP_MESSAGES = [Message(role="user", content="Hello")]
+WARMUP_TOKENS = 4
+
+
+class LazyLLM:
+    """
+    Chat-model interface over a model that is still loading. loader() is a
+    zero-argument callable returning the model; it runs once, on a daemon
+    thread started by the constructor (start=False defers it to the first
+    call or start()).
+    """
+
+    async_streaming = True   # astream() below, see llm_streaming.astream_chunks
+
+    def __init__(self, loader, name: str = "model", warm_up: bool = True, start: bool = True):
+        self.name = name
+        self.warm_up = warm_up
+        self._loader = loader
+        self._future = Future()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pending_binds = []
+        self._created = time.perf_counter()
+        metrics.gauge("startup.model_ready", 0)
+        if start:
+            self.start()
+
+    # ---------- loading ----------
+
+    def start(self):
+        """Starts the background load if it is not running yet."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True)
+                self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            llm = self._loader()
+            metrics.observe("startup.load_s", time.perf_counter() - start)
+            with self._lock:
+                binds, self._pending_binds = self._pending_binds, None
+            for name, args, kwargs in binds:
+                bind = getattr(llm, name, None)   # agents probe optional hooks with getattr(..., None)
+                if bind is not None:
+                    bind(*args, **kwargs)
+            if self.warm_up:
+                self._warm(llm)
+        except Exception as e:
+            self._future.set_exception(e)
+            return
+        metrics.observe("startup.ready_s", time.perf_counter() - self._created)
+        metrics.gauge("startup.model_ready", 1)
+        self._future.set_result(llm)
+
+    def _warm(self, llm):
+        start = time.perf_counter()
+        try:
+            llm.invoke(WARMUP_MESSAGES, max_tokens=WARMUP_TOKENS)
+        except Exception:
+            metrics.incr("startup.warmup_errors")
+            return
+        metrics.observe("startup.warmup_s", time.perf_counter() - start)
+
+    @property
+    def ready(self) -> bool:
+        return self._future.done()
+
+    def wait(self, timeout: float = None):
+        """The loaded model; blocks until loading and warm-up are done."""
+        if not self._future.done():
+            self.start()
+            start = time.perf_counter()
+            try:
+                return self._future.result(timeout)
+            finally:
+                metrics.observe("startup.call_wait_s", time.perf_counter() - start)
+        return self._future.result()
+
+    async def await_ready(self):
+        if not self._future.done():
+            self.start()
+            start = time.perf_counter()
+            try:
+                return await asyncio.wrap_future(self._future)
+            finally:
+                metrics.observe("startup.call_wait_s", time.perf_counter() - start)
+        return self._future.result()
+
+    # ---------- chat interface ----------
+
+    def invoke(self, messages, **kwargs):
+        return self.wait().invoke(messages, **kwargs)
+
+    async def ainvoke(self, messages, **kwargs):
+        return await (await self.await_ready()).ainvoke(messages, **kwargs)
+
+    def stream(self, messages, **kwargs):
+        llm = self.wait()
+        if not hasattr(llm, "stream"):
+            raise NotImplementedError("loaded model has no stream()")
+        yield from llm.stream(messages, **kwargs)
+
+    async def astream(self, messages, **kwargs):
+        async for chunk in astream_chunks(await self.await_ready(), messages, **kwargs):
+            yield chunk
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name.startswith("bind_") and not self._future.done():
+            return lambda *args, **kwargs: self._bind(name, args, kwargs)
+        return getattr(self.wait(), name)
+
+    def _bind(self, name, args, kwargs):
+        with self._lock:
+            if self._pending_binds is not None:
+                self._pending_binds.append((name, args, kwargs))
+                return None
+        return getattr(self.wait(), name)(*args, **kwargs)
@@ -0,0 +1,247 @@
+"""
+Persistent LLM response cache for deterministic prompts.
+
+Sessions and batch runs often send byte-identical prompts (same system
+prompt, same tool descriptions, same popular query). CachedLLM wraps a
+model and answers those from an on-disk SQLite store:
+
+  * key: SHA-256 of (model, messages, temperature, max_tokens, do_sample);
+  * only used when sampling is deterministic (temperature == 0 or
+    do_sample=False) - sampled replies are never cached or served;
+  * bounded by total stored bytes; least-recently-used entries go first.
+
+    llm = CachedLLM(TinyLlamaLLM(temperature=0))
+    llm = CachedLLM(model_pool.get(MODEL_NAME, do_sample=False),
+                    store=LLMResponseStore("data/llm_cache.db", max_bytes=64 << 20))
+
+Models that sample (the HF adapter's default, TinyLlamaLLM at 0.3) pass
+straight through, so wrapping is always safe.
+
+Metrics: llm_cache.hits / .misses / .bypassed / .evictions and the
+llm_cache.hit_rate gauge.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from fairlib.core.message import Message
+
+from llm_streaming import astream_chunks, message_text
+from metrics import metrics
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_cache.db")
+
+
+def sampling_params(llm, call_kwargs: dict) -> dict:
+    """Effective sampling settings of a call: the model's defaults overlaid with the call's kwargs."""
+    if hasattr(llm, "sampling_params"):
+        params = dict(llm.sampling_params())
+    else:
+        params = dict(getattr(llm, "default_gen_kwargs", None) or {})   # HuggingFaceAdapter
+    params.update(call_kwargs)
+    if "max_new_tokens" in params and "max_tokens" not in params:
+        params["max_tokens"] = params.pop("max_new_tokens")
+    return params
+
+
+def is_deterministic(params: dict) -> bool:
+    if params.get("do_sample") is False:
+        return True
+    return params.get("temperature") == 0 and params.get("do_sample") is not True
+
+
+def _message_dict(m) -> dict:
+    if isinstance(m, dict):
+        return {"role": m.get("role"), "content": m.get("content")}
+    return {"role": getattr(m, "role", None), "content": getattr(m, "content", None)}
+
+
+def cache_key(model: str, messages, params: dict) -> str:
+    payload = {
+        "model": model,
+        "messages": [_message_dict(m) for m in messages],
+        "temperature": params.get("temperature"),
+        "max_tokens": params.get("max_tokens"),
+        "do_sample": params.get("do_sample"),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMResponseStore:
+    """SQLite key -> reply text, bounded by total bytes, LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 64 * 1024 * 1024):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, reply TEXT NOT NULL, is_message INTEGER NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)")
+        self._conn.commit()
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._bytes = total
+
+    def get(self, key: str):
+        """The stored reply (str, or Message if the model returned one), or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT reply, is_message FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        if row is None:
+            return None
+        reply, is_message = row
+        return Message(role="assistant", content=reply) if is_message else reply
+
+    def put(self, key: str, reply):
+        is_message = not isinstance(reply, str)
+        reply = message_text(reply)
+        size = len(reply.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, reply, is_message, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, reply, int(is_message), size, time.time()),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            evicted = self._evict()
+            self._conn.commit()
+        if evicted:
+            metrics.incr("llm_cache.evictions", evicted)
+
+    def _evict(self) -> int:
+        evicted = 0
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= size
+                evicted += 1
+        return evicted
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store() -> LLMResponseStore:
+    """Process-wide store at data/llm_cache.db."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = LLMResponseStore()
+        return _default_store
+
+
+class CachedLLM:
+    """
+    Wraps invoke / ainvoke / astream with the response store. Everything else
+    is forwarded to the wrapped model unchanged.
+    """
+
+    async_streaming = True
+
+    def __init__(self, llm, store: LLMResponseStore = None):
+        self._llm = llm
+        self.store = store or get_default_store()
+
+    @property
+    def model_id(self) -> str:
+        return str(getattr(self._llm, "model_name", None) or type(self._llm).__name__)
+
+    def _key(self, messages, kwargs):
+        params = sampling_params(self._llm, kwargs)
+        if not is_deterministic(params):
+            metrics.incr("llm_cache.bypassed")
+            return None
+        return cache_key(self.model_id, messages, params)
+
+    async def _await_model(self):
+        # A LazyLLM (lazy_model.py) blocks attribute lookups until loaded; _key() reads several
+        await_ready = getattr(self._llm, "await_ready", None)
+        if await_ready is not None:
+            await await_ready()
+
+    def _lookup(self, key):
+        reply = self.store.get(key)
+        metrics.incr("llm_cache.hits" if reply is not None else "llm_cache.misses")
+        hits, misses = metrics.counter("llm_cache.hits"), metrics.counter("llm_cache.misses")
+        metrics.gauge("llm_cache.hit_rate", round(hits / (hits + misses), 4))
+        return reply
+
+    def invoke(self, messages, **kwargs):
+        key = self._key(messages, kwargs)
+        if key is not None and (reply := self._lookup(key)) is not None:
+            return reply
+        result = self._llm.invoke(messages, **kwargs)
+        if key is not None:
+            self.store.put(key, result)
+        return result
+
+    # The async paths run store reads / writes (SQLite, commit on every hit) on a
+    # worker thread so other sessions on the loop don't wait on the disk
+
+    async def ainvoke(self, messages, **kwargs):
+        await self._await_model()
+        key = self._key(messages, kwargs)
+        if key is not None and (reply := await asyncio.to_thread(self._lookup, key)) is not None:
+            return reply
+        result = await self._llm.ainvoke(messages, **kwargs)
+        if key is not None:
+            await asyncio.to_thread(self.store.put, key, result)
+        return result
+
+    async def astream(self, messages, **kwargs):
+        """A hit arrives as one chunk; a miss streams from the model and is stored once complete."""
+        await self._await_model()
+        key = self._key(messages, kwargs)
+        if key is not None and (reply := await asyncio.to_thread(self._lookup, key)) is not None:
+            yield reply
+            return
+        parts, is_message = [], False
+        async for chunk in astream_chunks(self._llm, messages, **kwargs):
+            is_message = not isinstance(chunk, str)
+            parts.append(message_text(chunk))
+            yield chunk
+        if key is not None and parts:
+            text = "".join(parts)
+            reply = Message(role="assistant", content=text) if is_message else text
+            await asyncio.to_thread(self.store.put, key, reply)
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
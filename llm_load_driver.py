@@ -0,0 +1,121 @@
+"""
+Load test: many concurrent vacation-agent sessions against a chat-completions endpoint.
+
+By default an in-process stub_llm_server is started on a free port and
+TinyLlamaLLM is pointed at it, so the run needs no network access:
+
+    python llm_load_driver.py --sessions 300 --turns 2 --ttft 0.3 --tokens-per-s 60
+    python llm_load_driver.py --sessions 300 --capacity 32          # model server saturates
+    python llm_load_driver.py --base-url http://127.0.0.1:8000      # external stub / server
+
+Each session owns its memory and agent; all share one model wrapper, tool
+registry and executor, exactly like vacation_server.py. The fast path is off
+by default because its flight/hotel lookups go to the network; the stub's
+default script only calls the offline trip_budget tool.
+
+The OpenAIAdapter demos (e.g. the committee autograders) need no driver:
+run them with OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=stub
+against `python stub_llm_server.py`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from metrics import metrics, percentile
+from stub_llm_server import ScriptedResponder, StubLLMServer
+from tinyllama_llm import TinyLlamaLLM
+from vacation_planner_agent import build_shared_components, build_vacation_agent
+from windowed_memory import WindowedMemory
+
+DEFAULT_QUERY = "Plan a 5-day trip to Miami for 2 people from New York with a $3000 budget."
+
+
+async def run_session(shared, query: str, turns: int, fast_path: bool, latencies: list) -> int:
+    """Runs `turns` turns in one session; returns the number that failed."""
+    agent = build_vacation_agent(memory=WindowedMemory(), shared=shared, fast_path=fast_path)
+    errors = 0
+    for _ in range(turns):
+        start = time.perf_counter()
+        try:
+            await agent.arun(query)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return errors
+
+
+async def run_load(shared, sessions: int, turns: int, query: str = DEFAULT_QUERY,
+                   fast_path: bool = False, ramp_s: float = 0.0) -> dict:
+    latencies = []
+
+    async def session(i):
+        if ramp_s:
+            await asyncio.sleep(ramp_s * i / sessions)
+        return await run_session(shared, query, turns, fast_path, latencies)
+
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    done = len(latencies)
+    return {
+        "sessions": sessions,
+        "turns": done,
+        "errors": sum(errors),
+        "wall_s": round(elapsed, 2),
+        "turns_per_s": round(done / elapsed, 2) if elapsed > 0 else None,
+        "turn_p50_s": round(percentile(latencies, 50), 3) if latencies else None,
+        "turn_p95_s": round(percentile(latencies, 95), 3) if latencies else None,
+        "turn_max_s": round(latencies[-1], 3) if latencies else None,
+        "llm_ttft_s": metrics.summary("llm.time_to_first_token_s"),
+    }
+
+
+# =========================
+#   MAIN ENTRY
+# =========================
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the vacation agent")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=1, help="turns per session")
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which sessions start")
+    parser.add_argument("--fast-path", action="store_true", help="allow the fast path (uses network tools)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="client-side cap on LLM requests")
+    parser.add_argument("--base-url", help="existing endpoint; default starts an in-process stub")
+    stub = parser.add_argument_group("in-process stub")
+    stub.add_argument("--script", help="JSON script file, see stub_llm_server.py")
+    stub.add_argument("--ttft", type=float, default=0.2)
+    stub.add_argument("--tokens-per-s", type=float, default=50.0)
+    stub.add_argument("--capacity", type=int, default=0)
+    stub.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        responder = ScriptedResponder.from_file(args.script) if args.script else ScriptedResponder()
+        server = StubLLMServer(responder, args.ttft, args.tokens_per_s, args.capacity, args.jitter)
+        await server.start("127.0.0.1", 0)
+        base_url = f"http://127.0.0.1:{server.port}"
+        os.environ.setdefault("GROQ_API_KEY", "stub")   # the stub ignores it; the SDK requires one
+
+    llm = TinyLlamaLLM(max_in_flight=args.max_in_flight, base_url=base_url)
+    shared = build_shared_components(llm, llm_cache=False)  # every request should reach the server
+    try:
+        report = await run_load(shared, args.sessions, args.turns, args.query, args.fast_path, args.ramp)
+    finally:
+        if server is not None:
+            await server.stop()
+    report["base_url"] = base_url
+    report["server"] = {k: v for k, v in metrics.snapshot()["counters"].items() if k.startswith("stub.")}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
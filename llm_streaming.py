@@ -0,0 +1,259 @@
+"""
+Token streaming for the vacation planner's final answer.
+
+SimpleAgent only returns once the whole ReAct loop is done. To print the
+final answer while it is being generated:
+
+  * StreamingLLM wraps the model the planner uses. Outside a streaming turn
+    it is a plain pass-through. Inside one, each LLM call is streamed, and
+    once a step's text reaches "Final Answer:" everything after it is
+    forwarded to the turn's consumer as it arrives. The planner still gets
+    the complete text back, so parsing is unchanged.
+  * astream_answer(agent, message) runs agent.arun() and yields those
+    forwarded chunks. The current turn's consumer is held in a contextvar,
+    so concurrent sessions sharing one StreamingLLM never see each other's
+    tokens.
+
+Models are streamed through the best API they offer: a native astream()
+(models with async_streaming = True, such as TinyLlamaLLM), a sync .stream()
+(HuggingFaceAdapter) pumped from a worker thread, an HF
+model/tokenizer pair without one goes through transformers'
+TextIteratorStreamer, and anything else falls back to a single ainvoke().
+
+Metrics: llm.time_to_first_token_s per streamed call, and
+agent.time_to_first_answer_token_s from the start of the turn. Every call
+is traced as an "llm.call" span (tracing.py).
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+
+from fairlib.core.message import Message
+
+from metrics import metrics
+from tracing import span
+
+FINAL_ANSWER_MARKERS = ("Final Answer:", "FINAL ANSWER:", "final_answer:")
+
+_answer_sink = contextvars.ContextVar("answer_sink", default=None)
+_DONE = object()
+
+
+def message_text(chunk) -> str:
+    if chunk is None:
+        return ""
+    if isinstance(chunk, str):
+        return chunk
+    if isinstance(chunk, dict):
+        return chunk.get("content") or ""
+    return getattr(chunk, "content", None) or ""
+
+
+# =========================
+#   CHUNK SOURCES
+# =========================
+
+async def iterate_in_thread(make_iterator):
+    """Runs a blocking iterator on a worker thread and yields its items on the loop."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def pump():
+        try:
+            for item in make_iterator():
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+    threading.Thread(target=pump, name="llm-stream", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def hf_stream(model, tokenizer, messages, max_new_tokens: int = 512, **generate_kwargs):
+    """Sync generator over a transformers model via TextIteratorStreamer."""
+    from transformers import TextIteratorStreamer
+
+    chat = [{"role": getattr(m, "role", "user"), "content": message_text(m)} for m in messages]
+    prompt = tokenizer.apply_chat_template(chat, tokenize=False, add_generation_prompt=True)
+    inputs = tokenizer(prompt, return_tensors="pt", add_special_tokens=False).to(model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+    worker = threading.Thread(
+        target=model.generate,
+        kwargs=dict(**inputs, streamer=streamer, max_new_tokens=max_new_tokens, **generate_kwargs),
+        daemon=True,
+    )
+    worker.start()
+    try:
+        for text in streamer:
+            if text:
+                yield text
+    finally:
+        worker.join()
+
+
+async def astream_chunks(llm, messages, **kwargs):
+    """Yields raw chunks (str or Message) from the best streaming API `llm` offers."""
+    if getattr(llm, "async_streaming", False):  # e.g. TinyLlamaLLM on AsyncGroq
+        async for chunk in llm.astream(messages, **kwargs):
+            yield chunk
+        return
+
+    stream = getattr(llm, "stream", None)
+    if callable(stream):
+        started = False
+        try:
+            async for chunk in iterate_in_thread(lambda: stream(messages, **kwargs)):
+                started = True
+                yield chunk
+            return
+        except NotImplementedError:  # e.g. HuggingFaceAdapter(enable_streaming=False)
+            if started:
+                raise
+
+    model, tokenizer = getattr(llm, "model", None), getattr(llm, "tokenizer", None)
+    if model is not None and tokenizer is not None and hasattr(model, "generate"):
+        async for text in iterate_in_thread(lambda: hf_stream(model, tokenizer, messages)):
+            yield Message(role="assistant", content=text)
+        return
+
+    yield await llm.ainvoke(messages, **kwargs)
+
+
+# =========================
+#   FINAL-ANSWER FILTER
+# =========================
+
+class FinalAnswerFilter:
+    """Feeds streamed text; returns only what comes after the final-answer marker."""
+
+    def __init__(self, markers=FINAL_ANSWER_MARKERS):
+        self.markers = markers
+        self.found = False
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> str:
+        if self.found:
+            return chunk
+        self._buffer += chunk
+        for marker in self.markers:
+            i = self._buffer.find(marker)
+            if i >= 0:
+                self.found = True
+                rest = self._buffer[i + len(marker):].lstrip()
+                self._buffer = ""
+                return rest
+        return ""
+
+
+class _AnswerSink:
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.streamed = False
+
+    def put(self, text):
+        self.streamed = True
+        self.queue.put_nowait(text)
+
+
+class StreamingLLM:
+    """Pass-through wrapper that streams final answers during astream_answer()."""
+
+    def __init__(self, llm, markers=FINAL_ANSWER_MARKERS):
+        self._llm = llm
+        self.markers = markers
+
+    async def ainvoke(self, messages, **kwargs):
+        sink = _answer_sink.get()
+        with span("llm.call", "llm", streamed=sink is not None):
+            if sink is None:
+                return await self._llm.ainvoke(messages, **kwargs)
+            return await self._stream_call(messages, sink, FinalAnswerFilter(self.markers), **kwargs)
+
+    async def ainvoke_answer(self, messages, **kwargs):
+        """For calls whose whole reply is the answer (no ReAct framing): every token is forwarded."""
+        sink = _answer_sink.get()
+        with span("llm.call", "llm", streamed=sink is not None):
+            if sink is None:
+                return await self._llm.ainvoke(messages, **kwargs)
+            return await self._stream_call(messages, sink, None, **kwargs)
+
+    async def _stream_call(self, messages, sink, answer, **kwargs):
+        start = time.perf_counter()
+        parts, as_message = [], False
+        async for chunk in astream_chunks(self._llm, messages, **kwargs):
+            if not parts:
+                metrics.observe("llm.time_to_first_token_s", time.perf_counter() - start)
+            as_message = as_message or not isinstance(chunk, str)
+            text = message_text(chunk)
+            parts.append(text)
+            forwarded = answer.feed(text) if answer is not None else text
+            if forwarded:
+                sink.put(forwarded)
+
+        full = "".join(parts)
+        if as_message:
+            return Message(role="assistant", content=full)
+        return full
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+
+# =========================
+#   AGENT STREAMING
+# =========================
+
+async def astream_answer(agent, message: str):
+    """
+    Runs agent.arun(message) and yields the final answer in chunks as it is
+    generated. If nothing could be streamed (no marker seen, or a model
+    without streaming) the complete answer is yielded once at the end.
+    """
+    sink = _AnswerSink()
+    token = _answer_sink.set(sink)
+    try:
+        task = asyncio.ensure_future(agent.arun(message))  # the task copies the context
+    finally:
+        _answer_sink.reset(token)
+
+    start = time.perf_counter()
+    first = True
+    try:
+        while True:
+            getter = asyncio.ensure_future(sink.queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                break
+            if first:
+                metrics.observe("agent.time_to_first_answer_token_s", time.perf_counter() - start)
+                first = False
+            yield getter.result()
+
+        while not sink.queue.empty():
+            yield sink.queue.get_nowait()
+
+        answer = await task
+        if not sink.streamed:
+            metrics.observe("agent.time_to_first_answer_token_s", time.perf_counter() - start)
+            yield message_text(answer)
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,93 @@
+"""
+Tiny process-wide metrics registry (counters, gauges, latency histograms).
+
+    from metrics import metrics
+    metrics.incr("tool_pool.overpass.timeouts")
+    metrics.gauge("tool_pool.overpass.waiting", 3)
+    metrics.observe("llm.time_to_first_token_s", 0.42)
+    print(metrics.snapshot())
+
+Histograms keep a bounded window of recent samples, so percentiles reflect
+recent behaviour and memory stays flat in long-running processes.
+"""
+
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._max_gauges = {}
+        self._histograms = defaultdict(lambda: deque(maxlen=self._window))
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def gauge(self, name: str, value: float):
+        """Sets a gauge and tracks its high-water mark as '<name>.max'."""
+        with self._lock:
+            self._gauges[name] = value
+            if value > self._max_gauges.get(name, float("-inf")):
+                self._max_gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._histograms[name].append(value)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def summary(self, name: str) -> dict:
+        with self._lock:
+            samples = sorted(self._histograms.get(name, ()))
+        return _summarize(samples)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            gauges.update({f"{k}.max": v for k, v in self._max_gauges.items()})
+            histograms = {k: sorted(v) for k, v in self._histograms.items()}
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {k: _summarize(v) for k, v in histograms.items()},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._max_gauges.clear()
+            self._histograms.clear()
+
+
+def percentile(sorted_samples, q: float):
+    """Nearest-rank percentile of an already-sorted list (q in 0..100)."""
+    if not sorted_samples:
+        return None
+    rank = max(0, min(len(sorted_samples) - 1, int(round(q / 100 * (len(sorted_samples) - 1)))))
+    return sorted_samples[rank]
+
+
+def _summarize(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": samples[-1],
+    }
+
+
+# Shared by every module in the process
+metrics = Metrics()
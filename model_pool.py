@@ -0,0 +1,201 @@
+"""
+Process-wide model pool.
+
+Loading TinyLlama through HuggingFaceAdapter costs seconds and ~GBs of RAM,
+so every agent in the process should share one instance per model. The pool
+loads each model once (concurrent requests for the same model wait for the
+single load), hands the same object to every caller, and tracks how many
+agents hold it so idle models can be evicted when memory is tight.
+
+    from model_pool import model_pool
+    llm = model_pool.get("TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+    llm = model_pool.get("TinyLlama/TinyLlama-1.1B-Chat-v1.0", backend="gguf", quant="Q4_K_M")
+    llm = model_pool.lazy("TinyLlama/TinyLlama-1.1B-Chat-v1.0")   # returns now, loads in the background
+    ...
+    model_pool.release("TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+    model_pool.evict_unused()
+"""
+
+import gc
+import threading
+import time
+
+from lazy_model import LazyLLM
+from metrics import metrics
+
+DEFAULT_MODEL = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+
+
+def _hf_factory(model_name: str, backend: str = "hf", **kwargs):
+    """backend="gguf" loads quantized weights through llama.cpp (quantized_llm.py)."""
+    if backend == "gguf":
+        from quantized_llm import QuantizedLLM
+        return QuantizedLLM(model_name=model_name, **kwargs)
+    from fairlib import HuggingFaceAdapter
+    return HuggingFaceAdapter(model_name=model_name, **kwargs)
+
+
+class _Entry:
+    def __init__(self):
+        self.model = None
+        self.refs = 0
+        self.last_used = time.monotonic()
+        self.ready = threading.Event()
+        self.error = None
+
+
+class ModelPool:
+    """
+    factory(model_name, **kwargs) builds a model; defaults to HuggingFaceAdapter.
+    max_loaded: when set, loading a new model evicts least-recently-used idle ones.
+    """
+
+    def __init__(self, factory=None, max_loaded: int = None):
+        self.factory = factory or _hf_factory
+        self.max_loaded = max_loaded
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_name, kwargs):
+        return (model_name, tuple(sorted(kwargs.items())))
+
+    def get(self, model_name: str = DEFAULT_MODEL, **kwargs):
+        """Returns the shared instance, loading it on first use. Counts as one reference."""
+        key = self._key(model_name, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry()
+            entry.refs += 1
+            entry.last_used = time.monotonic()
+
+        if owner:
+            self._load(key, entry, model_name, kwargs)
+        else:
+            entry.ready.wait()
+
+        if entry.error is not None:
+            with self._lock:
+                entry.refs -= 1
+            raise entry.error
+        metrics.incr("model_pool.hits" if not owner else "model_pool.loads")
+        return entry.model
+
+    def _load(self, key, entry, model_name, kwargs):
+        self._make_room(exclude=key)
+        start = time.perf_counter()
+        try:
+            entry.model = self.factory(model_name, **kwargs)
+            metrics.observe("model_pool.load_s", time.perf_counter() - start)
+        except Exception as e:
+            entry.error = e
+            with self._lock:
+                # Drop the failed entry so a later get() retries the load
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+        finally:
+            entry.ready.set()
+
+    def lazy(self, model_name: str = DEFAULT_MODEL, warm_up: bool = True, **kwargs) -> LazyLLM:
+        """Like get(), but returns at once; the load and a warm-up run on a background thread."""
+        return LazyLLM(lambda: self.get(model_name, **kwargs), name=model_name, warm_up=warm_up)
+
+    def release(self, model_name: str = DEFAULT_MODEL, **kwargs):
+        """
+        Drops one reference; the model stays loaded until evicted. The caller
+        must also drop its own references (and any wrapper's) for an eviction
+        to actually return the memory.
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(model_name, kwargs))
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+                entry.last_used = time.monotonic()
+
+    def warm_up(self, *model_names, background: bool = False, **kwargs):
+        """Loads models ahead of the first request without holding a reference."""
+        names = model_names or (DEFAULT_MODEL,)
+
+        def load_all():
+            for name in names:
+                self.get(name, **kwargs)
+                self.release(name, **kwargs)
+
+        if background:
+            thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+            thread.start()
+            return thread
+        load_all()
+
+    def evict(self, model_name: str = DEFAULT_MODEL, force: bool = False, **kwargs) -> bool:
+        """Unloads a model if no agent holds it (or unconditionally with force=True)."""
+        key = self._key(model_name, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.ready.is_set():
+                return False
+            if entry.refs > 0 and not force:
+                return False
+            del self._entries[key]
+        self._free(entry)
+        return True
+
+    def evict_unused(self, idle_seconds: float = 0.0) -> int:
+        """Unloads every unreferenced model idle for at least idle_seconds."""
+        now = time.monotonic()
+        with self._lock:
+            victims = [
+                key for key, e in self._entries.items()
+                if e.ready.is_set() and e.refs == 0 and now - e.last_used >= idle_seconds
+            ]
+            entries = [self._entries.pop(key) for key in victims]
+        for entry in entries:
+            self._free(entry)
+        return len(entries)
+
+    def _make_room(self, exclude):
+        if not self.max_loaded:
+            return
+        with self._lock:
+            loaded = [
+                (e.last_used, key) for key, e in self._entries.items()
+                if key != exclude and e.ready.is_set()
+            ]
+            excess = len(loaded) + 1 - self.max_loaded
+            victims = [
+                key for _, key in sorted(loaded)
+                if self._entries[key].refs == 0
+            ][:max(0, excess)]
+            entries = [self._entries.pop(key) for key in victims]
+        for entry in entries:
+            self._free(entry)
+
+    @staticmethod
+    def _free(entry):
+        # Drops the pool's reference; the weights go once released holders drop theirs
+        entry.model = None
+        metrics.incr("model_pool.evictions")
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name if not extra else f"{name}{dict(extra)}": {
+                    "refs": e.refs,
+                    "loaded": e.ready.is_set() and e.error is None,
+                    "idle_s": round(time.monotonic() - e.last_used, 1),
+                }
+                for (name, extra), e in self._entries.items()
+            }
+
+
+# Shared by every agent in the process
+model_pool = ModelPool()
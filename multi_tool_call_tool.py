@@ -0,0 +1,74 @@
+import json
+
+from fairlib.core.interfaces.tools import AbstractTool
+
+
+class MultiToolCallTool(AbstractTool):
+
+    name = "multi_tool_call"
+    description = (
+        "Runs several INDEPENDENT tool calls at the same time and returns all results "
+        "in one observation. Use it when the calls don't depend on each other, e.g. "
+        "hotel_search + restaurant_search + activity_search for the same city. "
+        "Input must be a JSON list like "
+        "[{\"tool\": \"hotel_search\", \"input\": {\"city\": \"Miami\"}}, "
+        "{\"tool\": \"restaurant_search\", \"input\": {\"city\": \"Miami\"}}]."
+    )
+
+    observation_tokens = 600   # several results in one observation
+
+    def __init__(self, executor, max_calls: int = 8):
+        self.executor = executor
+        self.max_calls = max_calls
+
+    def _parse_calls(self, tool_input: str):
+        data = json.loads(tool_input)
+        if isinstance(data, dict):
+            data = data.get("calls", [])
+        if not isinstance(data, list) or not data:
+            raise ValueError("expected a non-empty JSON list of {\"tool\", \"input\"} objects")
+        if len(data) > self.max_calls:
+            raise ValueError(f"at most {self.max_calls} calls per batch")
+
+        calls = []
+        for item in data:
+            tool_name = item.get("tool")
+            if not tool_name:
+                raise ValueError("every call needs a 'tool' name")
+            if tool_name == self.name:
+                raise ValueError("multi_tool_call cannot be nested")
+            tool_input = item.get("input", {})
+            if not isinstance(tool_input, str):
+                tool_input = json.dumps(tool_input)
+            calls.append((tool_name, tool_input))
+        return calls
+
+    def use(self, tool_input: str) -> str:
+        """Sync path for direct callers; SimpleToolExecutor awaits ause() instead."""
+        try:
+            calls = self._parse_calls(tool_input)
+        except Exception as e:
+            return json.dumps({"error": f"Invalid multi_tool_call input: {e}"})
+        return self._combine(calls, self.executor.execute_batch(calls, compact=False))
+
+    async def ause(self, tool_input: str) -> str:
+        # Runs on the event loop, not a pool worker: a worker blocked on its own
+        # sub-calls could starve them when every worker holds a batch
+        try:
+            calls = self._parse_calls(tool_input)
+        except Exception as e:
+            return json.dumps({"error": f"Invalid multi_tool_call input: {e}"})
+        # Full results here; the executor compacts this tool's combined observation once
+        return self._combine(calls, await self.executor.aexecute_batch(calls, compact=False))
+
+    @staticmethod
+    def _combine(calls, observations) -> str:
+        results = []
+        for (tool_name, _), observation in zip(calls, observations):
+            try:
+                observation = json.loads(observation)
+            except (TypeError, ValueError):
+                pass
+            results.append({"tool": tool_name, "observation": observation})
+
+        return json.dumps({"results": results}, indent=2)
@@ -0,0 +1,145 @@
+"""
+Compact encoding of tool results before they reach the prompt.
+
+Tools return pretty-printed JSON with echoes of their inputs, coordinates
+and long lists; every later ReAct step pays for those tokens again.
+SimpleToolExecutor passes each observation through ObservationCompactor:
+
+  * JSON is re-serialized without whitespace, floats rounded;
+  * redundant fields (DROP_KEYS: input echoes, coordinates, static notes)
+    and empty values are dropped;
+  * lists keep their first `max_items` entries plus a "+N more" marker;
+  * the result is capped at `max_tokens` (fewer list items first, then a
+    hard cut).
+
+Whenever something was removed, the full result is kept in an
+ObservationStore and the compact form carries its id ("ref": "obs-..."),
+which the observation_lookup tool resolves. A shortened top-level list is
+wrapped as {"items": [...], "ref": ...} so it can carry the ref too. Tools can set
+`observation_tokens` to change their cap, or `compact_output = False` to
+only have whitespace stripped (e.g. the itinerary formatter).
+
+    compactor = ObservationCompactor(max_tokens=250)
+    text = compactor.compact(full_result)
+    compactor.store.get("obs-1a2b3c4d")   # -> full_result
+
+Metrics: observation.raw_tokens / .compact_tokens histograms and the
+observation.truncated counter.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from metrics import metrics
+from windowed_memory import estimate_tokens
+
+DROP_KEYS = {
+    "inputs",                 # trip_budget echoes its whole input
+    "note",                   # flight_search's static data-source note
+    "lat", "lon",             # Overpass coordinates; names are what the plan needs
+    "activities_considered",  # destination_matcher echoes
+    "starting_state",
+}
+
+_COMPACT_JSON = {"separators": (",", ":"), "ensure_ascii": False}
+
+
+class ObservationStore:
+    """Full tool results by reference, most recent `max_entries` kept."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def ref_for(result: str) -> str:
+        return "obs-" + hashlib.sha1(result.encode("utf-8")).hexdigest()[:8]
+
+    def put(self, result: str) -> str:
+        ref = self.ref_for(result)
+        with self._lock:
+            self._items[ref] = result
+            self._items.move_to_end(ref)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return ref
+
+    def get(self, ref: str):
+        with self._lock:
+            return self._items.get(ref)
+
+
+class ObservationCompactor:
+
+    def __init__(self, max_tokens: int = 250, max_items: int = 5, store: ObservationStore = None):
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.store = store or ObservationStore()
+
+    def minify(self, result: str) -> str:
+        """Whitespace-free JSON (or collapsed whitespace for plain text); nothing dropped."""
+        try:
+            return json.dumps(json.loads(result), **_COMPACT_JSON)
+        except (TypeError, ValueError):
+            return " ".join(str(result).split())
+
+    def compact(self, result: str, max_tokens: int = None) -> str:
+        max_tokens = max_tokens or self.max_tokens
+        raw_tokens = estimate_tokens(result)
+        try:
+            data = json.loads(result)
+        except (TypeError, ValueError):
+            data = None
+
+        lossy = False
+        if isinstance(data, (dict, list)):
+            ref = self.store.ref_for(result)
+            for max_items in sorted({self.max_items, min(self.max_items, 3), 1}, reverse=True):
+                removed = []
+                slim = self._slim(data, max_items, removed)
+                lossy = bool(removed)
+                if lossy:
+                    if isinstance(slim, dict):
+                        slim["ref"] = ref
+                    else:
+                        slim = {"items": slim, "ref": ref}
+                text = json.dumps(slim, **_COMPACT_JSON)
+                if estimate_tokens(text) <= max_tokens:
+                    break
+        else:
+            text = " ".join(str(result).split())
+
+        if estimate_tokens(text) > max_tokens:
+            ref = self.store.ref_for(result)
+            suffix = f" ...[truncated; observation_lookup ref {ref}]"
+            text = text[:max(0, (max_tokens - 4) * 4 - len(suffix))] + suffix
+            lossy = True
+            metrics.incr("observation.truncated")
+
+        if lossy:
+            self.store.put(result)
+        metrics.observe("observation.raw_tokens", raw_tokens)
+        metrics.observe("observation.compact_tokens", estimate_tokens(text))
+        return text
+
+    def _slim(self, value, max_items: int, removed: list):
+        if isinstance(value, dict):
+            out = {}
+            for key, item in value.items():
+                if key in DROP_KEYS:
+                    removed.append(key)
+                elif item not in (None, "", [], {}):
+                    out[key] = self._slim(item, max_items, removed)
+            return out
+        if isinstance(value, list):
+            items = [self._slim(item, max_items, removed) for item in value[:max_items]]
+            if len(value) > max_items:
+                removed.append(len(value) - max_items)
+                items.append(f"+{len(value) - max_items} more")
+            return items
+        if isinstance(value, float):
+            return int(value) if value.is_integer() else round(value, 2)
+        return value
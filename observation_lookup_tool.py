@@ -0,0 +1,65 @@
+import json
+
+from fairlib.core.interfaces.tools import AbstractTool
+
+from observation_compactor import ObservationStore
+
+
+class ObservationLookupTool(AbstractTool):
+
+    name = "observation_lookup"
+    description = (
+        "Returns the full version of an earlier tool result that was shortened. "
+        "Shortened observations carry a reference like \"ref\": \"obs-1a2b3c4d\". "
+        "Input must be a JSON string with 'ref'; optional 'key' (e.g. \"hotels\") to "
+        "return one field, and 'offset' / 'limit' (default 0 / 10) to page through a list."
+    )
+    compact_output = False   # already bounded by 'limit'
+
+    def __init__(self, store: ObservationStore):
+        self.store = store
+
+    def use(self, tool_input: str) -> str:
+        try:
+            data = json.loads(tool_input)
+        except (TypeError, ValueError):
+            return json.dumps({"error": "Invalid JSON input."})
+        if isinstance(data, str):
+            data = {"ref": data}
+        if not isinstance(data, dict):
+            return json.dumps({"error": "Input must be a JSON object with 'ref' (or a ref string)."})
+
+        ref = str(data.get("ref", "")).strip()
+        full = self.store.get(ref)
+        if full is None:
+            return json.dumps({"error": f"Unknown or expired ref '{ref}'. Run the original tool again."})
+
+        try:
+            value = json.loads(full)
+        except ValueError:
+            return full
+
+        key = data.get("key")
+        if key is not None and not isinstance(key, str):
+            return json.dumps({"error": "'key' must be a field name string."})
+        if key:
+            if not isinstance(value, dict) or key not in value:
+                fields = sorted(value) if isinstance(value, dict) else []
+                return json.dumps({"error": f"No field '{key}'.", "fields": fields})
+            value = value[key]
+
+        if isinstance(value, list):
+            try:
+                offset = max(0, int(data.get("offset", 0)))
+                limit = max(1, int(data.get("limit", 10)))
+            except (TypeError, ValueError):
+                return json.dumps({"error": "'offset' and 'limit' must be integers."})
+            return json.dumps({
+                "ref": ref,
+                "key": key,
+                "total": len(value),
+                "offset": offset,
+                "items": value[offset:offset + limit],
+            }, separators=(",", ":"))
+
+        return json.dumps(value, separators=(",", ":"))
@@ -0,0 +1,207 @@
+"""
+Persistent, append-only session memory.
+
+PersistentMemory is a WindowedMemory whose every message is also appended to
+a SQLite log (one row per message, never rewritten). Resuming a session only
+reads the pinned messages, the stored summary and the most recent window of
+turns - walking the (session_id, seq) primary key backwards until the token
+budget is full - so it takes the same time for a 10-message session as for a
+10,000-message one. Older turns stay on disk and are paged in on demand with
+load_older().
+
+    memory = PersistentMemory("data/sessions.db")                  # new session
+    memory = PersistentMemory("data/sessions.db", session_id=sid)  # resume
+    print(memory.session_id)
+    older = memory.load_older(20)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from fairlib.core.message import Message
+
+from windowed_memory import WindowedMemory
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sessions.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created    REAL NOT NULL,
+    updated    REAL NOT NULL,
+    summary    TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq        INTEGER NOT NULL,
+    role       TEXT NOT NULL,
+    content    TEXT NOT NULL,
+    pinned     INTEGER NOT NULL,
+    created    REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS messages_pinned ON messages (session_id, pinned, seq);
+"""
+
+
+def open_store(path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # WAL + NORMAL: appends don't fsync the whole database on every message
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def list_sessions(path: str = DEFAULT_DB_PATH, limit: int = 20) -> list:
+    """Most recently updated sessions first: [{"session_id", "updated", "messages"}]."""
+    conn = open_store(path)
+    try:
+        rows = conn.execute(
+            "SELECT s.session_id, s.updated, "
+            "(SELECT MAX(seq) FROM messages m WHERE m.session_id = s.session_id) "
+            "FROM sessions s ORDER BY s.updated DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [{"session_id": sid, "updated": updated, "messages": count or 0} for sid, updated, count in rows]
+
+
+class PersistentMemory(WindowedMemory):
+    """
+    path:       SQLite file shared by all sessions.
+    session_id: resume this session; a new id is generated when omitted.
+    Remaining keyword arguments go to WindowedMemory (max_tokens, pin, ...).
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, session_id: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.session_id = session_id or uuid.uuid4().hex
+        self._conn = open_store(path)
+        self._lock = threading.Lock()
+        self._older_cursor = None
+        self.resumed_messages = 0
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(seq) FROM messages WHERE session_id = ?", (self.session_id,)
+            ).fetchone()
+            self._next_seq = (row[0] or 0) + 1
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created, updated) VALUES (?, ?, ?)",
+                (self.session_id, now, now),
+            )
+            self._conn.commit()
+
+        self._resume()
+
+    # ---------- resume ----------
+
+    def _resume(self):
+        with self._lock:
+            (summary,) = self._conn.execute(
+                "SELECT summary FROM sessions WHERE session_id = ?", (self.session_id,)
+            ).fetchone()
+            pinned = self._conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND pinned = 1 ORDER BY seq",
+                (self.session_id,),
+            ).fetchall()
+
+        WindowedMemory._set_summary(self, summary)
+        for role, content in pinned:
+            super().add_message(Message(role=role, content=content), pinned=True)
+
+        # Budget left after pinned + summary decides how much history to read
+        with self._lock:
+            recent = self._recent_rows()
+        for role, content in recent:
+            super().add_message(Message(role=role, content=content), pinned=False)
+        self.resumed_messages = len(pinned) + len(recent)
+
+    def _recent_rows(self) -> list:
+        """Newest unpinned rows back to a turn boundary, within the token budget."""
+        budget = self.max_tokens - self.total_tokens
+        rows, used = [], 0
+        cursor = self._conn.execute(
+            "SELECT role, content FROM messages WHERE session_id = ? AND pinned = 0 ORDER BY seq DESC",
+            (self.session_id,),
+        )
+        for role, content in cursor:
+            rows.append((role, content))
+            used += self.count_tokens(content)
+            if role == "user" and used >= budget:
+                break
+        cursor.close()
+        rows.reverse()
+        return rows
+
+    # ---------- append-only log ----------
+
+    def add_message(self, msg, pinned: bool = None):
+        if pinned is None:
+            pinned = self.pin(msg)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO messages (session_id, seq, role, content, pinned, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.session_id, self._next_seq, msg.role, str(msg.content or ""), int(pinned), now),
+            )
+            self._conn.execute("UPDATE sessions SET updated = ? WHERE session_id = ?", (now, self.session_id))
+            self._conn.commit()
+            self._next_seq += 1
+        super().add_message(msg, pinned=pinned)
+
+    def _set_summary(self, text):
+        super()._set_summary(text)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sessions SET summary = ? WHERE session_id = ?", (self.summary, self.session_id)
+            )
+            self._conn.commit()
+
+    def load_older(self, max_messages: int = 20) -> list:
+        """
+        Pages in the messages just before the oldest one seen so far (the start
+        of the window on the first call). Returns them oldest first; [] at the
+        beginning of the session. The in-RAM window is left unchanged.
+        """
+        with self._lock:
+            if self._older_cursor is None:
+                in_window = len(self._window) - self._start
+                row = self._conn.execute(
+                    "SELECT seq FROM messages WHERE session_id = ? AND pinned = 0 "
+                    "ORDER BY seq DESC LIMIT 1 OFFSET ?",
+                    (self.session_id, max(0, in_window - 1)),
+                ).fetchone()
+                self._older_cursor = row[0] if row and in_window else self._next_seq
+
+            rows = self._conn.execute(
+                "SELECT seq, role, content FROM messages WHERE session_id = ? AND pinned = 0 AND seq < ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (self.session_id, self._older_cursor, max_messages),
+            ).fetchall()
+
+        if rows:
+            self._older_cursor = rows[-1][0]
+        return [Message(role=role, content=content) for _, role, content in reversed(rows)]
+
+    def clear(self):
+        """Forgets the session: clears the window and deletes its log."""
+        super().clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (self.session_id,))
+            self._conn.commit()
+            self._next_seq = 1
+            self._older_cursor = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
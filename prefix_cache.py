@@ -0,0 +1,262 @@
+"""
+Prefix (KV-cache) reuse for the local HuggingFace backend.
+
+Every ReAct step resends the role prompt, the tool descriptions and the
+history so far; HuggingFaceAdapter re-encodes all of it each time. With
+PrefixCachedLLM the attention key/value state of earlier prompts is kept,
+and a new step only runs the model over the tokens past the longest cached
+prefix:
+
+  * session entries: after each call the KV state of prompt + reply is kept,
+    so a session's next step (same prefix + new observation) reuses it.
+    Entries live in an LRU; an entry that is a prefix of a newer one is
+    dropped, so a session holds one entry.
+  * pinned entries: the system/tools prefix shared by every session is kept
+    separately, so a new session starts from it instead of from zero.
+
+Both kinds count towards one budget of cached tokens; past it the oldest
+session entries go first, then the oldest pinned ones.
+
+Nothing needs a session id: lookups pick the entry with the longest common
+token prefix. (The GGUF backend needs none of this: llama.cpp already reuses
+the prefix of its previous prompt.)
+
+    llm = PrefixCachedLLM(model_pool.get(MODEL_NAME))
+    shared = build_shared_components(llm)
+
+Metrics: prefix_cache.hits / .misses, prefix_cache.reused_tokens and
+.new_tokens counters, prefix_cache.cached_tokens gauge.
+"""
+
+import asyncio
+import copy
+import threading
+from collections import OrderedDict
+
+from fairlib.core.message import Message
+
+from metrics import metrics
+
+
+def common_prefix_len(a, b) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _chat_dict(m) -> dict:
+    if isinstance(m, dict):
+        return {"role": m.get("role"), "content": m.get("content") or ""}
+    return {"role": m.role, "content": m.content or ""}
+
+
+def encode_chat(tokenizer, messages, add_generation_prompt: bool = True) -> list:
+    """Prompt token ids via the chat template (plain transcript if there is none)."""
+    chat = [_chat_dict(m) for m in messages]
+    try:
+        ids = tokenizer.apply_chat_template(chat, tokenize=True, add_generation_prompt=add_generation_prompt)
+    except Exception:   # no chat template: same plain transcript as the adapter
+        return tokenizer.encode("\n".join(f"{m['role']}: {m['content']}" for m in chat))
+    return list(ids["input_ids"] if isinstance(ids, dict) or hasattr(ids, "input_ids") else ids)
+
+
+def is_hf_model(llm) -> bool:
+    """True for HuggingFaceAdapter-like models (a transformers model + tokenizer)."""
+    model = getattr(llm, "model", None)
+    return hasattr(model, "generate") and getattr(llm, "tokenizer", None) is not None
+
+
+class _Entry:
+    __slots__ = ("ids", "kv")
+
+    def __init__(self, ids: tuple, kv):
+        self.ids = ids
+        self.kv = kv
+
+
+class PrefixKVStore:
+    """
+    Token-id prefixes -> KV caches (transformers DynamicCache). Session and
+    pinned entries together are bounded by `max_tokens`; at most `max_pinned`
+    shared prefixes. Stored caches are never modified, so lookups copy them
+    outside the lock.
+    """
+
+    def __init__(self, max_tokens: int = 16384, max_pinned: int = 4):
+        self.max_tokens = max_tokens
+        self.max_pinned = max_pinned
+        self._entries = OrderedDict()   # ids -> _Entry, LRU order
+        self._pinned = OrderedDict()
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, ids: tuple):
+        """(prefix length, private copy of its KV cache), or (0, None)."""
+        with self._lock:
+            best, best_len = None, 0
+            for table in (self._entries, self._pinned):
+                for entry in table.values():
+                    n = common_prefix_len(entry.ids, ids)
+                    if n > best_len:
+                        best, best_len = entry, n
+            if best is None:
+                return 0, None
+            table = self._entries if best.ids in self._entries else self._pinned
+            table.move_to_end(best.ids)
+        # generate() appends to the cache it is given; copying a long cache is
+        # slow, so other sessions' lookups and puts aren't held up behind it
+        return best_len, copy.deepcopy(best.kv)
+
+    def put(self, ids: tuple, kv):
+        with self._lock:
+            # A session's older entry is a prefix of its new one: keep only the newest
+            for old in [k for k in self._entries if len(k) < len(ids) and ids[:len(k)] == k]:
+                self._tokens -= len(self._entries.pop(old).ids)
+            if ids in self._entries:
+                self._tokens -= len(ids)
+            self._entries[ids] = _Entry(ids, kv)
+            self._tokens += len(ids)
+            self._evict()
+
+    def pin(self, ids: tuple, kv):
+        with self._lock:
+            if ids in self._pinned:
+                self._pinned.move_to_end(ids)
+                return
+            self._pinned[ids] = _Entry(ids, kv)
+            self._tokens += len(ids)
+            while len(self._pinned) > self.max_pinned:
+                self._tokens -= len(self._pinned.popitem(last=False)[1].ids)
+            self._evict()
+
+    def _evict(self):
+        """Drops LRU session entries (keeping the newest), then LRU pinned ones, until within budget."""
+        while self._tokens > self.max_tokens:
+            if len(self._entries) > 1:
+                table = self._entries
+            elif self._pinned:
+                table = self._pinned
+            else:
+                break
+            self._tokens -= len(table.popitem(last=False)[1].ids)
+        metrics.gauge("prefix_cache.cached_tokens", self._tokens)
+
+    def has_pinned(self, ids: tuple) -> bool:
+        with self._lock:
+            return ids in self._pinned
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            self._tokens = 0
+
+
+class PrefixCachedLLM:
+    """
+    Wraps a HuggingFaceAdapter; invoke / ainvoke / stream generate with
+    model.generate(past_key_values=...) from the longest cached prefix.
+    Everything else is forwarded to the adapter.
+    """
+
+    MIN_PIN_TOKENS = 32      # shorter system prefixes aren't worth a pinned entry
+    async_streaming = False  # stream through stream() below, not the adapter's astream()
+
+    def __init__(self, llm, store: PrefixKVStore = None):
+        if not is_hf_model(llm):
+            raise TypeError("PrefixCachedLLM needs a HuggingFace model with a tokenizer")
+        self._llm = llm
+        self.store = store or PrefixKVStore()
+
+    def _gen_kwargs(self, overrides: dict) -> dict:
+        gen = {**getattr(self._llm, "default_gen_kwargs", {}), **overrides}
+        if "max_tokens" in gen:
+            gen["max_new_tokens"] = gen.pop("max_tokens")
+        if not gen.get("do_sample", False):
+            gen.pop("temperature", None)
+            gen.pop("top_p", None)
+        return gen
+
+    # ---------- generation ----------
+
+    def _generate(self, messages, streamer=None, **kwargs) -> str:
+        import torch
+
+        ids = encode_chat(self._llm.tokenizer, messages)
+        key = tuple(ids)
+        # At least one prompt token must go through the model to produce logits
+        reused, kv = self.store.lookup(key[:-1])
+        metrics.incr("prefix_cache.hits" if reused else "prefix_cache.misses")
+        metrics.incr("prefix_cache.reused_tokens", reused)
+        metrics.incr("prefix_cache.new_tokens", len(ids) - reused)
+        if kv is not None:
+            kv.crop(reused)
+
+        model, tokenizer = self._llm.model, self._llm.tokenizer
+        input_ids = torch.tensor([ids], device=model.device)
+        gen = dict(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            return_dict_in_generate=True,
+            pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id,
+            **self._gen_kwargs(kwargs),
+        )
+        if kv is not None:
+            gen["past_key_values"] = kv
+        if streamer is not None:
+            gen["streamer"] = streamer
+        with torch.no_grad():
+            out = model.generate(**gen)
+
+        sequence = out.sequences[0].tolist()
+        cache = out.past_key_values
+        if cache is not None and hasattr(cache, "crop"):
+            cached = cache.get_seq_length()
+            self._pin_system_prefix(messages, key, cache)
+            self.store.put(tuple(sequence[:cached]), cache)
+        return tokenizer.decode(sequence[len(ids):], skip_special_tokens=True)
+
+    def _pin_system_prefix(self, messages, key: tuple, cache):
+        system = [m for m in map(_chat_dict, messages) if m["role"] == "system"]
+        if not system:
+            return
+        n = common_prefix_len(encode_chat(self._llm.tokenizer, system, add_generation_prompt=False), key)
+        if n < self.MIN_PIN_TOKENS or self.store.has_pinned(key[:n]):
+            return
+        shared = copy.deepcopy(cache)
+        shared.crop(n)
+        self.store.pin(key[:n], shared)
+
+    def invoke(self, messages, **kwargs) -> Message:
+        return Message(role="assistant", content=self._generate(messages, **kwargs))
+
+    async def ainvoke(self, messages, **kwargs) -> Message:
+        return await asyncio.to_thread(self.invoke, messages, **kwargs)
+
+    def stream(self, messages, **kwargs):
+        """Yields text chunks while generate() runs on a worker thread."""
+        from transformers import TextIteratorStreamer
+
+        streamer = TextIteratorStreamer(self._llm.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+
+        def run():
+            try:
+                self._generate(messages, streamer=streamer, **kwargs)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        worker = threading.Thread(target=run, name="prefix-cache-generate", daemon=True)
+        worker.start()
+        for text in streamer:
+            if text:
+                yield text
+        worker.join()
+        if errors:
+            raise errors[0]
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
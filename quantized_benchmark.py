@@ -0,0 +1,164 @@
+"""
+Speed / memory / quality benchmark: quantized GGUF backends vs the HF adapter.
+
+Each backend runs in its own process (so memory numbers don't mix) and
+decodes greedily, so differences in output come from the weights alone.
+Reported per backend: load time, resident memory after load and at peak,
+generated tokens/sec, per-prompt latency, the share of ReAct prompts
+answered with parseable JSON actions, and word-level similarity to the
+reference backend's output (the first one listed).
+
+    python quantized_benchmark.py
+    python quantized_benchmark.py --backends hf gguf:Q8_0 gguf:Q4_K_M --max-new-tokens 200
+    python quantized_benchmark.py --backends gguf:Q4_K_M gguf:Q8_0 --json
+"""
+
+import argparse
+import json
+import multiprocessing
+import re
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+from metrics import percentile
+
+MODEL = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+
+REACT_SYSTEM = (
+    "You are a vacation planner with these tools: flight_search, hotel_search, restaurant_search, "
+    "activity_search, trip_budget, final_answer. Respond with ONE JSON object: "
+    '{"thought": "...", "action": {"tool_name": "...", "tool_input": "..."}}'
+)
+
+PROMPTS = [
+    ("react", "Plan a 5-day trip to Miami for 2 people from New York with a $3000 budget."),
+    ("react", "Find seafood restaurants in Seattle."),
+    ("react", "How much would a week in Denver cost for a family of four flying from Dallas?"),
+    ("react", "What can I do in Chicago if I like museums and jazz?"),
+    ("text", "Write a 3-day itinerary for Boston as a markdown table (Day | Activities | Food)."),
+    ("text", "Summarize in two sentences why travelers visit New Orleans."),
+]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load(backend: str, max_new_tokens: int):
+    """'hf' or 'gguf:<QUANT>' -> (llm, count_tokens)."""
+    if backend == "hf":
+        from fairlib import HuggingFaceAdapter
+        llm = HuggingFaceAdapter(model_name=MODEL, max_new_tokens=max_new_tokens, do_sample=False)
+        return llm, lambda text: len(llm.tokenizer.encode(text, add_special_tokens=False))
+    kind, _, quant = backend.partition(":")
+    if kind != "gguf":
+        raise ValueError(f"Unknown backend {backend!r}")
+    from quantized_llm import DEFAULT_QUANT, QuantizedLLM
+    llm = QuantizedLLM(MODEL, quant=quant or DEFAULT_QUANT, max_new_tokens=max_new_tokens, do_sample=False)
+    return llm, llm.count_tokens
+
+
+def _messages(kind: str, prompt: str) -> list:
+    from fairlib.core.message import Message
+    system = REACT_SYSTEM if kind == "react" else "You are a helpful travel assistant."
+    return [Message(role="system", content=system), Message(role="user", content=prompt)]
+
+
+def measure(backend: str, max_new_tokens: int) -> dict:
+    """Runs in a child process: load, warm up, then time every prompt."""
+    base_rss = _rss_mb()
+    start = time.perf_counter()
+    llm, count_tokens = _load(backend, max_new_tokens)
+    load_s = time.perf_counter() - start
+    loaded_rss = _rss_mb()
+
+    llm.invoke(_messages("text", "Say hello."))  # warm-up: kernels, caches
+
+    outputs, latencies, tokens = [], [], 0
+    for kind, prompt in PROMPTS:
+        start = time.perf_counter()
+        reply = llm.invoke(_messages(kind, prompt))
+        latencies.append(time.perf_counter() - start)
+        text = getattr(reply, "content", reply) or ""
+        outputs.append(text)
+        tokens += count_tokens(text)
+
+    gen_s = sum(latencies)
+    latencies.sort()
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "model_rss_mb": round(loaded_rss - base_rss, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "tokens": tokens,
+        "tokens_per_s": round(tokens / gen_s, 1) if gen_s > 0 else None,
+        "latency_p50_s": round(percentile(latencies, 50), 2),
+        "latency_max_s": round(latencies[-1], 2),
+        "outputs": outputs,
+    }
+
+
+def valid_react(text: str) -> bool:
+    match = re.search(r"\{.*\}", text, re.S)
+    if not match:
+        return False
+    try:
+        action = json.loads(match.group(0)).get("action")
+    except (ValueError, AttributeError):
+        return False
+    return isinstance(action, dict) and bool(action.get("tool_name"))
+
+
+def similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a.split(), b.split()).ratio()
+
+
+def score(results: list) -> list:
+    """Adds quality columns, using the first backend's outputs as the reference."""
+    reference = results[0]["outputs"]
+    react = [i for i, (kind, _) in enumerate(PROMPTS) if kind == "react"]
+    for r in results:
+        r["react_valid"] = f"{sum(valid_react(r['outputs'][i]) for i in react)}/{len(react)}"
+        r["similarity_to_ref"] = round(
+            sum(similarity(out, ref) for out, ref in zip(r["outputs"], reference)) / len(reference), 3
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized vs full-precision TinyLlama benchmark")
+    parser.add_argument("--backends", nargs="+", default=["hf", "gguf:Q8_0", "gguf:Q4_K_M"],
+                        help="'hf' or 'gguf:<QUANT>'; the first is the quality reference")
+    parser.add_argument("--max-new-tokens", type=int, default=160)
+    parser.add_argument("--json", action="store_true", help="print JSON (including outputs)")
+    args = parser.parse_args()
+
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:  # fresh process per backend
+            results.append(pool.submit(measure, backend, args.max_new_tokens).result())
+    score(results)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = ["backend", "load_s", "model_rss_mb", "peak_rss_mb", "tokens_per_s",
+               "latency_p50_s", "latency_max_s", "react_valid", "similarity_to_ref"]
+    print(" ".join(f"{c:>17}" for c in columns))
+    for r in results:
+        print(" ".join(f"{str(r[c]):>17}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
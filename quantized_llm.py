@@ -0,0 +1,126 @@
+"""
+Quantized CPU backend for TinyLlama (GGUF weights via llama.cpp).
+
+The full-precision HuggingFaceAdapter spends most of a plan's wall time
+generating on CPU. llama.cpp runs int4/int8 GGUF weights with SIMD kernels,
+typically several times faster at a fraction of the memory. QuantizedLLM
+mirrors the adapter (invoke/ainvoke/stream returning assistant Messages), so
+it drops into the agent unchanged:
+
+    from quantized_llm import QuantizedLLM
+    shared = build_shared_components(QuantizedLLM(quant="Q4_K_M"))
+
+    # or through the model pool / environment
+    model_pool.get(MODEL_NAME, backend="gguf", quant="Q8_0")
+    VACATION_MODEL_BACKEND=gguf python vacation_planner_agent.py
+
+Weights come from a local .gguf file (model_name="path/to/model.gguf") or are
+downloaded once from the GGUF mirror of the HF model name. Needs
+`pip install llama-cpp-python` (and huggingface_hub for downloads).
+Compare against the full-precision adapter with quantized_benchmark.py.
+"""
+
+import asyncio
+import os
+import threading
+
+from fairlib.core.message import Message
+
+try:
+    from llama_cpp import Llama
+except ImportError:  # optional: only needed for the "gguf" backend
+    Llama = None
+
+
+DEFAULT_MODEL = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+DEFAULT_QUANT = "Q4_K_M"
+
+# HF model name -> (GGUF repo, file name template)
+GGUF_SOURCES = {
+    "TinyLlama/TinyLlama-1.1B-Chat-v1.0": (
+        "TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF",
+        "tinyllama-1.1b-chat-v1.0.{quant}.gguf",
+    ),
+}
+
+
+def _require_llama_cpp():
+    if Llama is None:
+        raise ImportError("The GGUF backend needs llama.cpp bindings: pip install llama-cpp-python")
+
+
+def _message_dict(m) -> dict:
+    if isinstance(m, dict):
+        return {"role": m.get("role"), "content": m.get("content") or ""}
+    return {"role": m.role, "content": m.content or ""}
+
+
+class QuantizedLLM:
+    """
+    llama.cpp chat model with HuggingFaceAdapter's interface. Generation is
+    serialized per instance (a llama.cpp context is not thread-safe); share
+    one instance through model_pool as with the HF adapter.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, quant: str = DEFAULT_QUANT, n_ctx: int = 4096,
+                 n_threads: int = None, max_new_tokens: int = 512, temperature: float = 0.7,
+                 top_p: float = 0.9, do_sample: bool = True, verbose: bool = False):
+        _require_llama_cpp()
+        self.quant = quant
+        threads = n_threads or os.cpu_count()
+        if model_name.endswith(".gguf"):
+            self.model = Llama(model_path=model_name, n_ctx=n_ctx, n_threads=threads, verbose=verbose)
+            self.model_name = os.path.basename(model_name)
+        else:
+            if model_name not in GGUF_SOURCES:
+                raise ValueError(f"No GGUF source known for {model_name!r}; pass a .gguf path instead")
+            repo, filename = GGUF_SOURCES[model_name]
+            self.model = Llama.from_pretrained(
+                repo, filename=filename.format(quant=quant), n_ctx=n_ctx, n_threads=threads, verbose=verbose
+            )
+            self.model_name = f"{model_name}:{quant}"
+        self.default_gen_kwargs = {
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "do_sample": do_sample,
+        }
+        self._lock = threading.Lock()
+
+    def _generation_kwargs(self, overrides: dict) -> dict:
+        gen = {**self.default_gen_kwargs, **overrides}
+        if "max_tokens" in gen:
+            gen["max_new_tokens"] = gen.pop("max_tokens")
+        greedy = not gen.get("do_sample", True) or not gen.get("temperature")
+        options = {
+            "max_tokens": gen["max_new_tokens"],
+            "temperature": 0.0 if greedy else gen["temperature"],
+            "top_p": 1.0 if greedy else gen.get("top_p", 1.0),
+        }
+        # llama.cpp takes these under the same names
+        options.update({k: gen[k] for k in ("stop", "seed") if gen.get(k) is not None})
+        return options
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.model.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def invoke(self, messages, **kwargs) -> Message:
+        with self._lock:
+            response = self.model.create_chat_completion(
+                messages=[_message_dict(m) for m in messages], **self._generation_kwargs(kwargs)
+            )
+        return Message(role="assistant", content=response["choices"][0]["message"]["content"] or "")
+
+    async def ainvoke(self, messages, **kwargs) -> Message:
+        return await asyncio.to_thread(self.invoke, messages, **kwargs)
+
+    def stream(self, messages, **kwargs):
+        """Yields the reply in text chunks; llm_streaming runs this on a thread."""
+        with self._lock:
+            chunks = self.model.create_chat_completion(
+                messages=[_message_dict(m) for m in messages], stream=True, **self._generation_kwargs(kwargs)
+            )
+            for chunk in chunks:
+                text = chunk["choices"][0]["delta"].get("content")
+                if text:
+                    yield text
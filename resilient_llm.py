@@ -0,0 +1,316 @@
+"""
+Retries, backoff, circuit breaking and failover for LLM calls.
+
+A single transient provider error (429, 5xx, dropped connection) used to
+fail the whole agent run, and a provider that hangs held every session
+with it. ResilientLLM wraps one primary model and optional fallbacks:
+
+  * every attempt has a timeout, and all attempts of one call share an
+    overall deadline - no retry starts that could not finish in time;
+  * retryable errors (timeouts, connection errors, 408/409/429/5xx) are
+    retried with full-jitter exponential backoff, honouring Retry-After;
+    anything else (a 400, bad kwargs) is the caller's problem and is
+    raised as is - no retry, no failover, not held against the backend;
+  * each backend has a CircuitBreaker: after `failure_threshold`
+    consecutive retryable failures it opens and calls skip straight to the
+    next backend until `reset_timeout` passes and one trial call is let
+    through;
+  * when a backend is exhausted or open, the call fails over to the next
+    one (e.g. Groq -> local GGUF model). Fallbacks may be zero-argument
+    factories, loaded on first failover (on a worker thread in async code).
+
+    llm = ResilientLLM(TinyLlamaLLM(), fallbacks=[lambda: QuantizedLLM()])
+    VACATION_MODEL_BACKEND=groq VACATION_MODEL_FALLBACK=gguf python vacation_server.py
+
+Streaming calls are retried only until the first chunk has been yielded.
+
+Metrics: llm.retries, llm.failovers, llm.call_failures, llm.breaker_rejections,
+llm.breaker_opened, llm.fallback_load_errors counters and the llm.breaker_state.<backend> gauge
+(0 closed, 1 half-open, 2 open).
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from llm_streaming import astream_chunks
+from metrics import metrics
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailableError", "ConnectError", "ReadTimeout", "RemoteProtocolError",
+}
+
+
+class LLMUnavailableError(RuntimeError):
+    """Every backend failed or was open; __cause__ holds the last error."""
+
+
+def _status(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(exc) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = _status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(exc).__name__ in RETRYABLE_NAMES
+
+
+def retry_after(exc):
+    """Seconds from a Retry-After header, if the error carries one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def backend_name(llm) -> str:
+    return str(getattr(llm, "model_name", None) or type(llm).__name__)
+
+
+class CircuitBreaker:
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self.state = self.CLOSED
+
+    def _set(self, state):
+        self.state = state
+        metrics.gauge(f"llm.breaker_state.{self.name}", self._GAUGE[state])
+
+    def allow(self) -> bool:
+        """False while open; after reset_timeout lets exactly one trial call through."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._set(self.HALF_OPEN)
+                self._trial = False
+            if self.state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self._set(self.CLOSED)
+
+    def release(self):
+        """The call ended without a verdict (cancelled, caller error): frees the half-open trial slot."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    metrics.incr("llm.breaker_opened")
+                self._opened_at = self._clock()
+                self._set(self.OPEN)
+
+
+class ResilientLLM:
+    """
+    invoke / ainvoke / astream over [primary, *fallbacks] with the policy in
+    the module docstring. Everything else is forwarded to the primary.
+    """
+
+    async_streaming = True   # astream() below, see llm_streaming.astream_chunks
+
+    def __init__(self, primary, fallbacks=(), max_attempts: int = 3, call_timeout: float = 30.0,
+                 deadline: float = 90.0, base_delay: float = 0.5, max_delay: float = 8.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._llm = primary
+        self._backends = [primary, *fallbacks]
+        self._breakers = [
+            CircuitBreaker(backend_name(primary) if i == 0 else f"fallback{i}", failure_threshold, reset_timeout)
+            for i in range(len(self._backends))
+        ]
+        self._resolve_lock = threading.Lock()
+        self.max_attempts = max_attempts
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _unresolved(self, i: int) -> bool:
+        backend = self._backends[i]
+        return bool(i) and callable(backend) and not hasattr(backend, "ainvoke") and not hasattr(backend, "invoke")
+
+    def _backend(self, i: int):
+        """Backend i; fallback factories are called on first use. None if that load failed."""
+        if self._unresolved(i):
+            try:
+                with self._resolve_lock:
+                    if self._unresolved(i):
+                        self._backends[i] = self._backends[i]()
+            except Exception:
+                metrics.incr("llm.fallback_load_errors")
+                self._breakers[i].record_failure()
+                return None
+        return self._backends[i]
+
+    async def _abackend(self, i: int):
+        if self._unresolved(i):
+            return await asyncio.to_thread(self._backend, i)   # a model load must not stall the loop
+        return self._backends[i]
+
+    def _admit(self, i: int, attempt: int, end: float):
+        """Timeout for the next attempt on backend i, or None to move on (breaker open, no time left)."""
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return None
+        if not self._breakers[i].allow():
+            metrics.incr("llm.breaker_rejections")
+            return None
+        if i and not attempt:
+            metrics.incr("llm.failovers")
+        return min(self.call_timeout, remaining)
+
+    def _failed(self, i: int, attempt: int, error: Exception, end: float):
+        """
+        Records a failure; returns the backoff before retrying backend i, or
+        None to move on. Non-retryable errors are re-raised.
+        """
+        metrics.incr("llm.call_failures")
+        if not is_retryable(error):
+            self._breakers[i].release()
+            raise error
+        self._breakers[i].record_failure()
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = retry_after(error) or backoff_delay(attempt, self.base_delay, self.max_delay)
+        if time.monotonic() + delay >= end:
+            return None
+        metrics.incr("llm.retries")
+        return delay
+
+    def _unavailable(self, last_error):
+        reason = "circuit open or deadline passed" if last_error is None else "all backends failed"
+        return LLMUnavailableError(f"LLM unavailable: {reason}")
+
+    async def ainvoke(self, messages, **kwargs):
+        end = time.monotonic() + self.deadline
+        last_error = None
+        for i in range(len(self._backends)):
+            for attempt in range(self.max_attempts):
+                timeout = self._admit(i, attempt, end)
+                if timeout is None:
+                    break
+                try:
+                    backend = await self._abackend(i)
+                    if backend is None:
+                        break
+                    result = await asyncio.wait_for(backend.ainvoke(messages, **kwargs), timeout)
+                except BaseException as e:
+                    if not isinstance(e, Exception):   # cancelled: no verdict on the backend
+                        self._breakers[i].release()
+                        raise
+                    last_error = e
+                    delay = self._failed(i, attempt, e, end)
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+                    continue
+                self._breakers[i].record_success()
+                return result
+        raise self._unavailable(last_error) from last_error
+
+    def invoke(self, messages, **kwargs):
+        """Sync path: same policy; per-attempt timeouts are left to the backend's client."""
+        end = time.monotonic() + self.deadline
+        last_error = None
+        for i in range(len(self._backends)):
+            for attempt in range(self.max_attempts):
+                if self._admit(i, attempt, end) is None:
+                    break
+                backend = self._backend(i)
+                if backend is None:
+                    break
+                try:
+                    result = backend.invoke(messages, **kwargs)
+                except BaseException as e:
+                    if not isinstance(e, Exception):
+                        self._breakers[i].release()
+                        raise
+                    last_error = e
+                    delay = self._failed(i, attempt, e, end)
+                    if delay is None:
+                        break
+                    time.sleep(delay)
+                    continue
+                self._breakers[i].record_success()
+                return result
+        raise self._unavailable(last_error) from last_error
+
+    async def astream(self, messages, **kwargs):
+        end = time.monotonic() + self.deadline
+        last_error = None
+        for i in range(len(self._backends)):
+            for attempt in range(self.max_attempts):
+                timeout = self._admit(i, attempt, end)
+                if timeout is None:
+                    break
+                try:
+                    backend = await self._abackend(i)
+                except BaseException:
+                    self._breakers[i].release()
+                    raise
+                if backend is None:
+                    break
+                chunks = astream_chunks(backend, messages, **kwargs).__aiter__()
+                try:
+                    first = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    self._breakers[i].record_success()
+                    return
+                except BaseException as e:
+                    await chunks.aclose()
+                    if not isinstance(e, Exception):
+                        self._breakers[i].release()
+                        raise
+                    last_error = e
+                    delay = self._failed(i, attempt, e, end)
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+                    continue
+                self._breakers[i].record_success()
+                yield first
+                async for chunk in chunks:   # errors after the first chunk propagate
+                    yield chunk
+                return
+        raise self._unavailable(last_error) from last_error
+
+    def breaker_states(self) -> dict:
+        return {b.name: b.state for b in self._breakers}
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
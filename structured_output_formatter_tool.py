@@ -1,5 +1,6 @@
 import re
 import json
+import math
 
 # ---- Robust import for AbstractTool ----
 AbstractTool = None
@@ -31,6 +32,8 @@ class StructuredOutputFormatterTool(AbstractTool):
         "Default: Markdown table. "
         "If input begins with 'JSON:', returns structured itinerary JSON."
     )
+    cache_ttl = math.inf
+    compact_output = False   # the itinerary is the answer
 
     def _extract_fields(self, line):
         """Extract fields using regex."""
@@ -0,0 +1,283 @@
+"""
+Local stand-in for an OpenAI/Groq chat-completions endpoint.
+
+Answers POST /v1/chat/completions (and Groq's /openai/v1/chat/completions)
+from a script instead of a model, after a configurable time-to-first-token
+and at a configurable token rate, so the vacation agent and the demos can be
+load-tested at hundreds of sessions without network access or a GPU.
+
+    python stub_llm_server.py --port 8000 --ttft 0.3 --tokens-per-s 60 --capacity 16
+    python stub_llm_server.py --script my_script.json
+
+Point the LLM wrappers at it:
+
+    GROQ_BASE_URL=http://127.0.0.1:8000 GROQ_API_KEY=stub ...       # TinyLlamaLLM
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=stub ... # OpenAIAdapter demos
+
+A script is a JSON object:
+
+    {
+      "steps":  ["<reply with 0 observations so far>", "<reply after 1>", ...],
+      "answer": "<reply to prompts that are not ReAct prompts>",
+      "rules":  [{"contains": "essay", "steps": [...], "answer": "..."}]
+    }
+
+The reply to a ReAct prompt is steps[number of observations in the
+conversation] (the last step repeats); the first rule whose "contains" text
+appears in the last user message overrides the defaults. The default script
+runs one offline trip_budget call and then gives a final answer.
+
+Timing: each request waits for one of --capacity generation slots (0 =
+unlimited), then --ttft seconds, then streams the reply word by word at
+--tokens-per-s (0 = all at once). --jitter randomizes both by +/- that fraction.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+from async_http import HTTPError, StreamingResponse, start_http_server
+from metrics import metrics
+
+DEFAULT_SCRIPT = {
+    "steps": [
+        json.dumps({
+            "thought": "I should estimate the trip cost before planning the days.",
+            "action": {
+                "tool_name": "trip_budget",
+                "tool_input": json.dumps({
+                    "travelers": 2, "days": 5, "origin": "JFK", "destination": "MIA",
+                    "hotel_per_night": 150, "food_per_day": 45, "activities_total": 300,
+                }),
+            },
+        }),
+        json.dumps({
+            "thought": "I have the cost breakdown, so I can write the plan.",
+            "action": {
+                "tool_name": "final_answer",
+                "tool_input": (
+                    "| Day | Activities | Food | Notes |\n|---|---|---|---|\n"
+                    "| 1 | Arrive, beach walk | Seafood dinner | Check in |\n"
+                    "| 2 | Museum, old town | Local cafe | |\n"
+                    "| 3 | Snorkeling trip | Street food | Book ahead |\n"
+                    "| 4 | Park and market | Food hall | |\n"
+                    "| 5 | Depart | Breakfast | Late checkout |\n\n"
+                    "Estimated total: about $3,000 for two travelers."
+                ),
+            },
+        }),
+    ],
+    "answer": (
+        "| Day | Activities | Food | Notes |\n|---|---|---|---|\n"
+        "| 1 | Arrive, beach walk | Seafood dinner | Check in |\n"
+        "| 2 | Museum, old town | Local cafe | |\n\n"
+        "Cost summary: the estimate fits within the budget."
+    ),
+}
+
+_TOKEN = re.compile(r"\s*\S+\s*|\s+")
+
+
+def split_tokens(text: str) -> list:
+    """Word-sized pieces that join back into `text`; one piece ~ one streamed token."""
+    return _TOKEN.findall(text)
+
+
+def _content(message) -> str:
+    content = message.get("content") if isinstance(message, dict) else None
+    if isinstance(content, list):  # OpenAI content parts
+        content = "".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return content or ""
+
+
+class ScriptedResponder:
+    """Chooses the reply for a list of chat messages from a script (see module docstring)."""
+
+    def __init__(self, script: dict = None):
+        self.script = script or DEFAULT_SCRIPT
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def reply(self, messages: list) -> str:
+        last_user = next((_content(m) for m in reversed(messages) if m.get("role") == "user"), "")
+        script = self.script
+        for rule in self.script.get("rules", []):
+            if rule.get("contains", "").lower() in last_user.lower():
+                script = {**self.script, **rule}
+                break
+
+        is_react = any("tool_name" in _content(m) for m in messages if m.get("role") == "system")
+        steps = script.get("steps") or []
+        if not is_react or not steps:
+            return script.get("answer", "")
+        observations = sum(
+            1 for m in messages
+            if m.get("role") == "tool" or _content(m).lstrip().lower().startswith("observation")
+        )
+        return steps[min(observations, len(steps) - 1)]
+
+
+class StubLLMServer:
+
+    def __init__(self, responder: ScriptedResponder = None, ttft: float = 0.2,
+                 tokens_per_s: float = 50.0, capacity: int = 0, jitter: float = 0.0):
+        self.responder = responder or ScriptedResponder()
+        self.ttft = ttft
+        self.tokens_per_s = tokens_per_s
+        self.capacity = capacity
+        self.jitter = jitter
+        self._slots = asyncio.Semaphore(capacity) if capacity else None
+        self._active = 0
+        self._server = None
+
+    def _jittered(self, seconds: float) -> float:
+        if self.jitter and seconds:
+            return max(0.0, seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+        return seconds
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000):
+        self._server = await start_http_server(self.handle, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    # ---------- generation ----------
+
+    async def _generate(self, tokens: list):
+        """Yields tokens on the configured schedule while holding one capacity slot."""
+        queued = time.perf_counter()
+        if self._slots is not None:
+            await self._slots.acquire()
+        metrics.observe("stub.queue_wait_s", time.perf_counter() - queued)
+        self._active += 1
+        metrics.gauge("stub.active_generations", self._active)
+        try:
+            await asyncio.sleep(self._jittered(self.ttft))
+            delay = 1.0 / self.tokens_per_s if self.tokens_per_s else 0.0
+            for token in tokens:
+                if delay:
+                    await asyncio.sleep(self._jittered(delay))
+                yield token
+            metrics.incr("stub.tokens", len(tokens))
+        finally:
+            self._active -= 1
+            metrics.gauge("stub.active_generations", self._active)
+            if self._slots is not None:
+                self._slots.release()
+
+    async def completion(self, body: dict):
+        messages = body.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise HTTPError(400, "Field 'messages' must be a non-empty list.")
+        metrics.incr("stub.requests")
+
+        text = self.responder.reply(messages)
+        max_tokens = body.get("max_tokens")
+        tokens = split_tokens(text)
+        finish_reason = "stop"
+        if max_tokens and len(tokens) > max_tokens:
+            tokens, finish_reason = tokens[:max_tokens], "length"
+
+        meta = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+        }
+        prompt_tokens = sum(len(_content(m)) for m in messages) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+
+        if body.get("stream"):
+            return StreamingResponse(self._sse(tokens, meta, finish_reason), content_type="text/event-stream")
+
+        parts = [token async for token in self._generate(tokens)]
+        return 200, {
+            **meta,
+            "object": "chat.completion",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(parts)},
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        }
+
+    async def _sse(self, tokens, meta, finish_reason):
+        def event(delta, finish=None):
+            chunk = {**meta, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        yield event({"role": "assistant", "content": ""})
+        async for token in self._generate(tokens):
+            yield event({"content": token})
+        yield event({}, finish_reason)
+        yield "data: [DONE]\n\n"
+
+    # ---------- HTTP ----------
+
+    async def handle(self, request):
+        path = request.path.rstrip("/")
+        if path.startswith("/openai"):  # Groq SDK prefix
+            path = path[len("/openai"):]
+
+        if request.method == "GET" and path == "/health":
+            return 200, {"status": "ok", "active_generations": self._active}
+        if request.method == "GET" and path == "/metrics":
+            return 200, metrics.snapshot()
+        if request.method == "GET" and path == "/v1/models":
+            return 200, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "local"}]}
+        if path == "/v1/chat/completions":
+            if request.method != "POST":
+                raise HTTPError(405, f"{request.method} not allowed on {request.path}")
+            return await self.completion(request.json())
+        raise HTTPError(404, f"No route for {request.path}")
+
+
+# =========================
+#   MAIN ENTRY
+# =========================
+
+async def main():
+    parser = argparse.ArgumentParser(description="Scripted OpenAI/Groq-compatible chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--script", help="JSON script file (default: one trip_budget call, then an answer)")
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--tokens-per-s", type=float, default=50.0, help="per request; 0 = no delay")
+    parser.add_argument("--capacity", type=int, default=0, help="concurrent generations; 0 = unlimited")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- fraction on every delay")
+    args = parser.parse_args()
+
+    responder = ScriptedResponder.from_file(args.script) if args.script else ScriptedResponder()
+    server = StubLLMServer(responder, args.ttft, args.tokens_per_s, args.capacity, args.jitter)
+    await server.start(args.host, args.port)
+    print(f"Stub LLM server listening on http://{args.host}:{args.port}/v1")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,52 @@
+import asyncio
+import io
+import json
+
+from batch_planner import (
+    BadInputLine,
+    BatchPlanner,
+    compact_results,
+    completed_ids,
+    read_queries,
+)
+
+
+class EchoPlanner(BatchPlanner):
+
+    async def plan_one(self, query_id, query):
+        if isinstance(query, BadInputLine):
+            return await super().plan_one(query_id, query)
+        return {"id": query_id, "query": query, "answer": query.upper(), "latency_s": 0.0}
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def test_bad_input_line_becomes_an_error_record(tmp_path):
+    path = write_lines(tmp_path / "in.jsonl", [
+        '{"id": "a", "query": "miami"}', '{not json', '[1, 2]', '"denver"', '{"id": "b"}',
+    ])
+    out = io.StringIO()
+    planner = EchoPlanner(shared=object(), concurrency=2, prefetch=False)
+    assert asyncio.run(planner.run(read_queries(path), out)) == 5
+    rows = {row["id"]: row for row in map(json.loads, out.getvalue().splitlines())}
+    assert rows["a"]["answer"] == "MIAMI" and rows["4"]["answer"] == "DENVER"
+    assert all("bad input" in rows[i]["error"] for i in ("2", "3", "5"))
+    assert planner.errors == 3
+
+
+def test_retried_id_is_judged_by_its_latest_line(tmp_path):
+    path = write_lines(tmp_path / "out.jsonl", [
+        '{"id": "a", "error": "timed out"}',
+        '{"id": "b", "answer": "ok"}',
+        '{"id": "c", "error": "boom"}',
+        '{"id": "a", "answer": "ok"}',
+        '{"id": "c", "ans',               # torn last line
+    ])
+    assert completed_ids(path) == {"a", "b"}
+    assert completed_ids(path, include_errors=True) == {"a", "b", "c"}
+    assert compact_results(path) == 3
+    rows = [json.loads(line) for line in open(path)]
+    assert [(r["id"], "error" in r) for r in rows] == [("a", False), ("b", False), ("c", True)]
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from batch_scheduler import _Request, generation_params
+
+
+def test_generation_params_maps_max_tokens():
+    llm = SimpleNamespace(default_gen_kwargs={"temperature": 0.7, "max_new_tokens": 2048})
+    assert generation_params(llm, {"max_tokens": 8}) == {"temperature": 0.7, "max_new_tokens": 8}
+    assert generation_params(SimpleNamespace(), {})["max_new_tokens"] == 512
+
+
+def test_finish_after_cancel_while_queued():
+    request = _Request([1, 2], {}, streaming=True)
+    request.cancel()
+    assert request.cancelled and request.future.cancelled()
+    request.finish()   # must not raise InvalidStateError
+    assert request.chunks.get_nowait() is None
+
+
+def test_cancel_after_admission_keeps_future_settable():
+    request = _Request([1, 2], {}, streaming=False)
+    assert request.future.set_running_or_notify_cancel()
+    request.cancel()
+    assert request.cancelled and not request.future.cancelled()
+    request.text = "partial"
+    request.finish()
+    assert request.future.result() == "partial"
@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from destination_ann_index import DestinationANNIndex
+from destination_catalog import (
+    CATALOG_VERSION,
+    DEFAULT_SOURCE,
+    DestinationCatalog,
+    build_catalog,
+    build_catalog_from_jsonl,
+    top_k_indices,
+)
+from travel_matrix import home_state
+
+RECORDS = [
+    {"name": "Clearwater Beach, Florida", "state": "FL", "lat": 27.97, "lon": -82.83,
+     "features": {"beach": 1.0, "water_sports": 0.8}},
+    {"name": "San Diego, California", "state": "CA", "lat": 32.72, "lon": -117.16,
+     "features": {"beach": 0.9, "food": 0.6}},
+    {"name": "Aspen, Colorado", "state": "CO", "lat": 39.19, "lon": -106.82,
+     "features": {"skiing": 1.0, "hiking": 0.8}},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return DestinationCatalog(build_catalog(RECORDS, str(tmp_path / "catalog")))
+
+
+def test_top_k_indices_is_best_first():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.1])
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 2]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0, 4]
+    assert top_k_indices(scores, 0).size == 0
+
+
+@pytest.mark.parametrize("origin", ["MIA", "FL", "Florida", "miami"])
+def test_home_state_from_airport_state_or_city(origin):
+    assert home_state(origin) == "FL"
+
+
+def test_exclude_home_state_for_airport_origin(catalog):
+    names = [r["destination"] for r in catalog.match(["beach"], "MIA", k=3)]
+    assert names[0] == "Clearwater Beach, Florida"
+    names = [r["destination"] for r in catalog.match(["beach"], "MIA", k=3, exclude_home_state=True)]
+    assert "Clearwater Beach, Florida" not in names
+
+
+def test_older_catalog_version_is_rejected(catalog):
+    meta_path = os.path.join(catalog.path, "meta.json")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["version"] = CATALOG_VERSION - 1
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError, match="rebuild"):
+        DestinationCatalog(catalog.path)
+
+
+@pytest.fixture(scope="module")
+def full_catalog(tmp_path_factory):
+    out = str(tmp_path_factory.mktemp("catalog") / "catalog")
+    return DestinationCatalog(build_catalog_from_jsonl(DEFAULT_SOURCE, out))
+
+
+@pytest.mark.parametrize("kind", ["hnsw", "ivf"])
+@pytest.mark.parametrize("activities, origin", [
+    (["beach", "nightlife"], "DEN"),
+    (["skiing", "hiking"], "MIA"),
+    (["museums", "food"], "FL"),
+])
+def test_ann_top_k_matches_exact(full_catalog, kind, activities, origin):
+    pytest.importorskip("faiss")
+    index = DestinationANNIndex.build(full_catalog, kind=kind)
+    for exclude in (False, True):
+        exact = full_catalog.match(activities, origin, k=5, exclude_home_state=exclude)
+        approx = full_catalog.match(activities, origin, k=5, exclude_home_state=exclude, index=index)
+        assert [r["destination"] for r in approx] == [r["destination"] for r in exact]
+
+
+def test_home_state_filter_still_returns_k_with_small_oversample(full_catalog):
+    pytest.importorskip("faiss")
+    index = DestinationANNIndex.build(full_catalog, oversample=1)
+    results = full_catalog.match(["beach"], "MIA", k=8, exclude_home_state=True, index=index)
+    assert len(results) == 8
+    assert not any(r["destination"].endswith("Florida") for r in results)
+
+
+def test_ivf_builds_on_a_tiny_catalog(catalog):
+    pytest.importorskip("faiss")
+    index = DestinationANNIndex.build(catalog, kind="ivf")
+    names = [r["destination"] for r in catalog.match(["skiing"], "DEN", k=1, index=index)]
+    assert names == ["Aspen, Colorado"]
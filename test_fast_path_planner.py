@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+
+from activity_search_tool import ActivitySearchTool
+from budget_tool import BudgetTool
+from fast_path_planner import FastPathPlanner, parse_trip_request
+from flight_search_tool import FlightSearchTool
+from hotel_search_tool import HotelSearchTool
+from restaurant_search_tool import RestaurantSearchTool
+from vacation_planner_agent import SimpleToolExecutor
+
+
+def concrete(cls):
+    # Newer fairlib releases add an abstract acall(); these tools implement use()
+    sub = type(cls.__name__, (cls,), {})
+    sub.__abstractmethods__ = frozenset()
+    return sub
+
+
+class Registry(dict):
+    def get_tool(self, name):
+        return self.get(name)
+
+
+class NoLLM:
+    async def ainvoke(self, messages, **kwargs):
+        raise AssertionError("the LLM should not be called")
+
+
+@pytest.mark.parametrize("text, days", [
+    ("A week in Miami from Denver", 7),
+    ("two weeks in Miami from Denver", 14),
+    ("5 nights in Miami from Denver", 6),
+    ("a 4-day trip to Miami from Denver", 4),
+])
+def test_trip_length(text, days):
+    assert parse_trip_request(text)["days"] == days
+
+
+@pytest.mark.parametrize("text, budget", [
+    ("3 people, 4 days in Miami from Denver, $800 per person", 2400),
+    ("4 days in Miami from Denver with a budget of 2.5k", 2500),
+    ("4 days in Miami from Denver, budget $1,200", 1200),
+    ("4 days in Miami from Denver", None),
+])
+def test_budget(text, budget):
+    assert parse_trip_request(text)["budget_usd"] == budget
+
+
+def test_slots():
+    slots = parse_trip_request("Plan 5 days in Miami for a couple flying from DEN; we love beaches and food")
+    assert slots["destination"]["iata"] == "MIA" and slots["origin"]["iata"] == "DEN"
+    assert slots["travelers"] == 2
+    assert "food" in slots["interests"]
+
+
+@pytest.mark.parametrize("text", ["A week in Miami", "Miami from Denver, sometime soon"])
+def test_missing_slot_is_none(text):
+    assert parse_trip_request(text) is None
+
+
+def test_unsupported_city_falls_back_before_any_tool_or_llm_call():
+    tools = [concrete(cls)() for cls in (FlightSearchTool, HotelSearchTool, RestaurantSearchTool,
+                                         ActivitySearchTool, BudgetTool)]
+    executor = SimpleToolExecutor(Registry({tool.name: tool for tool in tools}))
+    planner = FastPathPlanner(NoLLM(), executor)
+    assert parse_trip_request("A week in Seattle from Chicago") is not None
+    assert asyncio.run(planner.arun("A week in Seattle from Chicago")) is None
+
+
+def test_supported_trip_runs_the_tools_then_one_llm_call():
+    class Executor:
+        def supports(self, name, tool_input):
+            return True
+
+        async def aexecute_batch(self, calls, timeout=None, compact=True):
+            self.calls = calls
+            return [json.dumps({"hotels": [{"name": "Hotel A"}]}) if name == "hotel_search" else "{}"
+                    for name, _ in calls]
+
+    class LLM:
+        async def ainvoke(self, messages, **kwargs):
+            self.prompt = messages[-1].content
+            return "Day 1: beach"
+
+    executor, llm = Executor(), LLM()
+    answer = asyncio.run(FastPathPlanner(llm, executor).arun("A week in Miami from Denver"))
+    assert answer == "Day 1: beach"
+    assert len(executor.calls) == 5 and "Hotel A" in llm.prompt
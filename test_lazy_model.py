@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from lazy_model import WARMUP_TOKENS, LazyLLM
+from llm_cache import CachedLLM, LLMResponseStore
+
+
+class FakeLLM:
+
+    model_name = "fake"
+    default_gen_kwargs = {"temperature": 0.0, "do_sample": False}
+
+    def __init__(self):
+        self.calls = []
+        self.bound = []
+
+    def bind_event_bus(self, bus):
+        self.bound.append(bus)
+
+    def invoke(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        return "hi"
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        return "answer"
+
+
+def slow(llm, seconds=0.3):
+    def load():
+        time.sleep(seconds)
+        return llm
+    return load
+
+
+def test_construction_is_instant_and_warm_up_runs_first():
+    llm = FakeLLM()
+    lazy = LazyLLM(slow(llm))
+    assert not lazy.ready
+    assert lazy.invoke([]) == "hi"
+    assert lazy.ready
+    assert llm.calls == [{"max_tokens": WARMUP_TOKENS}, {}]
+
+
+def test_bind_calls_are_replayed_after_load():
+    llm = FakeLLM()
+    lazy = LazyLLM(slow(llm), warm_up=False)
+    lazy.bind_event_bus("bus")
+    lazy.bind_cost_budget("budget")    # hook the model lacks: skipped, not an error
+    assert lazy.wait(timeout=5) is llm
+    assert llm.bound == ["bus"]
+
+
+def test_load_error_reaches_every_call():
+    lazy = LazyLLM(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        lazy.invoke([])
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(lazy.ainvoke([]))
+
+
+def test_cached_call_does_not_block_the_loop_while_loading(tmp_path):
+    llm = CachedLLM(LazyLLM(slow(FakeLLM(), 0.5)), LLMResponseStore(str(tmp_path / "cache.db")))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        reply = await llm.ainvoke([{"role": "user", "content": "q"}])
+        task.cancel()
+        return reply, ticks
+
+    reply, ticks = asyncio.run(run())
+    assert reply == "answer"
+    assert ticks >= 25
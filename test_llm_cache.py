@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from llm_cache import CachedLLM, LLMResponseStore
+
+
+class CountingLLM:
+
+    model_name = "fake"
+    async_streaming = True
+
+    def __init__(self, temperature=0.0):
+        self.default_gen_kwargs = {"temperature": temperature}
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return f"reply {self.calls}"
+
+    async def ainvoke(self, messages, **kwargs):
+        return self.invoke(messages, **kwargs)
+
+    async def astream(self, messages, **kwargs):
+        self.calls += 1
+        for word in ("streamed ", "reply"):
+            yield word
+
+
+class ThreadRecordingStore(LLMResponseStore):
+
+    def get(self, key):
+        self.get_thread = threading.get_ident()
+        return super().get(key)
+
+    def put(self, key, reply):
+        self.put_thread = threading.get_ident()
+        return super().put(key, reply)
+
+
+PROMPT = [{"role": "user", "content": "plan a trip"}]
+
+
+def test_miss_then_hit(tmp_path):
+    inner = CountingLLM()
+    llm = CachedLLM(inner, LLMResponseStore(str(tmp_path / "cache.db")))
+    assert llm.invoke(PROMPT) == "reply 1"
+    assert llm.invoke(PROMPT) == "reply 1"
+    assert asyncio.run(llm.ainvoke(PROMPT)) == "reply 1"
+    assert llm.invoke([{"role": "user", "content": "other"}]) == "reply 2"
+    assert inner.calls == 2
+
+
+def test_sampling_models_bypass_the_cache(tmp_path):
+    inner = CountingLLM(temperature=0.7)
+    llm = CachedLLM(inner, LLMResponseStore(str(tmp_path / "cache.db")))
+    assert llm.invoke(PROMPT) == "reply 1"
+    assert llm.invoke(PROMPT) == "reply 2"
+    assert llm.invoke(PROMPT, temperature=0) == "reply 3"
+    assert llm.invoke(PROMPT, temperature=0) == "reply 3"   # a deterministic call override is cached
+
+
+def test_streamed_reply_is_stored_once_complete(tmp_path):
+    inner = CountingLLM()
+    llm = CachedLLM(inner, LLMResponseStore(str(tmp_path / "cache.db")))
+
+    async def collect():
+        return [chunk async for chunk in llm.astream(PROMPT)]
+
+    assert asyncio.run(collect()) == ["streamed ", "reply"]
+    assert asyncio.run(collect()) == ["streamed reply"]
+    assert llm.invoke(PROMPT) == "streamed reply" and inner.calls == 1
+
+
+def test_async_store_access_is_off_the_loop_thread(tmp_path):
+    store = ThreadRecordingStore(str(tmp_path / "cache.db"))
+    llm = CachedLLM(CountingLLM(), store)
+
+    async def run():
+        await llm.ainvoke(PROMPT)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert store.get_thread != loop_thread and store.put_thread != loop_thread
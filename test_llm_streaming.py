@@ -0,0 +1,139 @@
+import asyncio
+
+from fairlib.core.message import Message
+
+from async_console import agent_chunks
+from llm_streaming import FinalAnswerFilter, StreamingLLM, astream_answer
+from metrics import metrics
+
+REPLY = ["Thought: I know this.\n", "Final ", "Answer: ", "Sunny ", "Miami ", "trip"]
+PROMPT = [Message(role="user", content="plan a trip")]
+
+
+class AsyncStreamLLM:
+
+    async_streaming = True
+
+    def __init__(self):
+        self.streamed = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        return "".join(REPLY)
+
+    async def astream(self, messages, **kwargs):
+        self.streamed += 1
+        for chunk in REPLY:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+class SyncStreamLLM:
+
+    def ainvoke(self, messages, **kwargs):
+        raise AssertionError("should have streamed")
+
+    def stream(self, messages, **kwargs):
+        for chunk in REPLY:
+            yield Message(role="assistant", content=chunk)
+
+
+class InvokeOnlyLLM:
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        return Message(role="assistant", content="".join(REPLY))
+
+
+class PlannerAgent:
+    """Stands in for SimpleAgent: one planner call, then returns the parsed answer."""
+
+    def __init__(self, llm):
+        self.llm = StreamingLLM(llm)
+        self.raw = None
+
+    async def arun(self, message):
+        reply = await self.llm.ainvoke(PROMPT)
+        self.raw = getattr(reply, "content", reply)
+        return self.raw.split("Final Answer:", 1)[1].strip()
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_final_answer_filter_waits_for_the_marker():
+    answer = FinalAnswerFilter()
+    assert [answer.feed(c) for c in REPLY] == ["", "", "", "Sunny ", "Miami ", "trip"]
+
+
+def test_answer_streams_from_native_astream():
+    metrics.reset()
+    agent = PlannerAgent(AsyncStreamLLM())
+
+    chunks = asyncio.run(collect(astream_answer(agent, "go")))
+
+    assert chunks == ["Sunny ", "Miami ", "trip"]
+    assert agent.raw == "".join(REPLY)  # the planner still parses the whole reply
+    assert metrics.summary("llm.time_to_first_token_s")["count"] == 1
+    assert metrics.summary("agent.time_to_first_answer_token_s")["count"] == 1
+
+
+def test_sync_stream_is_pumped_from_a_thread():
+    metrics.reset()
+    agent = PlannerAgent(SyncStreamLLM())
+
+    chunks = asyncio.run(collect(astream_answer(agent, "go")))
+
+    assert "".join(chunks) == "Sunny Miami trip"
+    assert isinstance(agent.raw, str) and agent.raw.endswith("Miami trip")
+    assert metrics.summary("llm.time_to_first_token_s")["count"] == 1
+
+
+def test_model_without_streaming_yields_the_answer_once():
+    metrics.reset()
+    llm = InvokeOnlyLLM()
+    agent = PlannerAgent(llm)
+
+    chunks = asyncio.run(collect(astream_answer(agent, "go")))
+
+    assert llm.calls == 1
+    assert "".join(chunks).endswith("Miami trip")
+    assert metrics.summary("agent.time_to_first_answer_token_s")["count"] == 1
+
+
+def test_outside_a_turn_calls_pass_straight_through():
+    metrics.reset()
+    llm = AsyncStreamLLM()
+
+    reply = asyncio.run(StreamingLLM(llm).ainvoke(PROMPT))
+
+    assert reply == "".join(REPLY)
+    assert llm.streamed == 0
+    assert metrics.summary("llm.time_to_first_token_s")["count"] == 0
+
+
+def test_concurrent_turns_only_see_their_own_tokens():
+    shared = AsyncStreamLLM()
+
+    async def run():
+        a, b = PlannerAgent(shared), PlannerAgent(shared)
+        b.llm = a.llm
+        return await asyncio.gather(collect(astream_answer(a, "a")), collect(astream_answer(b, "b")))
+
+    first, second = asyncio.run(run())
+    assert "".join(first) == "".join(second) == "Sunny Miami trip"
+
+
+def test_agent_chunks_streams_or_falls_back_to_arun():
+    class StreamingAgent(PlannerAgent):
+        def astream(self, message):
+            return astream_answer(self, message)
+
+    streamed = asyncio.run(collect(agent_chunks(StreamingAgent(AsyncStreamLLM()), "go")))
+    plain = asyncio.run(collect(agent_chunks(PlannerAgent(AsyncStreamLLM()), "go")))
+
+    assert streamed == ["Sunny ", "Miami ", "trip"]
+    assert plain == ["Sunny Miami trip"]
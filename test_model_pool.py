@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from model_pool import ModelPool
+
+
+class Loads:
+    """Factory that counts loads and returns a fresh object per load."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.count = 0
+
+    def __call__(self, model_name, **kwargs):
+        self.count += 1
+        time.sleep(self.delay)
+        return {"name": model_name, **kwargs}
+
+
+def test_concurrent_gets_share_one_load():
+    factory = Loads(delay=0.1)
+    pool = ModelPool(factory)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(pool.get("m"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert factory.count == 1
+    assert all(m is models[0] for m in models)
+    assert pool.stats()["m"]["refs"] == 5
+
+
+def test_kwargs_are_separate_models():
+    pool = ModelPool(Loads())
+    assert pool.get("m") is not pool.get("m", backend="gguf")
+
+
+def test_evict_only_unreferenced():
+    factory = Loads()
+    pool = ModelPool(factory)
+    pool.get("m")
+    assert not pool.evict("m")
+    pool.release("m")
+    assert pool.evict_unused() == 1
+    pool.get("m")
+    assert factory.count == 2
+
+
+def test_max_loaded_evicts_least_recently_used_idle_model():
+    pool = ModelPool(Loads(), max_loaded=2)
+    pool.get("a"), pool.release("a")
+    pool.get("b")
+    pool.get("c")
+    assert set(pool.stats()) == {"b", "c"}
+
+
+def test_failed_load_is_retried():
+    calls = []
+
+    def factory(name, **kwargs):
+        calls.append(name)
+        if len(calls) == 1:
+            raise OSError("download failed")
+        return object()
+
+    pool = ModelPool(factory)
+    with pytest.raises(OSError):
+        pool.get("m")
+    assert pool.get("m") is not None and len(calls) == 2
+
+
+def test_lazy_returns_before_the_load_finishes():
+    pool = ModelPool(Loads(delay=0.2))
+    start = time.perf_counter()
+    lazy = pool.lazy("m", warm_up=False)
+    assert time.perf_counter() - start < 0.1
+    assert lazy.wait(timeout=5)["name"] == "m"
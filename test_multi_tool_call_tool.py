@@ -0,0 +1,61 @@
+import asyncio
+import json
+import time
+
+from multi_tool_call_tool import MultiToolCallTool
+from tool_cache import ToolResultCache
+from tool_worker_pool import ToolWorkerPool
+from vacation_planner_agent import SimpleToolExecutor
+
+
+def concrete(cls):
+    # Newer fairlib releases add an abstract acall(); these tools implement use()
+    sub = type(cls.__name__, (cls,), {})
+    sub.__abstractmethods__ = frozenset()
+    return sub
+
+
+class Registry(dict):
+    def get_tool(self, name):
+        return self.get(name)
+
+
+class SlowTool:
+    name = "slow"
+
+    def use(self, tool_input: str) -> str:
+        time.sleep(0.1)
+        return json.dumps({"echo": tool_input})
+
+
+def make_executor(workers: int):
+    registry = Registry(slow=SlowTool())
+    executor = SimpleToolExecutor(registry, call_timeout=5, pool=ToolWorkerPool(max_workers=workers),
+                                  cache=ToolResultCache())
+    registry["multi_tool_call"] = concrete(MultiToolCallTool)(executor)
+    return executor
+
+
+def test_concurrent_batches_do_not_starve_the_pool():
+    executor = make_executor(workers=2)
+    batch = json.dumps([{"tool": "slow", "input": {"n": i}} for i in range(2)])
+
+    async def run():
+        return await asyncio.gather(*(
+            executor.aexecute("multi_tool_call", batch, compact=False) for _ in range(4)
+        ))
+
+    start = time.perf_counter()
+    outputs = asyncio.run(run())
+    assert time.perf_counter() - start < 3
+    for output in outputs:
+        results = json.loads(output)["results"]
+        assert [r["observation"]["echo"] for r in results] == ['{"n": 0}', '{"n": 1}']
+
+
+def test_invalid_input_is_reported():
+    executor = make_executor(workers=1)
+    output = asyncio.run(executor.aexecute("multi_tool_call", "[]", compact=False))
+    assert "error" in json.loads(output)
+    nested = json.dumps([{"tool": "multi_tool_call", "input": "[]"}])
+    assert "cannot be nested" in asyncio.run(executor.aexecute("multi_tool_call", nested, compact=False))
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from observation_compactor import ObservationCompactor
+from observation_lookup_tool import ObservationLookupTool
+
+
+def concrete(cls):
+    # Newer fairlib releases add an abstract acall(); this tool implements use()
+    sub = type(cls.__name__, (cls,), {})
+    sub.__abstractmethods__ = frozenset()
+    return sub
+
+
+def test_drops_redundant_keys_and_keeps_a_ref():
+    compactor = ObservationCompactor()
+    full = json.dumps({"inputs": {"days": 4}, "total": 1234.5678, "empty": [], "hotels": ["a", "b"]}, indent=2)
+    slim = json.loads(compactor.compact(full))
+    assert slim["total"] == 1234.57 and slim["hotels"] == ["a", "b"]
+    assert "inputs" not in slim and "empty" not in slim
+    assert compactor.store.get(slim["ref"]) == full
+
+
+def test_lossless_result_has_no_ref():
+    compactor = ObservationCompactor()
+    slim = json.loads(compactor.compact(json.dumps({"total": 3})))
+    assert slim == {"total": 3}
+
+
+def test_truncated_top_level_list_carries_a_ref():
+    compactor = ObservationCompactor(max_items=2)
+    full = json.dumps([{"name": f"hotel {i}"} for i in range(6)])
+    slim = json.loads(compactor.compact(full))
+    assert slim["items"][-1] == "+4 more"
+    assert compactor.store.get(slim["ref"]) == full
+
+
+def test_lookup_pages_through_the_full_list():
+    compactor = ObservationCompactor(max_items=2)
+    ref = json.loads(compactor.compact(json.dumps({"hotels": list(range(6))})))["ref"]
+    tool = concrete(ObservationLookupTool)(compactor.store)
+    page = json.loads(tool.use(json.dumps({"ref": ref, "key": "hotels", "offset": 4})))
+    assert page["total"] == 6 and page["items"] == [4, 5]
+
+
+@pytest.mark.parametrize("tool_input", [
+    "[1, 2]",
+    "42",
+    '{"ref": "REF", "key": "hotels", "offset": "two"}',
+    '{"ref": "REF", "key": "hotels", "limit": null}',
+    '{"ref": "REF", "key": ["hotels"]}',
+])
+def test_lookup_rejects_bad_input_with_a_json_error(tool_input):
+    compactor = ObservationCompactor(max_items=2)
+    ref = json.loads(compactor.compact(json.dumps({"hotels": list(range(6))})))["ref"]
+    tool = concrete(ObservationLookupTool)(compactor.store)
+    assert "error" in json.loads(tool.use(tool_input.replace("REF", ref)))
@@ -0,0 +1,81 @@
+from fairlib.core.message import Message
+
+from persistent_memory import PersistentMemory, list_sessions
+
+
+def words(text):
+    return len(str(text or "").split())
+
+
+def contents(history):
+    return [m.content for m in history]
+
+
+def fill(memory, turns):
+    memory.add_message(Message(role="system", content="you plan trips"))
+    for n in range(turns):
+        memory.add_message(Message(role="user", content=f"question {n}"))
+        memory.add_message(Message(role="assistant", content=f"answer {n}"))
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    memory = PersistentMemory(path)
+    fill(memory, 2)
+    memory.close()
+
+    resumed = PersistentMemory(path, session_id=memory.session_id)
+    assert contents(resumed.get_history()) == [
+        "you plan trips", "question 0", "answer 0", "question 1", "answer 1",
+    ]
+    assert resumed.resumed_messages == 5
+    listed = list_sessions(path)[0]
+    assert (listed["session_id"], listed["messages"]) == (memory.session_id, 5)
+    resumed.close()
+
+
+def test_resume_reads_only_the_recent_window(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    memory = PersistentMemory(path, max_tokens=10, count_tokens=words)
+    fill(memory, 20)
+    memory.close()
+
+    resumed = PersistentMemory(path, session_id=memory.session_id, max_tokens=10, count_tokens=words)
+    history = contents(resumed.get_history())
+    assert history[0] == "you plan trips"              # pinned rows are always loaded
+    assert history[-2:] == ["question 19", "answer 19"]
+    assert history[1].startswith("question")           # starts on a turn boundary
+    assert resumed.resumed_messages < 41
+    resumed.close()
+
+
+def test_load_older_pages_back_to_the_start(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    memory = PersistentMemory(path, max_tokens=10, count_tokens=words)
+    fill(memory, 20)
+    memory.close()
+
+    resumed = PersistentMemory(path, session_id=memory.session_id, max_tokens=10, count_tokens=words)
+    in_window = contents(resumed.get_history())[1:]
+    pages = []
+    while page := resumed.load_older(7):
+        pages.append(contents(page))
+    older = [text for page in reversed(pages) for text in page]
+    expected = [text for n in range(20) for text in (f"question {n}", f"answer {n}")]
+    assert older + in_window == expected
+    assert contents(resumed.get_history())[1:] == in_window   # the window itself is untouched
+    resumed.close()
+
+
+def test_summary_is_persisted(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    def summarizer(evicted, previous):
+        return "talked about Miami"
+
+    memory = PersistentMemory(path, max_tokens=10, count_tokens=words, summarizer=summarizer)
+    fill(memory, 6)
+    memory.close()
+    resumed = PersistentMemory(path, session_id=memory.session_id, max_tokens=10, count_tokens=words)
+    assert resumed.summary == "talked about Miami"
+    resumed.close()
@@ -0,0 +1,48 @@
+from prefix_cache import PrefixKVStore, common_prefix_len
+
+
+class FakeCache:
+    """Stands in for a DynamicCache; records whether the store lock was held while copying."""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.copied_under_lock = None
+
+    def __deepcopy__(self, memo):
+        self.copied_under_lock = self.store._lock.locked()
+        return FakeCache(self.store, self.name + "'")
+
+
+def test_common_prefix_len():
+    assert common_prefix_len((1, 2, 3), (1, 2, 4, 5)) == 2
+    assert common_prefix_len((), (1,)) == 0
+
+
+def test_lookup_returns_a_copy_made_outside_the_lock():
+    store = PrefixKVStore()
+    kv = FakeCache(store, "a")
+    store.put((1, 2, 3), kv)
+    reused, copy = store.lookup((1, 2, 3, 4))
+    assert reused == 3 and copy is not kv and copy.name == "a'"
+    assert kv.copied_under_lock is False
+    assert store.lookup((9,)) == (0, None)
+
+
+def test_newer_session_entry_replaces_its_prefix():
+    store = PrefixKVStore()
+    store.put((1, 2), FakeCache(store, "old"))
+    store.put((1, 2, 3, 4), FakeCache(store, "new"))
+    assert store._tokens == 4
+    assert store.lookup((1, 2))[1].name == "new'"
+
+
+def test_pinned_tokens_count_against_the_budget():
+    store = PrefixKVStore(max_tokens=10)
+    store.pin(tuple(range(6)), FakeCache(store, "system"))
+    store.put((100, 101, 102), FakeCache(store, "s1"))
+    store.put((200, 201, 202), FakeCache(store, "s2"))     # 12 > 10: oldest session entry goes
+    assert store._tokens == 9
+    assert store.lookup((100, 101, 102))[0] == 0
+    store.put(tuple(range(300, 306)), FakeCache(store, "s3"))  # last session entry kept, pin dropped
+    assert store._tokens == 6 and not store.has_pinned(tuple(range(6)))
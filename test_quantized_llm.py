@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fairlib.core.message import Message
+
+import quantized_llm
+from quantized_llm import QuantizedLLM
+
+
+class FakeLlama:
+    """Records what llama.cpp would be asked; replies with a fixed text."""
+
+    def __init__(self, model_path=None, **kwargs):
+        self.model_path = model_path
+        self.kwargs = kwargs
+        self.calls = []
+
+    @classmethod
+    def from_pretrained(cls, repo_id, filename, **kwargs):
+        llama = cls(**kwargs)
+        llama.repo_id, llama.filename = repo_id, filename
+        return llama
+
+    def tokenize(self, data, add_bos=True):
+        return data.split()
+
+    def create_chat_completion(self, messages, stream=False, **kwargs):
+        self.calls.append({"messages": messages, "stream": stream, **kwargs})
+        if stream:
+            return iter([
+                {"choices": [{"delta": {"role": "assistant"}}]},
+                {"choices": [{"delta": {"content": "Final "}}]},
+                {"choices": [{"delta": {"content": "Answer: Miami"}}]},
+            ])
+        return {"choices": [{"message": {"content": "Final Answer: Miami"}}]}
+
+
+@pytest.fixture
+def fake_llama(monkeypatch):
+    monkeypatch.setattr(quantized_llm, "Llama", FakeLlama)
+
+
+def test_missing_llama_cpp_raises_a_clear_import_error(monkeypatch):
+    monkeypatch.setattr(quantized_llm, "Llama", None)
+    with pytest.raises(ImportError, match="pip install llama-cpp-python"):
+        QuantizedLLM()
+
+
+def test_weights_come_from_the_gguf_mirror_or_a_local_file(fake_llama):
+    llm = QuantizedLLM(quant="Q8_0", n_threads=2)
+    assert llm.model.repo_id == "TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF"
+    assert llm.model.filename == "tinyllama-1.1b-chat-v1.0.Q8_0.gguf"
+    assert llm.model.kwargs["n_threads"] == 2
+    assert llm.model_name.endswith(":Q8_0")
+
+    local = QuantizedLLM(model_name="/models/tiny.gguf")
+    assert local.model.model_path == "/models/tiny.gguf"
+    assert local.model_name == "tiny.gguf"
+
+    with pytest.raises(ValueError, match="pass a .gguf path"):
+        QuantizedLLM(model_name="some/other-model")
+
+
+def test_prompt_and_stop_reach_llama_cpp(fake_llama):
+    llm = QuantizedLLM(max_new_tokens=64, do_sample=False)
+    prompt = [
+        Message(role="system", content="You plan trips."),
+        {"role": "user", "content": "Miami?"},
+        Message(role="assistant", content=None),
+    ]
+
+    reply = llm.invoke(prompt, stop=["Observation:"], seed=7, max_tokens=32)
+
+    assert reply.role == "assistant" and reply.content == "Final Answer: Miami"
+    call = llm.model.calls[0]
+    assert call["messages"] == [
+        {"role": "system", "content": "You plan trips."},
+        {"role": "user", "content": "Miami?"},
+        {"role": "assistant", "content": ""},
+    ]
+    assert call["stop"] == ["Observation:"] and call["seed"] == 7
+    assert call["max_tokens"] == 32
+    assert call["temperature"] == 0.0 and call["top_p"] == 1.0   # greedy
+
+
+def test_sampling_defaults_and_no_stop_when_unset(fake_llama):
+    llm = QuantizedLLM(temperature=0.7, top_p=0.9)
+    asyncio.run(llm.ainvoke([Message(role="user", content="hi")]))
+    call = llm.model.calls[0]
+    assert (call["max_tokens"], call["temperature"], call["top_p"]) == (512, 0.7, 0.9)
+    assert "stop" not in call and "seed" not in call
+
+
+def test_stream_yields_only_content_deltas(fake_llama):
+    llm = QuantizedLLM()
+    assert list(llm.stream([Message(role="user", content="hi")], stop=["\n\n"])) == ["Final ", "Answer: Miami"]
+    assert llm.model.calls[0]["stream"] is True
+    assert llm.model.calls[0]["stop"] == ["\n\n"]
+    assert llm.count_tokens("three word prompt") == 3
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from resilient_llm import (
+    CircuitBreaker,
+    LLMUnavailableError,
+    ResilientLLM,
+    backoff_delay,
+    is_retryable,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+class FakeLLM:
+
+    def __init__(self, failures=0, status=503, name="fake"):
+        self.model_name = name
+        self.failures = failures
+        self.status = status
+        self.calls = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise StatusError(self.status)
+        return self.model_name
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise StatusError(self.status)
+        return self.model_name
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_is_retryable():
+    assert is_retryable(StatusError(429)) and is_retryable(StatusError(503))
+    assert is_retryable(asyncio.TimeoutError()) and is_retryable(ConnectionError())
+    assert not is_retryable(StatusError(400)) and not is_retryable(TypeError())
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 0.5, 8.0) <= min(8.0, 0.5 * 2 ** attempt)
+
+
+def test_breaker_opens_then_allows_one_trial():
+    clock = Clock()
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow() and breaker.state == breaker.HALF_OPEN
+    assert not breaker.allow()            # only one trial in flight
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED and breaker.allow()
+
+
+def test_released_trial_can_be_retried():
+    clock = Clock()
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_timeout=1, clock=clock)
+    breaker.record_failure()
+    clock.now = 1
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_retries_transient_errors():
+    llm = FakeLLM(failures=2)
+    resilient = ResilientLLM(llm, base_delay=0.001)
+    assert asyncio.run(resilient.ainvoke([])) == "fake"
+    assert llm.calls == 3 and resilient.breaker_states() == {"fake": "closed"}
+
+
+def test_non_retryable_error_is_raised_and_not_counted():
+    llm = FakeLLM(failures=10, status=400)
+    resilient = ResilientLLM(llm, fallbacks=[lambda: pytest.fail("fallback loaded")], failure_threshold=1)
+    with pytest.raises(StatusError):
+        asyncio.run(resilient.ainvoke([]))
+    with pytest.raises(StatusError):
+        resilient.invoke([])
+    assert llm.calls == 2 and resilient.breaker_states()["fake"] == "closed"
+
+
+def test_fails_over_to_lazily_loaded_fallback():
+    primary, fallback = FakeLLM(failures=10), FakeLLM(name="local")
+    loads = []
+    resilient = ResilientLLM(primary, fallbacks=[lambda: loads.append(1) or fallback],
+                             base_delay=0.001, failure_threshold=3)
+    assert asyncio.run(resilient.ainvoke([])) == "local"
+    assert asyncio.run(resilient.ainvoke([])) == "local"
+    assert primary.calls == 3 and len(loads) == 1      # breaker open: primary skipped
+    assert resilient.breaker_states() == {"fake": "open", "fallback1": "closed"}
+
+
+def test_all_backends_down():
+    resilient = ResilientLLM(FakeLLM(failures=10), max_attempts=2, base_delay=0.001)
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(resilient.ainvoke([]))
+
+
+def test_cancelled_half_open_trial_does_not_wedge_breaker():
+    class Hanging(FakeLLM):
+        async def ainvoke(self, messages, **kwargs):
+            await asyncio.sleep(10)
+
+    resilient = ResilientLLM(Hanging(), failure_threshold=1, reset_timeout=0)
+    breaker = resilient._breakers[0]
+    breaker.record_failure()
+
+    async def cancel_trial():
+        task = asyncio.create_task(resilient.ainvoke([]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert breaker.allow()
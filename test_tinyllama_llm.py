@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("groq")
+
+import tinyllama_llm  # noqa: E402
+from tinyllama_llm import TinyLlamaLLM  # noqa: E402
+
+
+class Concurrency:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.running -= 1
+
+
+def reply(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def fake_clients(seen: Concurrency):
+    def create(**params):
+        with seen:
+            time.sleep(0.05)
+        return reply("sync")
+
+    async def acreate(**params):
+        with seen:
+            await asyncio.sleep(0.05)
+        return reply("async")
+
+    sync = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    async_ = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=acreate)))
+    return sync, async_
+
+
+@pytest.fixture
+def llm_factory(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "stub")
+    seen = Concurrency()
+    sync, async_ = fake_clients(seen)
+    monkeypatch.setattr(tinyllama_llm, "get_async_client", lambda base_url=None: async_)
+
+    def make(max_in_flight, base_url="http://limit-test"):
+        llm = TinyLlamaLLM(max_in_flight=max_in_flight, base_url=base_url)
+        llm.client = sync
+        return llm
+
+    return make, seen
+
+
+def test_sync_and_async_calls_share_the_limit(llm_factory):
+    make, seen = llm_factory
+    llm = make(max_in_flight=2, base_url="http://shared-limit")
+
+    async def run():
+        sync_calls = [asyncio.to_thread(llm.invoke, []) for _ in range(4)]
+        return await asyncio.gather(*sync_calls, *(llm.ainvoke([]) for _ in range(4)))
+
+    assert sorted(asyncio.run(run())) == ["async"] * 4 + ["sync"] * 4
+    assert seen.peak == 2
+
+
+def test_each_instance_gets_the_limit_it_asked_for(llm_factory):
+    make, seen = llm_factory
+    make(max_in_flight=1, base_url="http://per-instance")
+    wide = make(max_in_flight=4, base_url="http://per-instance")
+
+    async def run():
+        return await asyncio.gather(*(wide.ainvoke([]) for _ in range(4)))
+
+    asyncio.run(run())
+    assert seen.peak == 4
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import math
+import threading
+import time
+
+from tool_cache import (
+    ToolResultCache,
+    canonical_input,
+    city_search_input,
+    is_error_result,
+)
+from tool_worker_pool import ToolWorkerPool
+from vacation_planner_agent import SimpleToolExecutor
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Registry(dict):
+    def get_tool(self, name):
+        return self.get(name)
+
+
+class CountingTool:
+    name = "hotels"
+    cache_ttl = 60
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def use(self, tool_input: str) -> str:
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return json.dumps({"hotels": ["a"], "input": json.loads(tool_input)})
+
+
+def test_canonical_input_ignores_key_order_and_spacing():
+    assert canonical_input('{"b": 1, "a": 2}') == canonical_input('{"a":2,"b":1}')
+    assert canonical_input("  not json ") == "not json"
+
+    def lower(d):
+        return {**d, "city": d["city"].lower()}
+
+    assert canonical_input('{"city": "Miami"}', lower) == canonical_input('{"city": "miami"}', lower)
+
+
+def test_city_searches_share_a_key_across_case_and_default_radius():
+    def hotels(d):
+        return city_search_input(d, default_radius_km=4)
+
+    same = canonical_input('{"city": " Miami "}', hotels)
+    assert canonical_input('{"radius_km": 4, "city": "miami"}', hotels) == same
+    assert canonical_input('{"city": "miami", "radius_km": 10}', hotels) != same
+
+def test_entries_expire_and_errors_are_not_cached():
+    clock = Clock()
+    cache = ToolResultCache(clock=clock)
+    key = cache.key("hotels", '{"city": "Miami"}')
+    assert cache.put(key, '{"hotels": []}', ttl=30)
+    clock.now = 29
+    assert cache.get(key) == '{"hotels": []}'
+    clock.now = 31
+    assert cache.get(key) is None
+    assert is_error_result('{"error": "boom"}') and not cache.put(key, '{"error": "boom"}', ttl=30)
+    assert cache.put(key, "ok", ttl=math.inf)
+    clock.now = 1e9
+    assert cache.get(key) == "ok"
+
+
+def test_lru_eviction():
+    cache = ToolResultCache(max_entries=2)
+    for name in "abc":
+        cache.put((name, ""), name, ttl=60)
+    assert cache.get(("a", "")) is None and len(cache) == 2
+
+
+def test_concurrent_identical_calls_join_the_running_one():
+    tool = CountingTool(delay=0.1)
+    executor = SimpleToolExecutor(Registry(hotels=tool), call_timeout=5, pool=ToolWorkerPool(max_workers=4),
+                                  cache=ToolResultCache())
+
+    async def run():
+        return await asyncio.gather(
+            executor.aexecute("hotels", '{"city": "Miami"}', compact=False),
+            executor.aexecute("hotels", '{ "city":"Miami" }', compact=False),
+        )
+
+    first, second = asyncio.run(run())
+    assert first == second and tool.calls == 1
+    asyncio.run(executor.aexecute("hotels", '{"city": "Miami"}', compact=False))
+    assert tool.calls == 1   # now served from the cache
+    executor.pool.shutdown()
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tool_worker_pool import ToolWorkerPool
+
+
+def test_group_cap_holds_across_concurrent_calls():
+    pool = ToolWorkerPool(max_workers=8, group_limits={"api": 2})
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def call():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*(pool.run("api", call, timeout=5) for _ in range(6)))
+
+    assert asyncio.run(run()) == ["ok"] * 6
+    assert peak == 2
+    pool.shutdown()
+
+
+def test_timeout_keeps_slot_until_worker_returns():
+    pool = ToolWorkerPool(max_workers=2, group_limits={"api": 1})
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run("api", release.wait, timeout=0.05)
+        assert pool.stats()["groups"]["api"]["running"] == 1
+        release.set()
+        return await pool.run("api", lambda: "next", timeout=5)
+
+    assert asyncio.run(run()) == "next"
+    pool.shutdown()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from tool_worker_pool import ToolWorkerPool
+from tracing import Tracer, load_events, span, summarize, trace, tracer
+
+
+@pytest.fixture
+def traced():
+    tracer.clear()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.clear()
+
+
+def by_name(events):
+    return {e["name"]: e for e in events}
+
+
+def test_disabled_tracer_records_nothing():
+    tracer.clear()
+    with span("ignored") as args:
+        args["x"] = 1
+    assert tracer.events() == []
+
+
+def test_nested_spans_share_the_trace_and_lane(traced):
+    with trace("turn") as args:
+        args["user"] = "u1"
+        with span("step", "agent"):
+            with span("tool.flights", "tool", city="miami"):
+                pass
+    events = by_name(traced.events())
+    turn, step, tool = events["turn"], events["step"], events["tool.flights"]
+
+    assert turn["args"]["user"] == "u1"
+    assert tool["args"]["city"] == "miami"
+    assert tool["cat"] == "tool"
+    assert turn["args"]["trace_id"] == step["args"]["trace_id"] == tool["args"]["trace_id"]
+    assert turn["tid"] == step["tid"] == tool["tid"]
+    # Children sit inside their parent on the timeline
+    assert turn["ts"] <= step["ts"] <= tool["ts"]
+    assert tool["ts"] + tool["dur"] <= step["ts"] + step["dur"] <= turn["ts"] + turn["dur"]
+
+
+def test_span_records_the_error_and_reraises(traced):
+    with pytest.raises(ValueError):
+        with span("boom"):
+            raise ValueError("bad")
+    assert by_name(traced.events())["boom"]["args"]["error"] == "ValueError"
+
+
+def test_trace_id_follows_tasks_and_worker_threads(traced):
+    pool = ToolWorkerPool(max_workers=2)
+
+    def fetch():
+        with span("http.fetch", "http"):
+            return "ok"
+
+    async def child(i):
+        with span(f"child{i}"):
+            await asyncio.sleep(0)
+
+    async def turn(name):
+        with trace(name):
+            await asyncio.gather(child(name + "a"), child(name + "b"))
+            await pool.run("api", fetch, timeout=5)
+
+    async def run():
+        await asyncio.gather(turn("t1"), turn("t2"))
+
+    asyncio.run(run())
+    pool.shutdown()
+
+    events = traced.events()
+    ids = {}
+    for e in events:
+        ids.setdefault(e["args"]["trace_id"], set()).add(e["name"])
+    assert len(ids) == 2
+    assert {frozenset(names) for names in ids.values()} == {
+        frozenset({"t1", "childt1a", "childt1b", "http.fetch"}),
+        frozenset({"t2", "childt2a", "childt2b", "http.fetch"}),
+    }
+    # Concurrent tasks get their own lanes
+    named = by_name(e for e in events if e["name"] != "http.fetch")
+    assert named["childt1a"]["tid"] != named["childt1b"]["tid"]
+
+
+def test_spans_outside_a_trace_have_no_trace_id(traced):
+    with span("loose"):
+        pass
+    assert "trace_id" not in traced.events()[0]["args"]
+
+
+def test_export_writes_a_chrome_trace_that_loads_back(traced, tmp_path):
+    with trace("turn"):
+        with span("step"):
+            pass
+    path = traced.export(str(tmp_path / "traces" / "run.json"))
+
+    with open(path) as f:
+        data = json.load(f)
+    assert data["displayTimeUnit"] == "ms"
+    assert {e["ph"] for e in data["traceEvents"]} == {"X"}
+    assert {e["name"] for e in load_events([path])} == {"turn", "step"}
+
+
+def test_tracer_keeps_only_the_newest_events():
+    small = Tracer(max_events=3)
+    for i in range(5):
+        small.record(f"s{i}", "app", 0.0, 0.001, {})
+    assert [e["name"] for e in small.events()] == ["s2", "s3", "s4"]
+
+
+def test_summarize_reports_percentiles_per_group():
+    events = [{"name": "llm", "cat": "llm", "dur": ms * 1000.0} for ms in range(1, 101)]
+    events += [{"name": "tool.hotels", "cat": "tool", "dur": 5000.0}] * 4
+
+    rows = summarize(events)
+    assert [r["span"] for r in rows] == ["llm", "tool.hotels"]
+    llm, hotels = rows
+    assert llm["count"] == 100
+    assert llm["p50_ms"] == pytest.approx(50.5, abs=0.6)
+    assert llm["p95_ms"] == pytest.approx(95.0, abs=1.0)
+    assert llm["total_ms"] == 5050.0
+    assert hotels == {"span": "tool.hotels", "count": 4, "p50_ms": 5.0, "p95_ms": 5.0, "total_ms": 20.0}
+
+    by_cat = summarize(events, by="cat")
+    assert {r["span"] for r in by_cat} == {"llm", "tool"}
@@ -0,0 +1,40 @@
+import json
+import os
+
+import travel_matrix
+from travel_matrix import MATRIX_VERSION, TravelMatrix, build_airport_matrix, home_state
+
+
+def test_lookup(tmp_path, monkeypatch):
+    monkeypatch.setattr(travel_matrix, "DEFAULT_AIRPORT_MATRIX_DIR", str(tmp_path / "airports"))
+    matrix = TravelMatrix.load_airports()
+    route = matrix.lookup("DEN", "MIA")
+    assert 2500 < route["distance_km"] < 3000
+    assert route["fare_band_usd"][0] < route["fare_band_usd"][1]
+    assert matrix.lookup("Colorado", "MIA")["origin"] == "CO"
+
+
+def test_build_leaves_no_temp_files(tmp_path):
+    out = build_airport_matrix(str(tmp_path / "airports"))
+    assert sorted(os.listdir(out)) == ["matrix.npy", "meta.json"]
+
+
+def test_stale_airport_matrix_is_rebuilt(tmp_path, monkeypatch):
+    out = str(tmp_path / "airports")
+    monkeypatch.setattr(travel_matrix, "DEFAULT_AIRPORT_MATRIX_DIR", out)
+    build_airport_matrix(out)
+    meta_path = os.path.join(out, "meta.json")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    del meta["version"]                 # written before versions existed
+    meta["destinations"] = meta["destinations"][:-1]
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    matrix = TravelMatrix.load_airports()
+    assert matrix.meta["version"] == MATRIX_VERSION
+    assert matrix.destinations == list(travel_matrix.AIRPORTS)
+
+
+def test_home_state_is_none_for_unknown_places():
+    assert home_state("Atlantis") is None and home_state("") is None
@@ -0,0 +1,73 @@
+import pytest
+
+from activity_search_tool import ActivitySearchTool
+from flight_search_tool import FlightSearchTool
+from hotel_search_tool import HotelSearchTool
+from restaurant_search_tool import RestaurantSearchTool
+from trip_prefetcher import TripPrefetcher, extract_trip_entities
+from vacation_planner_agent import SimpleToolExecutor
+
+
+def concrete(cls):
+    # Newer fairlib releases add an abstract acall(); these tools implement use()
+    sub = type(cls.__name__, (cls,), {})
+    sub.__abstractmethods__ = frozenset()
+    return sub
+
+
+class Registry(dict):
+    def get_tool(self, name):
+        return self.get(name)
+
+
+def make_prefetcher():
+    tools = [concrete(cls)() for cls in (HotelSearchTool, RestaurantSearchTool, ActivitySearchTool, FlightSearchTool)]
+    return TripPrefetcher(SimpleToolExecutor(Registry({tool.name: tool for tool in tools})))
+
+
+def iatas(places):
+    return [p["iata"] for p in places]
+
+
+def test_origin_and_destination():
+    places = extract_trip_entities("Plan a 4-day Miami vacation for two. We are flying from DEN.")
+    assert places["origin"]["iata"] == "DEN"
+    assert iatas(places["destinations"]) == ["MIA"]
+
+
+@pytest.mark.parametrize("text", [
+    "Ooh la la, plan a week from Denver to Paris",
+    "la la land soundtrack on the flight from Denver",
+])
+def test_lowercase_short_alias_is_not_a_city(text):
+    places = extract_trip_entities(text)
+    assert places["origin"]["iata"] == "DEN"
+    assert places["destinations"] == []
+
+
+@pytest.mark.parametrize("text", [
+    "A weekend in LA, flying from Denver",
+    "fly from denver to la",
+])
+def test_short_alias_in_capitals_or_after_a_cue(text):
+    assert iatas(extract_trip_entities(text)["destinations"]) == ["LAX"]
+
+
+def test_origin_not_repeated_as_destination():
+    places = extract_trip_entities("from NYC to Miami, then back to New York City")
+    assert places["origin"]["iata"] == "JFK"
+    assert iatas(places["destinations"]) == ["MIA"]
+
+
+def test_plans_every_lookup_for_a_supported_trip():
+    calls = make_prefetcher().plan("Plan a week in Miami, flying from DEN")
+    assert sorted(name for name, _ in calls) == [
+        "activity_search", "flight_search", "hotel_search", "restaurant_search",
+    ]
+
+
+def test_unsupported_places_plan_no_calls():
+    # Seattle and Boston are known to travel_matrix but not to the search tools
+    assert make_prefetcher().plan("Plan a week in Seattle, flying from Boston") == []
+    calls = make_prefetcher().plan("Plan a week in Miami, flying from Boston")
+    assert "flight_search" not in [name for name, _ in calls]
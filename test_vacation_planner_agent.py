@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import vacation_planner_agent
+from persistent_memory import PersistentMemory
+from vacation_planner_agent import SimpleToolExecutor, chat
+
+
+class Registry(dict):
+    def get_tool(self, name):
+        return self.get(name)
+
+
+class BlockingReader:
+    """Waits forever, like a user who hasn't typed anything yet."""
+
+    async def readline(self, prompt=""):
+        await asyncio.Event().wait()
+
+
+class RecordingMemory(PersistentMemory):
+    closed = []
+
+    def close(self):
+        RecordingMemory.closed.append(self.session_id)
+        super().close()
+
+
+@pytest.fixture
+def offline_chat(monkeypatch):
+    shared = SimpleNamespace(executor=SimpleToolExecutor(Registry()))
+    monkeypatch.setattr(vacation_planner_agent, "build_shared_components", lambda: shared)
+    monkeypatch.setattr(vacation_planner_agent, "build_vacation_agent", lambda **kwargs: object())
+    monkeypatch.setattr(vacation_planner_agent, "AsyncLineReader", BlockingReader)
+    monkeypatch.setattr(vacation_planner_agent, "PersistentMemory", RecordingMemory)
+    RecordingMemory.closed.clear()
+
+
+def test_cancelled_chat_still_closes_the_session(offline_chat, tmp_path):
+    async def run():
+        task = asyncio.create_task(chat(db_path=str(tmp_path / "sessions.db")))
+        await asyncio.sleep(0.05)
+        task.cancel()       # what asyncio.run() does on Ctrl-C
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert len(RecordingMemory.closed) == 1
+
+
+def test_gguf_backend_falls_back_to_hf_without_llama_cpp(monkeypatch):
+    import quantized_llm
+    from model_pool import ModelPool, _hf_factory
+
+    hf_model = object()
+
+    def factory(model_name, backend="hf", **kwargs):
+        return _hf_factory(model_name, backend, **kwargs) if backend == "gguf" else hf_model
+
+    pool = ModelPool(factory=factory)
+    monkeypatch.setattr(quantized_llm, "Llama", None)
+    monkeypatch.setattr(vacation_planner_agent, "model_pool", pool)
+    monkeypatch.setattr(vacation_planner_agent, "MODEL_BACKEND", "gguf")
+    monkeypatch.setattr(vacation_planner_agent, "MODEL_FALLBACK", None)
+
+    assert vacation_planner_agent.load_shared_model(max_batch=1) is hf_model
+    assert list(pool.stats()) == [vacation_planner_agent.MODEL_NAME]   # no failed gguf entry left behind
+    assert vacation_planner_agent.release_shared_model() == 1
+
+
+def test_missing_package_for_the_only_backend_still_raises(monkeypatch):
+    import quantized_llm
+    from model_pool import ModelPool
+
+    monkeypatch.setattr(quantized_llm, "Llama", None)
+    monkeypatch.setattr(vacation_planner_agent, "model_pool", ModelPool())
+    monkeypatch.setattr(vacation_planner_agent, "MODEL_BACKEND", "gguf")
+    monkeypatch.setattr(vacation_planner_agent, "MODEL_FALLBACK", "gguf")
+
+    with pytest.raises(ImportError, match="llama-cpp-python"):
+        vacation_planner_agent.load_shared_model(max_batch=1)
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from async_http import HTTPError, HTTPRequest, read_request
+from vacation_planner_agent import SimpleToolExecutor
+from vacation_server import ConcurrencyLimitedLLM, Session, VacationServer
+
+
+class CountingLLM:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = self.peak = 0
+
+    def _enter(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def _exit(self):
+        with self.lock:
+            self.running -= 1
+
+    def invoke(self, messages):
+        self._enter()
+        time.sleep(0.05)
+        self._exit()
+        return "sync"
+
+    async def ainvoke(self, messages):
+        self._enter()
+        await asyncio.sleep(0.05)
+        self._exit()
+        return "async"
+
+
+def test_sync_and_async_calls_share_one_limit():
+    inner = CountingLLM()
+    llm = ConcurrencyLimitedLLM(inner, max_concurrent=2)
+
+    async def run():
+        sync_calls = [asyncio.to_thread(llm.invoke, []) for _ in range(4)]
+        async_calls = [llm.ainvoke([]) for _ in range(4)]
+        return await asyncio.gather(*sync_calls, *async_calls)
+
+    assert sorted(asyncio.run(run())) == ["async"] * 4 + ["sync"] * 4
+    assert inner.peak == 2
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_bad_content_length_is_a_400(length):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"POST /sessions HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+        reader.feed_eof()
+        return await read_request(reader)
+
+    with pytest.raises(HTTPError) as err:
+        asyncio.run(run())
+    assert err.value.status == 400
+
+
+class Registry(dict):
+    def get_tool(self, name):
+        return self.get(name)
+
+
+class EchoAgent:
+    async def arun(self, message):
+        return f"echo: {message}"
+
+
+def offline_server():
+    shared = SimpleNamespace(llm=None, executor=SimpleToolExecutor(Registry()))
+    server = VacationServer(shared=shared)
+    server.sessions["s1"] = Session("s1", EchoAgent(), memory=None)
+    return server
+
+
+def post_message(server, body: bytes):
+    return asyncio.run(server.handle(HTTPRequest("POST", "/sessions/s1/messages", {}, body)))
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"hello"', b"42", b"null"])
+def test_non_object_message_body_is_a_400(body):
+    with pytest.raises(HTTPError) as err:
+        post_message(offline_server(), body)
+    assert err.value.status == 400
+
+
+def test_message_is_answered_by_the_session_agent():
+    status, payload = post_message(offline_server(), b'{"message": "Miami?"}')
+    assert status == 200
+    assert payload == {"session_id": "s1", "answer": "echo: Miami?", "turns": 1}
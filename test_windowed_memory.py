@@ -0,0 +1,65 @@
+from fairlib.core.message import Message
+
+from windowed_memory import SUMMARY_PREFIX, WindowedMemory
+
+
+def words(text):
+    return len(str(text or "").split())
+
+
+def turn(memory, n, reply_words=3):
+    memory.add_message(Message(role="user", content=f"question {n}"))
+    memory.add_message(Message(role="assistant", content=" ".join(["answer"] * reply_words)))
+
+
+def contents(history):
+    return [m.content for m in history]
+
+
+def test_oldest_turns_are_evicted_whole():
+    memory = WindowedMemory(max_tokens=12, count_tokens=words)
+    memory.add_message(Message(role="system", content="you plan trips"))
+    for n in range(4):
+        turn(memory, n)
+    history = contents(memory.get_history())
+    assert history[0] == "you plan trips"          # pinned
+    assert history[1:] == ["question 3", "answer answer answer"]
+    assert memory.total_tokens <= 12 and memory.evicted_messages == 6
+
+
+def test_turn_in_progress_is_kept_even_over_budget():
+    memory = WindowedMemory(max_tokens=5, count_tokens=words)
+    turn(memory, 0)
+    memory.add_message(Message(role="user", content="a very long question that is over the budget"))
+    memory.add_message(Message(role="assistant", content="Thought: still working on it"))
+    assert contents(memory.get_history())[0] == "a very long question that is over the budget"
+    assert len(memory.get_history()) == 2
+
+
+def test_summarizer_sees_evicted_turns():
+    seen = []
+
+    def summarizer(evicted, previous):
+        seen.append(contents(evicted))
+        return (previous + " " + " ".join(m.content for m in evicted if m.role == "user")).strip()
+
+    memory = WindowedMemory(max_tokens=10, count_tokens=words, summarizer=summarizer)
+    for n in range(5):
+        turn(memory, n, reply_words=1)
+    assert seen[0] == ["question 0", "answer"]
+    history = memory.get_history()
+    assert history[0].content == SUMMARY_PREFIX + memory.summary
+    assert memory.summary.startswith("question 0")
+
+
+def test_view_is_a_snapshot():
+    memory = WindowedMemory(max_tokens=12, count_tokens=words)
+    turn(memory, 0)
+    view = memory.get_history()
+    before = contents(view)
+    for n in range(1, 6):       # evicts and compacts the window under the view
+        turn(memory, n)
+    assert contents(view) == before and len(view) == 2
+    assert view[-1].content == "answer answer answer" and contents(view[0:1]) == ["question 0"]
+    memory.clear()
+    assert contents(view) == before and len(memory.get_history()) == 0
@@ -1,27 +1,179 @@
-from groq import Groq
+import asyncio
+import os
+import threading
+import weakref
+
+from groq import AsyncGroq, Groq
+
+from tool_worker_pool import SlotLimiter
+
+
+# Set to e.g. http://127.0.0.1:8000 to use stub_llm_server.py instead of Groq
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL") or None
+
+# Per-request timeout; retries are left to resilient_llm.ResilientLLM, not the SDK
+GROQ_TIMEOUT = float(os.environ.get("GROQ_TIMEOUT", "30"))
+
+# Call kwargs forwarded to chat.completions.create
+API_SAMPLING_PARAMS = {"temperature", "max_tokens", "top_p", "stop", "seed"}
+
+# Requests in flight to one base_url, sync and async calls together; shared by every
+# TinyLlamaLLM instance with the same (base_url, max_in_flight), see get_request_limit
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("GROQ_MAX_IN_FLIGHT", "8"))
+
+_sync_clients = {}                             # base_url -> Groq
+_async_clients = weakref.WeakKeyDictionary()   # event loop -> {base_url: AsyncGroq}
+_request_limits = {}                           # (base_url, max_in_flight) -> SlotLimiter
+_client_lock = threading.Lock()
+
+
+def groq_api_key() -> str:
+    key = os.environ.get("GROQ_API_KEY")
+    if not key:
+        raise RuntimeError(
+            "GROQ_API_KEY is not set. Export your Groq key (or GROQ_API_KEY=stub together "
+            "with GROQ_BASE_URL for stub_llm_server.py)."
+        )
+    return key
+
+
+def get_sync_client(base_url: str = None) -> Groq:
+    with _client_lock:
+        if base_url not in _sync_clients:
+            _sync_clients[base_url] = Groq(
+                api_key=groq_api_key(), base_url=base_url, timeout=GROQ_TIMEOUT, max_retries=0
+            )
+        return _sync_clients[base_url]
+
+
+def get_async_client(base_url: str = None) -> AsyncGroq:
+    """
+    AsyncGroq shared by everything running on the current loop. The client
+    keeps a pooled keep-alive connection set; its sockets belong to one loop,
+    hence one client per loop rather than one global.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        clients = _async_clients.setdefault(loop, {})
+        if base_url not in clients:
+            clients[base_url] = AsyncGroq(
+                api_key=groq_api_key(), base_url=base_url, timeout=GROQ_TIMEOUT, max_retries=0
+            )
+        return clients[base_url]
+
+
+def get_request_limit(max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, base_url: str = None) -> SlotLimiter:
+    """
+    Cap on requests in flight to base_url, shared by sync and async calls on
+    any thread or loop. Instances asking for a different max_in_flight get
+    their own limiter, so each one's setting is honoured.
+    """
+    with _client_lock:
+        key = (base_url, max_in_flight)
+        if key not in _request_limits:
+            _request_limits[key] = SlotLimiter(max_in_flight)
+        return _request_limits[key]
+
+
+def _message_dict(message) -> dict:
+    # fairlib Messages -> the {"role", "content"} dicts the API expects
+    if isinstance(message, dict):
+        return message
+    return {"role": message.role, "content": message.content or ""}
+
+
+def _message_content(message) -> str:
+    # SDK objects expose .content; plain dicts (and some older SDKs) use ["content"]
+    content = getattr(message, "content", None)
+    if content is None and isinstance(message, dict):
+        content = message.get("content")
+    return content or ""
+
 
 class TinyLlamaLLM:
     """
     LLM wrapper that uses Groq’s API instead of HuggingFace.
     This completely avoids all HF model downloads.
+
+    The async methods use a shared AsyncGroq client, so concurrent agents
+    overlap their round trips instead of blocking the event loop. At most
+    `max_in_flight` requests (sync and async together) are outstanding at
+    once across all instances with the same base_url and limit. `base_url`
+    (default $GROQ_BASE_URL) points it at another compatible endpoint, such
+    as stub_llm_server.py for load tests.
     """
 
-    def __init__(self, model_name="llama3-8b-8192"):
-        self.client = Groq(api_key="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")
+    async_streaming = True   # astream() is native, see llm_streaming.astream_chunks
+
+    def __init__(self, model_name="llama3-8b-8192", max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 temperature: float = 0.3, max_tokens: int = 300, base_url: str = GROQ_BASE_URL):
+        self.base_url = base_url
+        self.client = get_sync_client(base_url)
         self.model_name = model_name
+        self.max_in_flight = max_in_flight
+        self._slots = get_request_limit(max_in_flight, base_url)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
 
-    async def ainvoke(self, messages):
-        return self.invoke(messages)
+    def sampling_params(self) -> dict:
+        """Used by llm_cache: replies are only cached at temperature 0."""
+        return {"temperature": self.temperature, "max_tokens": self.max_tokens}
 
-    def invoke(self, messages):
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=0.3,
-            max_tokens=300
-        )
-        return response.choices[0].message["content"]
+    def _request(self, messages, stream: bool = False, **kwargs):
+        """
+        Chat-completions params. Call kwargs override the sampling defaults;
+        max_new_tokens (HF naming) maps to max_tokens and options the API
+        does not take (e.g. do_sample) are ignored.
+        """
+        if "max_new_tokens" in kwargs:
+            kwargs.setdefault("max_tokens", kwargs.pop("max_new_tokens"))
+        params = dict(model=self.model_name, messages=[_message_dict(m) for m in messages], **self.sampling_params())
+        params.update({k: v for k, v in kwargs.items() if k in API_SAMPLING_PARAMS})
+        if stream:
+            params["stream"] = True
+        return params
+
+    async def ainvoke(self, messages, **kwargs):
+        client = get_async_client(self.base_url)
+        await self._slots.acquire()
+        try:
+            response = await client.chat.completions.create(**self._request(messages, **kwargs))
+        finally:
+            self._slots.release()
+        return _message_content(response.choices[0].message)
+
+    def invoke(self, messages, **kwargs):
+        self._slots.acquire_blocking()
+        try:
+            response = self.client.chat.completions.create(**self._request(messages, **kwargs))
+        finally:
+            self._slots.release()
+        return _message_content(response.choices[0].message)
+
+    def stream(self, messages, **kwargs):
+        """Yields the reply in text chunks as Groq generates it."""
+        self._slots.acquire_blocking()
+        try:
+            response = self.client.chat.completions.create(**self._request(messages, stream=True, **kwargs))
+            for chunk in response:
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+        finally:
+            self._slots.release()
+
+    async def astream(self, messages, **kwargs):
+        client = get_async_client(self.base_url)
+        await self._slots.acquire()
+        try:
+            response = await client.chat.completions.create(**self._request(messages, stream=True, **kwargs))
+            async for chunk in response:
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+        finally:
+            self._slots.release()
 
     async def achat(self, prompt: str) -> str:
         messages = [{"role": "user", "content": prompt}]
-        return self.invoke(messages)
+        return await self.ainvoke(messages)
@@ -0,0 +1,132 @@
+"""
+Memoizing cache for tool results.
+
+The ReAct loop often repeats a call with the same input (hotel_search for
+Miami twice in one plan, or the same lookup from another session).
+SimpleToolExecutor checks this cache before running a tool.
+
+  * Key: (tool name, canonical JSON input) - key order and whitespace in the
+    input don't matter. Non-JSON input is keyed on its stripped text. A tool
+    may define normalize_input(payload) -> dict to fold equivalent inputs
+    together (city case, default radius, ...).
+  * TTL: each tool declares `cache_ttl` in seconds. math.inf means pure (never
+    expires); 0 or no attribute means never cached.
+  * Bounded: least-recently-used entries are evicted past `max_entries`.
+  * Errors ("Error..." strings or {"error": ...} JSON) are never cached.
+
+Hit/miss/eviction counters are reported in metrics.py under "tool_cache.*".
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import metrics as default_metrics
+
+
+def canonical_input(tool_input, normalize=None) -> str:
+    """Same JSON value -> same string, regardless of key order or spacing."""
+    text = tool_input if isinstance(tool_input, str) else json.dumps(tool_input)
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return text.strip()
+    if normalize is not None and isinstance(data, dict):
+        try:
+            data = normalize(data)
+        except Exception:
+            pass  # malformed input: key on it as given, the tool will report the error
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def city_search_input(payload: dict, default_radius_km: float) -> dict:
+    """normalize_input() for the city search tools: city case and an omitted default radius don't matter."""
+    return {"city": str(payload.get("city", "")).strip().lower(), "radius_km": payload.get("radius_km", default_radius_km)}
+
+
+def is_error_result(result) -> bool:
+    if not isinstance(result, str):
+        return True
+    text = result.lstrip()
+    if text.startswith("Error"):
+        return True
+    if text.startswith("{"):
+        try:
+            return "error" in json.loads(text)
+        except ValueError:
+            return False
+    return False
+
+
+def tool_ttl(tool) -> float:
+    """Seconds a result of this tool stays valid; 0 = don't cache."""
+    ttl = getattr(tool, "cache_ttl", 0) or 0
+    return max(0.0, float(ttl))
+
+
+class ToolResultCache:
+
+    def __init__(self, max_entries: int = 1024, metrics=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.metrics = metrics or default_metrics
+        self.clock = clock
+        self._entries = OrderedDict()   # key -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(tool_name: str, tool_input, normalize=None) -> tuple:
+        return (tool_name, canonical_input(tool_input, normalize))
+
+    def get(self, key: tuple):
+        """Cached result for a key from key(), or None."""
+        tool_name = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self.metrics.incr("tool_cache.hits" if entry is not None else "tool_cache.misses")
+        self.metrics.incr(f"tool_cache.{tool_name}.{'hits' if entry is not None else 'misses'}")
+        return None if entry is None else entry[1]
+
+    def put(self, key: tuple, result, ttl: float) -> bool:
+        """Stores a successful result for `ttl` seconds. Returns False if not cacheable."""
+        if ttl <= 0 or self.max_entries <= 0 or is_error_result(result):
+            return False
+
+        expires = math.inf if math.isinf(ttl) else self.clock() + ttl
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (expires, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            size = len(self._entries)
+        if evicted:
+            self.metrics.incr("tool_cache.evictions", evicted)
+        self.metrics.gauge("tool_cache.entries", size)
+        return True
+
+    def invalidate(self, tool_name: str = None):
+        """Drops every entry, or only those of one tool."""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == tool_name]:
+                    del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_tool = {}
+            for name, _ in self._entries:
+                by_tool[name] = by_tool.get(name, 0) + 1
+        return {"entries": sum(by_tool.values()), "max_entries": self.max_entries, "by_tool": by_tool}
@@ -0,0 +1,219 @@
+"""
+Bounded worker pool for blocking tools.
+
+Every tool's .use() is synchronous (requests.post to Overpass, OpenSky, ...).
+ToolWorkerPool runs those calls on a fixed-size thread pool so the event loop
+never blocks, and adds:
+
+  * per-group concurrency caps — tools declare `concurrency_group`
+    (e.g. every Overpass tool shares "overpass"), and a group can have at most
+    N calls in flight per process no matter how many sessions ask;
+  * per-call deadlines that cover both queueing and running;
+  * queue-depth / latency metrics in metrics.py under "tool_pool.<group>.*".
+
+A cap is enforced until the worker thread really finishes: if a call times
+out, the caller gets its error right away but the slot stays taken until
+the blocking request returns, so the external service never sees more than
+N requests from this process.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics as default_metrics
+
+# At most 2 concurrent requests per process to each public API
+DEFAULT_GROUP_LIMITS = {
+    "overpass": 2,
+    "opensky": 2,
+}
+
+
+class SlotLimiter:
+    """
+    FIFO semaphore usable from any thread and any event loop.
+    acquire() is awaited on a loop, acquire_blocking() waits on a plain thread;
+    both draw on the same slots. release() may be called from any thread.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            fut = loop.create_future()
+            self._waiters.append((loop, fut))
+
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, fut))
+                    removed = True
+                except ValueError:
+                    removed = False
+            # Already handed a slot before we were cancelled: give it back
+            if not removed and fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def acquire_blocking(self):
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            event = threading.Event()
+            self._waiters.append((None, event))
+        event.wait()
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, fut = self._waiters.popleft()
+                if loop is None:  # blocking waiter: hand the slot over directly
+                    fut.set()
+                    return
+                try:
+                    loop.call_soon_threadsafe(self._grant, fut)
+                    return
+                except RuntimeError:  # waiter's loop is closed
+                    continue
+            self.active -= 1
+
+    def _grant(self, fut):
+        if fut.done():  # waiter gave up in the meantime: pass the slot on
+            self.release()
+        else:
+            fut.set_result(True)
+
+
+class ToolWorkerPool:
+    """Runs blocking callables on a bounded thread pool with per-group caps."""
+
+    def __init__(self, max_workers: int = 16, group_limits: dict = None, metrics=None):
+        self.max_workers = max_workers
+        self.group_limits = dict(DEFAULT_GROUP_LIMITS if group_limits is None else group_limits)
+        self.metrics = metrics or default_metrics
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self._queued = 0   # submitted to the executor but not started yet
+
+    def _limiter(self, group: str) -> SlotLimiter:
+        with self._lock:
+            if group not in self._limiters:
+                self._limiters[group] = SlotLimiter(self.group_limits.get(group, self.max_workers))
+            return self._limiters[group]
+
+    def _report(self, group: str, limiter: SlotLimiter):
+        self.metrics.gauge(f"tool_pool.{group}.waiting", limiter.waiting)
+        self.metrics.gauge(f"tool_pool.{group}.running", limiter.active)
+        self.metrics.gauge("tool_pool.executor_queue", self._queued)
+
+    def _call(self, group, limiter, fn, args):
+        with self._lock:
+            self._queued -= 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.metrics.observe(f"tool_pool.{group}.run_s", time.perf_counter() - start)
+            limiter.release()
+            self._report(group, limiter)
+
+    async def run(self, group: str, fn, *args, timeout: float = None):
+        """
+        Awaits fn(*args) on a worker thread. Raises asyncio.TimeoutError if the
+        call has not finished `timeout` seconds after it was requested.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        def remaining():
+            return None if deadline is None else max(0.0, deadline - loop.time())
+
+        limiter = self._limiter(group)
+        self.metrics.incr(f"tool_pool.{group}.calls")
+        queued_at = time.perf_counter()
+
+        acquire = asyncio.ensure_future(limiter.acquire())
+        self._report(group, limiter)
+        try:
+            await asyncio.wait_for(acquire, remaining())
+        except asyncio.TimeoutError:
+            self.metrics.incr(f"tool_pool.{group}.timeouts")
+            self._report(group, limiter)
+            raise
+        self.metrics.observe(f"tool_pool.{group}.queue_wait_s", time.perf_counter() - queued_at)
+
+        with self._lock:
+            self._queued += 1
+        try:
+            # copy_context: the trace id (tracing.py) follows the call onto the worker thread
+            cfut = self._executor.submit(contextvars.copy_context().run, self._call, group, limiter, fn, args)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            limiter.release()
+            raise
+        self._report(group, limiter)
+
+        try:
+            # shield: a timeout must not cancel the concurrent future behind our back
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(cfut)), remaining())
+        except asyncio.TimeoutError:
+            self.metrics.incr(f"tool_pool.{group}.timeouts")
+            if cfut.cancel():  # never started: free its executor + group slot now
+                with self._lock:
+                    self._queued -= 1
+                limiter.release()
+                self._report(group, limiter)
+            raise
+        except Exception:
+            self.metrics.incr(f"tool_pool.{group}.errors")
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            limiters = dict(self._limiters)
+            queued = self._queued
+        return {
+            "max_workers": self.max_workers,
+            "executor_queue": queued,
+            "groups": {
+                group: {"limit": lim.limit, "running": lim.active, "waiting": lim.waiting}
+                for group, lim in limiters.items()
+            },
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> ToolWorkerPool:
+    """Process-wide pool shared by every SimpleToolExecutor that doesn't pass its own."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ToolWorkerPool()
+        return _default_pool
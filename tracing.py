@@ -0,0 +1,182 @@
+"""
+Span-based latency tracing, exported as Chrome trace files.
+
+Spans are recorded around agent turns, ReAct planning calls, LLM calls, tool
+executions and each tool's network fetch. Load an exported file in
+chrome://tracing or https://ui.perfetto.dev to see where a slow plan spent
+its time, or summarize many runs from the command line:
+
+    from tracing import span, tracer
+    tracer.enable()
+    with span("http.overpass", "http", city="miami"):
+        ...
+    tracer.export("traces/run1.json")
+
+    python tracing.py summarize traces/*.json            # p50/p95 per span name
+    python tracing.py summarize traces/*.json --by cat   # ... per category
+
+Tracing is off by default, and a disabled span only checks one flag.
+Concurrent asyncio tasks get their own lanes (tid), and the active trace id
+follows tasks and tool worker threads through contextvars.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from metrics import percentile
+
+_trace_id = contextvars.ContextVar("trace_id", default=None)
+
+
+class Tracer:
+
+    def __init__(self, max_events: int = 200_000):
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, name, cat, start, end, args):
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+            "tid": _lane(),
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def events(self) -> list:
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+    def export(self, path: str) -> str:
+        """Writes a Chrome trace (JSON object format) and returns the path."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+        return path
+
+
+def _lane() -> int:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+# Shared by every module in the process
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, cat: str = "app", **args):
+    """Times the block; yields the span's args dict so callers can annotate it."""
+    if not tracer.enabled:
+        yield args
+        return
+    trace_id = _trace_id.get()
+    if trace_id is not None:
+        args["trace_id"] = trace_id
+    start = time.perf_counter()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        tracer.record(name, cat, start, time.perf_counter(), args)
+
+
+@contextmanager
+def trace(name: str, cat: str = "agent", **args):
+    """Top-level span that also starts a new trace id for everything inside it."""
+    token = _trace_id.set(uuid.uuid4().hex[:12])
+    try:
+        with span(name, cat, **args) as span_args:
+            yield span_args
+    finally:
+        _trace_id.reset(token)
+
+
+# =========================
+#   SUMMARY
+# =========================
+
+def load_events(paths) -> list:
+    events = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        items = data.get("traceEvents", []) if isinstance(data, dict) else data
+        events.extend(e for e in items if e.get("ph") == "X")
+    return events
+
+
+def summarize(events, by: str = "name") -> list:
+    """[{span, count, p50_ms, p95_ms, total_ms}] sorted by total time."""
+    groups = defaultdict(list)
+    for e in events:
+        groups[e.get(by, "?")].append(e["dur"] / 1000.0)
+    rows = []
+    for key, durations in groups.items():
+        durations.sort()
+        rows.append({
+            "span": key,
+            "count": len(durations),
+            "p50_ms": round(percentile(durations, 50), 1),
+            "p95_ms": round(percentile(durations, 95), 1),
+            "total_ms": round(sum(durations), 1),
+        })
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("summarize", help="p50/p95 per span type across trace files")
+    s.add_argument("paths", nargs="+", help="trace files or globs")
+    s.add_argument("--by", choices=["name", "cat"], default="name")
+    s.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])})
+    rows = summarize(load_events(paths), by=args.by)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{len(paths)} trace file(s)\n")
+    print(f"{'span':32} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'total ms':>12}")
+    for r in rows:
+        print(f"{str(r['span']):32} {r['count']:>7} {r['p50_ms']:>10} {r['p95_ms']:>10} {r['total_ms']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Precomputed origin × destination travel matrix.
+
+For every (origin, destination) pair the matrix stores:
+
+    distance_km     great-circle distance
+    flight_hours    typical one-way block time (taxi + climb + cruise)
+    fare_low        low end of a typical one-way economy fare, USD
+    fare_high       high end of a typical one-way economy fare, USD
+    trip_cost       round-trip travel cost per traveler (drive when close, else mid fare)
+
+Origins are airports (IATA codes) and states; destinations are whatever the
+matrix was built for (airports for the flight/budget tools, catalog rows for
+destination matching). The data lives in one (metrics, origins, destinations)
+float32 .npy opened with mmap_mode="r", and lookups are two dict hits plus an
+array index — no network calls.
+
+    python travel_matrix.py build-airports data/airport_matrix
+    python travel_matrix.py lookup DEN MIA
+"""
+
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+METRICS = ("distance_km", "flight_hours", "fare_low", "fare_high", "trip_cost")
+
+# Major US airports: IATA → (city, lat, lon)
+AIRPORTS = {
+    "ATL": ("atlanta", 33.6407, -84.4277),
+    "AUS": ("austin", 30.1975, -97.6664),
+    "BNA": ("nashville", 36.1263, -86.6774),
+    "BOS": ("boston", 42.3656, -71.0096),
+    "BWI": ("baltimore", 39.1774, -76.6684),
+    "CLT": ("charlotte", 35.2144, -80.9473),
+    "DCA": ("washington", 38.8512, -77.0402),
+    "DEN": ("denver", 39.8561, -104.6737),
+    "DFW": ("dallas", 32.8998, -97.0403),
+    "DTW": ("detroit", 42.2162, -83.3554),
+    "EWR": ("newark", 40.6895, -74.1745),
+    "FLL": ("fort lauderdale", 26.0742, -80.1506),
+    "HNL": ("honolulu", 21.3187, -157.9225),
+    "IAH": ("houston", 29.9902, -95.3368),
+    "JFK": ("new york", 40.6413, -73.7781),
+    "LAS": ("las vegas", 36.0840, -115.1537),
+    "LAX": ("los angeles", 33.9416, -118.4085),
+    "MCI": ("kansas city", 39.2976, -94.7139),
+    "MCO": ("orlando", 28.4312, -81.3081),
+    "MIA": ("miami", 25.7959, -80.2871),
+    "MSP": ("minneapolis", 44.8848, -93.2223),
+    "MSY": ("new orleans", 29.9934, -90.2580),
+    "ORD": ("chicago", 41.9742, -87.9073),
+    "PDX": ("portland", 45.5898, -122.5951),
+    "PHL": ("philadelphia", 39.8744, -75.2424),
+    "PHX": ("phoenix", 33.4342, -112.0116),
+    "SAN": ("san diego", 32.7338, -117.1933),
+    "SAT": ("san antonio", 29.5337, -98.4698),
+    "SEA": ("seattle", 47.4502, -122.3088),
+    "SFO": ("san francisco", 37.6213, -122.3790),
+    "SLC": ("salt lake city", 40.7899, -111.9791),
+    "STL": ("st. louis", 38.7487, -90.3700),
+    "TPA": ("tampa", 27.9755, -82.5332),
+    "ANC": ("anchorage", 61.1743, -149.9962),
+    "SJU": ("san juan", 18.4394, -66.0018),
+}
+
+CITY_AIRPORTS = {city: iata for iata, (city, _, _) in AIRPORTS.items()}
+CITY_AIRPORTS.update({"new york city": "JFK", "nyc": "JFK", "la": "LAX", "vegas": "LAS"})
+
+# State (or territory) each airport is in, for "exclude my home state" filters
+AIRPORT_STATES = {
+    "ATL": "GA", "AUS": "TX", "BNA": "TN", "BOS": "MA", "BWI": "MD", "CLT": "NC",
+    "DCA": "DC", "DEN": "CO", "DFW": "TX", "DTW": "MI", "EWR": "NJ", "FLL": "FL",
+    "HNL": "HI", "IAH": "TX", "JFK": "NY", "LAS": "NV", "LAX": "CA", "MCI": "MO",
+    "MCO": "FL", "MIA": "FL", "MSP": "MN", "MSY": "LA", "ORD": "IL", "PDX": "OR",
+    "PHL": "PA", "PHX": "AZ", "SAN": "CA", "SAT": "TX", "SEA": "WA", "SFO": "CA",
+    "SLC": "UT", "STL": "MO", "TPA": "FL", "ANC": "AK", "SJU": "PR",
+}
+
+# Approximate population-weighted centroids for origin states
+STATE_CENTROIDS = {
+    "AL": (33.0, -86.8), "AK": (61.2, -149.9), "AZ": (33.4, -112.0),
+    "AR": (34.8, -92.3), "CA": (35.5, -119.4), "CO": (39.6, -105.0),
+    "CT": (41.6, -72.7), "DE": (39.4, -75.6), "DC": (38.9, -77.0),
+    "FL": (27.8, -81.6), "GA": (33.6, -84.2), "HI": (21.3, -157.8),
+    "ID": (43.6, -116.2), "IL": (41.5, -88.0), "IN": (39.8, -86.3),
+    "IA": (41.9, -93.0), "KS": (38.5, -97.4), "KY": (38.0, -85.3),
+    "LA": (30.7, -91.5), "ME": (44.1, -70.0), "MD": (39.1, -76.8),
+    "MA": (42.3, -71.4), "MI": (42.8, -84.2), "MN": (45.0, -93.5),
+    "MS": (32.5, -89.7), "MO": (38.4, -92.2), "MT": (46.4, -111.0),
+    "NE": (41.2, -97.4), "NV": (36.5, -115.4), "NH": (43.0, -71.5),
+    "NJ": (40.4, -74.4), "NM": (35.0, -106.3), "NY": (41.5, -74.6),
+    "NC": (35.6, -79.6), "ND": (47.4, -99.0), "OH": (40.5, -82.7),
+    "OK": (35.6, -96.8), "OR": (44.7, -122.6), "PA": (40.5, -76.9),
+    "PR": (18.3, -66.3), "RI": (41.8, -71.4), "SC": (34.0, -81.0),
+    "SD": (44.0, -98.8), "TN": (35.8, -86.4), "TX": (30.9, -97.4),
+    "UT": (40.4, -111.9), "VT": (44.1, -72.8), "VA": (37.9, -77.5),
+    "WA": (47.3, -122.0), "WV": (38.7, -80.8), "WI": (43.7, -88.9),
+    "WY": (42.4, -107.0),
+}
+
+STATE_NAMES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR",
+    "california": "CA", "colorado": "CO", "connecticut": "CT",
+    "delaware": "DE", "district of columbia": "DC", "washington dc": "DC",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID",
+    "illinois": "IL", "indiana": "IN", "iowa": "IA", "kansas": "KS",
+    "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD",
+    "massachusetts": "MA", "michigan": "MI", "minnesota": "MN",
+    "mississippi": "MS", "missouri": "MO", "montana": "MT", "nebraska": "NE",
+    "nevada": "NV", "new hampshire": "NH", "new jersey": "NJ",
+    "new mexico": "NM", "new york": "NY", "north carolina": "NC",
+    "north dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR",
+    "pennsylvania": "PA", "puerto rico": "PR", "rhode island": "RI",
+    "south carolina": "SC", "south dakota": "SD", "tennessee": "TN",
+    "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA",
+    "washington": "WA", "west virginia": "WV", "wisconsin": "WI",
+    "wyoming": "WY",
+}
+
+DEFAULT_AIRPORT_MATRIX_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "airport_matrix"
+)
+
+# Bump when the on-disk layout or the cost model changes; load_airports() rebuilds
+MATRIX_VERSION = 1
+
+
+# =========================
+#   GEO + COST MODEL
+# =========================
+
+def normalize_state(state: str):
+    """Accepts 'CO', 'co', 'Colorado' → 'CO'. Returns None if unknown."""
+    if not state:
+        return None
+    key = state.strip()
+    if key.upper() in STATE_CENTROIDS:
+        return key.upper()
+    return STATE_NAMES.get(key.lower())
+
+
+def home_state(origin: str):
+    """State of an airport code, state code/name or known city ('MIA', 'FL', 'miami' → 'FL')."""
+    if not origin:
+        return None
+    key = origin.strip()
+    if key.upper() in AIRPORT_STATES:
+        return AIRPORT_STATES[key.upper()]
+    return normalize_state(key) or AIRPORT_STATES.get(CITY_AIRPORTS.get(key.lower()))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km. Works on scalars or numpy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+def travel_metrics(distance_km) -> np.ndarray:
+    """(len(METRICS), ...) float32 stack of the cost model for a distance array."""
+    d = np.asarray(distance_km, dtype=np.float32)
+    flight_hours = 0.6 + d / 780.0                      # overhead + ~780 km/h cruise
+    fare_low = 49.0 + 0.07 * d
+    fare_high = 129.0 + 0.16 * d
+    drive = 0.25 * d * 2                                # gas + wear, both ways
+    fly = fare_low + fare_high                          # 2 × mid fare = round trip
+    trip_cost = np.where(d < 400, drive, fly)
+    return np.stack([d, flight_hours, fare_low, fare_high, trip_cost]).astype(np.float32)
+
+
+# =========================
+#   MATRIX
+# =========================
+
+# Files are written under a per-process temp name and moved into place, so a
+# worker loading a matrix or catalog while another builds it never reads a
+# half-written file. meta.json goes last: readers treat it as "build done".
+
+def temp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def save_npy(path: str, array):
+    tmp = temp_path(path)
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def save_json(path: str, obj):
+    tmp = temp_path(path)
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def build_travel_matrix(origin_keys, origin_coords, dest_keys, dest_coords, out_dir: str,
+                        chunk_size=100_000) -> str:
+    """Writes meta.json + matrix.npy; destinations are filled in column chunks."""
+    origin_coords = np.asarray(origin_coords, dtype=np.float32).reshape(-1, 2)
+    dest_coords = np.asarray(dest_coords, dtype=np.float32).reshape(-1, 2)
+    n = len(dest_keys)
+
+    os.makedirs(out_dir, exist_ok=True)
+    matrix_path = os.path.join(out_dir, "matrix.npy")
+    matrix = np.lib.format.open_memmap(
+        temp_path(matrix_path),
+        mode="w+", dtype=np.float32, shape=(len(METRICS), len(origin_keys), n),
+    )
+    for start in range(0, n, chunk_size):
+        block = dest_coords[start:start + chunk_size]
+        distance = haversine_km(
+            origin_coords[:, None, 0], origin_coords[:, None, 1],
+            block[None, :, 0], block[None, :, 1],
+        )
+        matrix[:, :, start:start + len(block)] = travel_metrics(distance)
+
+    max_trip_cost = float(matrix[METRICS.index("trip_cost")].max()) if n else 1.0
+    matrix.flush()
+    del matrix
+    os.replace(temp_path(matrix_path), matrix_path)
+
+    save_json(os.path.join(out_dir, "meta.json"), {
+        "version": MATRIX_VERSION,
+        "metrics": list(METRICS),
+        "origins": list(origin_keys),
+        "origin_coords": origin_coords.tolist(),
+        "destinations": list(dest_keys),
+        "max_trip_cost": max_trip_cost,
+    })
+
+    return out_dir
+
+
+def matrix_meta(path: str):
+    """<path>/meta.json, or None if there is no complete matrix there."""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def default_origins():
+    """Airports first, then states: the origin set every matrix is built with."""
+    keys = list(AIRPORTS) + sorted(STATE_CENTROIDS)
+    coords = [AIRPORTS[k][1:] for k in AIRPORTS] + [STATE_CENTROIDS[s] for s in sorted(STATE_CENTROIDS)]
+    return keys, coords
+
+
+class TravelMatrix:
+    """Memory-mapped (metric, origin, destination) matrix with O(1) lookups."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        self.path = path
+        self.origins = self.meta["origins"]
+        self.destinations = self.meta["destinations"]
+        self.max_trip_cost = self.meta["max_trip_cost"] or 1.0
+        self._origin_index = {k: i for i, k in enumerate(self.origins)}
+        self._origin_coords = self.meta["origin_coords"]
+        self._dest_index = {}
+        for i, key in enumerate(self.destinations):
+            self._dest_index.setdefault(key.lower(), i)
+            # "Miami, Florida" is also reachable as "miami"
+            self._dest_index.setdefault(key.split(",")[0].strip().lower(), i)
+
+        self.matrix = np.load(os.path.join(path, "matrix.npy"), mmap_mode="r")
+
+    @classmethod
+    def load_airports(cls) -> "TravelMatrix":
+        """
+        Airport/state × airport matrix, built on first use and rebuilt when the
+        one on disk is from another MATRIX_VERSION or another airport table.
+        """
+        meta = matrix_meta(DEFAULT_AIRPORT_MATRIX_DIR)
+        if (
+            meta is None
+            or meta.get("version", 0) != MATRIX_VERSION
+            or meta["origins"] != default_origins()[0]
+            or meta["destinations"] != list(AIRPORTS)
+        ):
+            build_airport_matrix(DEFAULT_AIRPORT_MATRIX_DIR)
+        return cls(DEFAULT_AIRPORT_MATRIX_DIR)
+
+    # ---------- key resolution ----------
+
+    def origin_index(self, origin):
+        """IATA code, state code/name or known city → origin row, else None."""
+        if not origin:
+            return None
+        key = str(origin).strip()
+        if key.upper() in self._origin_index:
+            return self._origin_index[key.upper()]
+        iata = CITY_AIRPORTS.get(key.lower())
+        if iata in self._origin_index:
+            return self._origin_index[iata]
+        state = normalize_state(key)
+        return self._origin_index.get(state)
+
+    def origin_coords(self, origin):
+        i = self.origin_index(origin)
+        return None if i is None else tuple(self._origin_coords[i])
+
+    def destination_index(self, destination):
+        if not destination:
+            return None
+        key = str(destination).strip().lower()
+        if key in self._dest_index:
+            return self._dest_index[key]
+        iata = CITY_AIRPORTS.get(key)
+        return self._dest_index.get(iata.lower()) if iata else None
+
+    # ---------- lookups ----------
+
+    def row(self, origin, metric="trip_cost"):
+        """(N,) view of one metric for one origin, or None if the origin is unknown."""
+        i = self.origin_index(origin)
+        if i is None:
+            return None
+        return self.matrix[METRICS.index(metric), i]
+
+    def lookup(self, origin, destination):
+        """All metrics for one pair as a dict, or None if either key is unknown."""
+        i, j = self.origin_index(origin), self.destination_index(destination)
+        if i is None or j is None:
+            return None
+        values = self.matrix[:, i, j]
+        return {
+            "origin": self.origins[i],
+            "destination": self.destinations[j],
+            "distance_km": int(round(float(values[0]))),
+            "flight_hours": round(float(values[1]), 1),
+            "fare_band_usd": [int(round(float(values[2]))), int(round(float(values[3])))],
+            "round_trip_cost_usd": int(round(float(values[4]))),
+        }
+
+
+def build_airport_matrix(out_dir: str = DEFAULT_AIRPORT_MATRIX_DIR) -> str:
+    origin_keys, origin_coords = default_origins()
+    dest_keys = list(AIRPORTS)
+    dest_coords = [AIRPORTS[k][1:] for k in dest_keys]
+    return build_travel_matrix(origin_keys, origin_coords, dest_keys, dest_coords, out_dir)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "build-airports":
+        build_airport_matrix(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_AIRPORT_MATRIX_DIR)
+        print("Built airport matrix.")
+    elif len(sys.argv) >= 4 and sys.argv[1] == "lookup":
+        print(json.dumps(TravelMatrix.load_airports().lookup(sys.argv[2], sys.argv[3]), indent=2))
+    else:
+        print(__doc__)
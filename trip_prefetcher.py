@@ -0,0 +1,123 @@
+"""
+Speculative prefetch of trip data while the LLM is thinking.
+
+In "Plan a 4-day Miami vacation ... flying from DEN" the destination and the
+home airport are obvious before the planner has picked a single tool.
+TripPrefetcher spots known cities / IATA codes with a cheap regex pass and
+starts the matching hotel / restaurant / activity / flight lookups in the
+background through the shared SimpleToolExecutor, skipping places a tool
+has no data for (executor.supports). Results land in the tool
+cache, and a ReAct call made while a prefetch is still running waits for
+that fetch instead of starting a second one.
+
+    prefetcher = TripPrefetcher(executor)
+    prefetcher.prefetch(user_message)     # returns immediately
+    answer = await agent.arun(user_message)
+"""
+
+import asyncio
+import json
+import re
+
+from metrics import metrics
+from tool_cache import is_error_result
+from travel_matrix import AIRPORTS, CITY_AIRPORTS
+
+# Words that introduce the home city / airport ("flying from DEN", "out of Denver")
+ORIGIN_CUES = re.compile(r"\b(?:from|out of|leaving|departing|based in|live in|home is)\s+(?:the\s+)?$", re.I)
+
+
+def _alternation(names) -> str:
+    return "|".join(sorted((re.escape(n) for n in names), key=len, reverse=True))
+
+
+# 2-3 letter aliases ("la", "nyc") are ordinary words in lower case ("ooh la la"): they
+# only count written in capitals ("LA") or right after a travel cue ("to la", "from nyc")
+_SHORT_ALIASES = [c for c in CITY_AIRPORTS if len(c) <= 3]
+_CITY_PATTERN = re.compile(r"\b(" + _alternation(c for c in CITY_AIRPORTS if len(c) > 3) + r")\b", re.I)
+_SHORT_CITY_PATTERN = re.compile(r"\b(" + _alternation(c.upper() for c in _SHORT_ALIASES) + r")\b")
+_CUED_SHORT_CITY_PATTERN = re.compile(r"\b(?:to|from|in|visit|visiting)\s+(" + _alternation(_SHORT_ALIASES) + r")\b", re.I)
+_IATA_PATTERN = re.compile(r"\b([A-Z]{3})\b")
+
+
+def extract_trip_entities(text: str) -> dict:
+    """
+    Returns {"origin": {...} | None, "destinations": [{...}, ...]} where each
+    place is {"city": "miami", "iata": "MIA"}. Only places in travel_matrix.py
+    are recognized; anything else is ignored.
+    """
+    mentions = []
+
+    def add(start, end, iata):
+        if not any(s <= start < e for s, e, _, _ in mentions):
+            mentions.append((start, end, AIRPORTS[iata][0], iata))
+
+    for pattern in (_CITY_PATTERN, _SHORT_CITY_PATTERN, _CUED_SHORT_CITY_PATTERN):
+        for m in pattern.finditer(text):
+            add(m.start(1), m.end(1), CITY_AIRPORTS[m.group(1).lower()])
+    for m in _IATA_PATTERN.finditer(text):
+        if m.group(1) in AIRPORTS:
+            add(m.start(), m.end(), m.group(1))
+    mentions.sort()
+
+    origin, destinations = None, []
+    for start, _, city, iata in mentions:
+        place = {"city": city, "iata": iata}
+        if origin is None and ORIGIN_CUES.search(text[max(0, start - 24):start]):
+            origin = place
+        elif place not in destinations:
+            destinations.append(place)
+
+    if origin is not None:
+        destinations = [d for d in destinations if d["iata"] != origin["iata"]]
+    return {"origin": origin, "destinations": destinations}
+
+
+class TripPrefetcher:
+    """
+    executor:         the SimpleToolExecutor (and its cache) the agents use.
+    max_destinations: only the first N destinations mentioned are prefetched.
+    """
+
+    CITY_TOOLS = ("hotel_search", "restaurant_search", "activity_search")
+
+    def __init__(self, executor, max_destinations: int = 1, timeout: float = None):
+        self.executor = executor
+        self.max_destinations = max_destinations
+        self.timeout = timeout
+        self._tasks = set()
+
+    def plan(self, text: str) -> list:
+        """(tool_name, tool_input) calls worth making for this message."""
+        entities = extract_trip_entities(text)
+        origin = entities["origin"]
+        calls = []
+        for dest in entities["destinations"][:self.max_destinations]:
+            for tool in self.CITY_TOOLS:
+                calls.append((tool, json.dumps({"city": dest["city"]})))
+            if origin is not None:
+                calls.append(("flight_search", json.dumps({"origin": origin["iata"], "destination": dest["iata"]})))
+        return [(name, tool_input) for name, tool_input in calls if self.executor.supports(name, tool_input)]
+
+    def prefetch(self, text: str) -> list:
+        """
+        Schedules the lookups on the running loop and returns their tasks
+        without waiting. Failures are only counted in metrics.
+        """
+        calls = self.plan(text)
+        tasks = [asyncio.ensure_future(self._fetch(name, tool_input)) for name, tool_input in calls]
+        for task in tasks:
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return tasks
+
+    async def _fetch(self, tool_name, tool_input):
+        metrics.incr("prefetch.started")
+        result = await self.executor.aexecute(tool_name, tool_input, self.timeout, compact=False)  # only warms the cache
+        metrics.incr("prefetch.failed" if is_error_result(result) else "prefetch.completed")
+        return result
+
+    def cancel(self):
+        """Drops prefetches that haven't finished (e.g. when the session ends)."""
+        for task in list(self._tasks):
+            task.cancel()
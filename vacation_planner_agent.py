@@ -16,18 +16,25 @@
 #   FAIR-LLM IMPORTS
 # =========================
  
+import argparse
 import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
  
 # =========================
 #   FAIR-LLM IMPORTS
 # =========================
  
 # Try fairlib first, then fair_llm (depending on how the package is exposed)
+from fairlib.core.message import Message
 from fairlib import (
         SimpleAgent,
         ReActPlanner,
         ToolRegistry,
-        HuggingFaceAdapter,
     )
  
 # =========================
@@ -40,6 +47,25 @@ from activity_search_tool import ActivitySearchTool
 from hotel_search_tool import HotelSearchTool
 from budget_tool import BudgetTool
 from structured_output_formatter_tool import StructuredOutputFormatterTool
+from multi_tool_call_tool import MultiToolCallTool
+from observation_lookup_tool import ObservationLookupTool
+from tool_worker_pool import ToolWorkerPool, get_default_pool
+from tool_cache import ToolResultCache, tool_ttl
+from observation_compactor import ObservationCompactor
+from metrics import metrics
+from model_pool import model_pool
+from windowed_memory import WindowedMemory
+from trip_prefetcher import TripPrefetcher
+from llm_streaming import StreamingLLM, astream_answer
+from llm_cache import CachedLLM
+from lazy_model import LazyLLM
+from prefix_cache import PrefixCachedLLM, PrefixKVStore, is_hf_model
+from batch_scheduler import BatchingLLM
+from resilient_llm import ResilientLLM
+from fast_path_planner import FastPathPlanner
+from tracing import span, trace, tracer
+from async_console import AsyncLineReader, agent_chunks, print_stream
+from persistent_memory import DEFAULT_DB_PATH, PersistentMemory, list_sessions
  
  
 # =========================
@@ -69,32 +95,258 @@ class SimpleMemory:
 #   SIMPLE TOOL EXECUTOR
 # =========================
  
+def _run_coroutine_sync(coro):
+    """
+    Runs a coroutine to completion from sync code. Inside a running event loop
+    it runs on a helper thread, but the calling loop is still blocked until it
+    finishes: there is no concurrency to gain here, async code must await
+    aexecute / aexecute_batch instead (as SimpleAgent's loop does).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+ 
+    metrics.incr("tool_executor.sync_calls_in_loop")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+ 
+ 
 class SimpleToolExecutor:
     """
     Looks up tools in ToolRegistry and calls their .use() method.
+    Independent calls can be run concurrently with aexecute_batch / execute_batch
+    (the multi_tool_call tool exposes this to the planner).
+    Async calls run on a ToolWorkerPool (shared per process unless one is passed),
+    which caps concurrency per tool.concurrency_group; tools with an async
+    `ause()` are awaited on the loop instead.
+    Results of tools that declare `cache_ttl` are memoized in a ToolResultCache.
+    Observations are compacted for the prompt by an ObservationCompactor; the
+    cache keeps full results, and pass compact=False to get them directly.
     """
  
-    def __init__(self, registry: ToolRegistry):
+    def __init__(self, registry: ToolRegistry, call_timeout: float = 30.0, pool: ToolWorkerPool = None,
+                 cache: ToolResultCache = None, compactor: ObservationCompactor = None):
         self.registry = registry
+        self.call_timeout = call_timeout
+        self.pool = pool or get_default_pool()
+        self.cache = cache if cache is not None else ToolResultCache()
+        self.compactor = compactor or ObservationCompactor()
+        self._inflight = {}   # cache key -> concurrent Future of the running call
+        self._inflight_lock = threading.Lock()
+ 
+    def execute(self, tool_name: str, tool_input: str, compact: bool = True) -> str:
+        # For sync callers; blocks the calling thread for the whole call. Same path
+        # as aexecute so group caps and deadlines apply to them too
+        return _run_coroutine_sync(self.aexecute(tool_name, tool_input, compact=compact))
+ 
+    async def aexecute(self, tool_name: str, tool_input: str, timeout: float = None, compact: bool = True) -> str:
+        """
+        Async single call: the blocking .use() runs on the worker pool with a
+        deadline. Never raises — errors and timeouts come back as observations.
+        """
+        with span(f"tool.{tool_name}", "tool") as span_args:
+            result = await self._aexecute(tool_name, tool_input, timeout, span_args)
+        return self._compact(tool_name, result) if compact else result
+ 
+    def supports(self, tool_name: str, tool_input: str) -> bool:
+        """
+        Whether a call could succeed: the tool is registered and, if it has a
+        supports(payload) check (cities / airports it knows), that accepts it.
+        For speculative callers; aexecute() itself reports unsupported input.
+        """
+        tool = self.registry.get_tool(tool_name)
+        if tool is None:
+            return False
+        check = getattr(tool, "supports", None)
+        if check is None:
+            return True
+        try:
+            return bool(check(json.loads(tool_input)))
+        except (TypeError, ValueError, AttributeError):
+            return False
+
+    def _compact(self, tool_name: str, result: str) -> str:
+        tool = self.registry.get_tool(tool_name)
+        if not getattr(tool, "compact_output", True):
+            return self.compactor.minify(result)
+        return self.compactor.compact(result, getattr(tool, "observation_tokens", None))
  
-    def execute(self, tool_name: str, tool_input: str) -> str:
+    async def _aexecute(self, tool_name, tool_input, timeout, span_args) -> str:
         tool = self.registry.get_tool(tool_name)
         if tool is None:
             return f"Error: Tool '{tool_name}' not found."
  
+        timeout = self.call_timeout if timeout is None else timeout
+        ttl = tool_ttl(tool)
+        if not ttl:
+            return await self._run(tool, tool_name, tool_input, timeout)
+ 
+        key = self.cache.key(tool_name, tool_input, getattr(tool, "normalize_input", None))
+        cached = self.cache.get(key)
+        if cached is not None:
+            span_args["cache"] = "hit"
+            return cached
+ 
+        # Same call already running (e.g. started by the prefetcher): wait for it
+        with self._inflight_lock:
+            shared = self._inflight.get(key)
+            if shared is None:
+                shared = self._inflight[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            metrics.incr("tool_cache.inflight_joins")
+            span_args["cache"] = "joined"
+            try:
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(shared)), timeout)
+            except asyncio.TimeoutError:
+                return f"Error: Tool '{tool_name}' timed out after {timeout}s."
+ 
+        result = f"Error running tool '{tool_name}': cancelled"
+        try:
+            result = await self._run(tool, tool_name, tool_input, timeout)
+            self.cache.put(key, result, ttl)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            shared.set_result(result)
+ 
+    async def _run(self, tool, tool_name, tool_input, timeout) -> str:
+        group = getattr(tool, "concurrency_group", None) or tool_name
         try:
-            return tool.use(tool_input)
+            if hasattr(tool, "ause"):   # awaits other tools (multi_tool_call): stays on the loop
+                return await asyncio.wait_for(tool.ause(tool_input), timeout)
+            return await self.pool.run(group, tool.use, tool_input, timeout=timeout)
+        except asyncio.TimeoutError:
+            return f"Error: Tool '{tool_name}' timed out after {timeout}s."
         except Exception as e:
             return f"Error running tool '{tool_name}': {e}"
  
+    async def aexecute_batch(self, calls, timeout: float = None, compact: bool = True) -> list:
+        """
+        Runs independent (tool_name, tool_input) calls concurrently.
+        Returns observations in the same order; one failing call does not affect the others.
+        """
+        results = await asyncio.gather(
+            *(self.aexecute(name, tool_input, timeout, compact) for name, tool_input in calls),
+            return_exceptions=True,
+        )
+        return [
+            f"Error running tool '{name}': {r}" if isinstance(r, BaseException) else r
+            for (name, _), r in zip(calls, results)
+        ]
+ 
+    def execute_batch(self, calls, timeout: float = None, compact: bool = True) -> list:
+        return _run_coroutine_sync(self.aexecute_batch(calls, timeout, compact))
+ 
  
 # =========================
 #   BUILD VACATION AGENT
 # =========================
  
-def build_vacation_agent() -> SimpleAgent:
-    llm = HuggingFaceAdapter(model_name="TinyLlama/TinyLlama-1.1B-Chat-v1.0")
- 
+MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+
+# VACATION_MODEL_BACKEND=gguf swaps the full-precision HF adapter for quantized
+# llama.cpp weights (quantized_llm.py); VACATION_MODEL_QUANT picks Q4_K_M / Q8_0.
+# =groq uses the hosted model (tinyllama_llm.py) behind retries and a circuit breaker.
+MODEL_BACKEND = os.environ.get("VACATION_MODEL_BACKEND", "hf")
+MODEL_QUANT = os.environ.get("VACATION_MODEL_QUANT", "Q4_K_M")
+# hf / gguf: local model the calls fail over to when the primary backend is down (resilient_llm.py)
+MODEL_FALLBACK = os.environ.get("VACATION_MODEL_FALLBACK") or None
+# > 1: concurrent generations on the HF model share decode steps (batch_scheduler.py)
+MODEL_MAX_BATCH = int(os.environ.get("VACATION_MODEL_MAX_BATCH", "1"))
+ 
+ 
+class SharedComponents(NamedTuple):
+    """Everything agents can share: one model, one tool registry, one executor."""
+    llm: object
+    registry: ToolRegistry
+    executor: SimpleToolExecutor
+
+    def close(self):
+        """Gives the shared model back to model_pool; drop these components afterwards."""
+        release_shared_model()
+
+
+# Pool references taken by load_shared_model(): (pool kwargs, wrapper around the model)
+_pool_leases = []
+_pool_leases_lock = threading.Lock()
+
+
+def _load_local(backend: str, max_batch: int):
+    options = {} if backend == "hf" else {"backend": backend, "quant": MODEL_QUANT}
+    llm = model_pool.get(MODEL_NAME, **options)
+    if is_hf_model(llm):
+        if max_batch > 1:
+            llm = BatchingLLM(llm, max_batch=max_batch, prefix_store=PrefixKVStore())
+        else:
+            llm = PrefixCachedLLM(llm)
+    with _pool_leases_lock:
+        _pool_leases.append((options, llm))
+    return llm
+
+
+def release_shared_model(evict: bool = True) -> int:
+    """
+    Releases every model load_shared_model() took from model_pool and stops
+    their batching threads; with evict=True, unreferenced models are then
+    unloaded. Returns the number of references released.
+    """
+    with _pool_leases_lock:
+        leases = _pool_leases[:]
+        _pool_leases.clear()
+    for options, llm in leases:
+        if isinstance(llm, BatchingLLM):
+            llm.close()
+        model_pool.release(MODEL_NAME, **options)
+    if evict:
+        model_pool.evict_unused()
+    return len(leases)
+
+
+def load_shared_model(max_batch: int = MODEL_MAX_BATCH):
+    """
+    The process-wide model. HF models get KV prefix reuse across ReAct steps
+    and sessions (prefix_cache.py) and, with max_batch > 1, continuous
+    batching (batch_scheduler.py). The hosted backend, or any backend with a
+    fallback configured, is wrapped in ResilientLLM; the fallback model is
+    only loaded on first failover. A local backend whose package is missing
+    (gguf without llama-cpp-python) loads the fallback, or the HF adapter, in
+    its place. Wrap the result, not the raw adapter, in anything that limits
+    or counts generations.
+    """
+    if MODEL_BACKEND == "groq":
+        from tinyllama_llm import TinyLlamaLLM   # needs the groq package only when selected
+        llm = TinyLlamaLLM()
+    else:
+        try:
+            llm = _load_local(MODEL_BACKEND, max_batch)
+        except ImportError as e:
+            # e.g. gguf without llama-cpp-python: run on the fallback (or the HF adapter) instead
+            backend = MODEL_FALLBACK or "hf"
+            if backend == MODEL_BACKEND:
+                raise
+            print(f"[model] {e}; using the {backend!r} backend instead")
+            return _load_local(backend, max_batch)
+    if MODEL_BACKEND != "groq" and not MODEL_FALLBACK:
+        return llm
+    fallbacks = [lambda: _load_local(MODEL_FALLBACK, max_batch)] if MODEL_FALLBACK else []
+    return ResilientLLM(llm, fallbacks=fallbacks)
+
+
+def build_shared_components(llm=None, llm_cache: bool = True) -> SharedComponents:
+    # 1. Shared model: loaded once per process, reused by every agent. LazyLLM loads and
+    #    warms it up in the background, so building agents does not wait for the weights.
+    #    CachedLLM answers repeated deterministic prompts from disk (sampling models pass through);
+    #    StreamingLLM lets VacationAgent.astream() forward the final answer token by token.
+    if llm is None:
+        llm = LazyLLM(load_shared_model, name=MODEL_NAME)
+    if llm_cache:
+        llm = CachedLLM(llm)
+    llm = StreamingLLM(llm)
  
     # 2. Register tools
     registry = ToolRegistry()
@@ -105,21 +357,74 @@ def build_vacation_agent() -> SimpleAgent:
     registry.register_tool(BudgetTool())
     registry.register_tool(StructuredOutputFormatterTool())
  
-    # 3. Create planner
-    planner = ReActPlanner(llm, registry)
- 
-    # 4. Create executor + memory
+    # 3. Create executor; multi_tool_call lets the planner batch independent lookups
     executor = SimpleToolExecutor(registry)
-    memory = SimpleMemory()
+    registry.register_tool(MultiToolCallTool(executor))
+    # Shortened observations point back to their full result through this tool
+    registry.register_tool(ObservationLookupTool(executor.compactor.store))
+ 
+    return SharedComponents(llm, registry, executor)
+ 
+ 
+class VacationPlanner(ReActPlanner):
+    """
+    ReActPlanner with each planning call traced as "agent.plan". The span
+    covers the LLM call only; the tools the step then runs are recorded as
+    their own "tool.*" spans under the same "agent.turn" trace.
+    """
+ 
+    async def aplan(self, *args, **kwargs):
+        with span("agent.plan", "agent"):
+            return await super().aplan(*args, **kwargs)
+ 
+ 
+class VacationAgent(SimpleAgent):
+    """
+    SimpleAgent plus:
+      * a deterministic fast path for standard trip requests (falls back to ReAct);
+      * astream(), which yields the final answer as it is generated.
+    """
+ 
+    def __init__(self, *args, fast_path: FastPathPlanner = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fast_path = fast_path
+ 
+    async def arun(self, user_input, **kwargs):
+        with trace("agent.turn", "agent") as span_args:
+            if self.fast_path is not None and isinstance(user_input, str):
+                answer = await self.fast_path.arun(user_input)
+                if answer is not None:
+                    span_args["path"] = "fast"
+                    self.memory.add_message(Message(role="user", content=user_input))
+                    self.memory.add_message(Message(role="assistant", content=answer))
+                    return answer
+            span_args["path"] = "react"
+            return await super().arun(user_input, **kwargs)
+ 
+    def astream(self, message: str):
+        return astream_answer(self, message)
+ 
+ 
+def build_vacation_agent(memory=None, shared: SharedComponents = None, fast_path: bool = True) -> VacationAgent:
+    """
+    One agent = one conversation. Pass `shared` to reuse the model, tools and
+    executor across many agents (e.g. one per server session).
+    """
+    llm, registry, executor = shared or build_shared_components()
+ 
+    # 4. Create planner + memory
+    planner = VacationPlanner(llm, registry)
+    memory = memory if memory is not None else WindowedMemory(max_tokens=1500)
  
     # 5. Build the SimpleAgent
-    agent = SimpleAgent(
+    agent = VacationAgent(
         llm=llm,
         planner=planner,
         tool_executor=executor,
         memory=memory,
         max_steps=6,      # number of ReAct steps
         stateless=False,  # keep memory between steps
+        fast_path=FastPathPlanner(llm, executor) if fast_path else None,
     )
  
     return agent
@@ -130,7 +435,9 @@ def build_vacation_agent() -> SimpleAgent:
 # =========================
  
 async def run_single():
-    agent = build_vacation_agent()
+    shared = build_shared_components()
+    agent = build_vacation_agent(shared=shared)
+    prefetcher = TripPrefetcher(shared.executor)
  
     query = (
         "Plan a 4-day Miami vacation for two college students. "
@@ -139,76 +446,63 @@ async def run_single():
         "Give me the final answer as a markdown itinerary table."
     )
  
+    prefetcher.prefetch(query)  # hotels/food/activities/flights start loading while the LLM thinks
     result = await agent.arun(query)
     print("\n\n===== VACATION PLAN =====\n")
     print(result)
  
  
-# =========================
-#   INTERACTIVE CHAT
-# =========================
- 
-async def chat():
-    agent = build_vacation_agent()
-    print("✨ Vacation Planner Ready! Type your request or 'quit'.")
- 
-    while True:
-        user_input = input("\nYou: ")
-        if user_input.lower() in {"quit", "exit"}:
-            break
- 
-        print("\nAgent:\n")
-        answer = await agent.arun(user_input)
-        print(answer)
- 
- 
-# =========================
-#   MAIN ENTRY
-# =========================
- 
-#if __name__ == "__main__":
-    # Option 1: run one predefined vacation plan
-    # asyncio.run(run_single())
- 
-    # Option 2: interactive mode
- #   asyncio.run(chat())
 # =========================
 #   CHAT LOOP
 # =========================
  
-async def chat():
+async def chat(session_id=None, db_path=None):
     """
     Simple interactive loop for the vacation planner agent.
+    The conversation is saved to disk; pass session_id to pick it up again.
     """
-    agent = build_vacation_agent()
+    memory = PersistentMemory(db_path or DEFAULT_DB_PATH, session_id=session_id, max_tokens=1500)
+    shared = build_shared_components()
+    agent = build_vacation_agent(memory=memory, shared=shared)
+    prefetcher = TripPrefetcher(shared.executor)
  
     print("\n=== Vacation Planner Agent ===")
+    if session_id:
+        print(f"Resumed session {memory.session_id} ({memory.resumed_messages} recent messages loaded).")
+    else:
+        print(f"Session {memory.session_id} (resume later with --session {memory.session_id}).")
     print("Type a request like:")
     print("  Plan a 3-day trip to Miami for 2 college students from Denver, budget $1200.")
     print("Type 'quit' or 'exit' to stop.\n")
  
-    while True:
-        try:
-            user_input = input("You: ")
-        except (EOFError, KeyboardInterrupt):
-            print("\nExiting. Goodbye!")
-            break
- 
-        if not user_input.strip():
-            continue
- 
-        if user_input.lower() in {"quit", "exit"}:
-            print("Goodbye!")
-            break
- 
-        print("\nAgent:\n")
-        try:
-            answer = await agent.arun(user_input)
-        except Exception as e:
-            print(f"[ERROR while running agent] {e}")
-        else:
-            print(answer)
-        print()  # blank line between turns
+    # stdin is read off-loop, so prefetches keep running while the user types
+    reader = AsyncLineReader()
+    try:
+        while True:
+            try:
+                user_input = await reader.readline("You: ")
+            except EOFError:
+                print("\nExiting. Goodbye!")
+                break
+ 
+            if not user_input.strip():
+                continue
+ 
+            if user_input.lower() in {"quit", "exit"}:
+                print("Goodbye!")
+                break
+ 
+            print("\nAgent:\n")
+            prefetcher.prefetch(user_input)
+            try:
+                await print_stream(agent_chunks(agent, user_input))
+            except Exception as e:
+                print(f"[ERROR while running agent] {e}")
+            print()  # blank line between turns
+    finally:
+        # Ctrl-C reaches here as asyncio.run() cancelling this task, not from readline()
+        prefetcher.cancel()
+        memory.close()
  
  
 # =========================
@@ -216,4 +510,23 @@ async def chat():
 # =========================
  
 if __name__ == "__main__":
-    asyncio.run(chat())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Vacation planner chat")
+    parser.add_argument("--session", help="resume a saved session by id")
+    parser.add_argument("--sessions", action="store_true", help="list saved sessions and exit")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="session store (SQLite)")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace of the session on exit")
+    args = parser.parse_args()
+ 
+    if args.sessions:
+        for s in list_sessions(args.db):
+            print(f"{s['session_id']}  {s['messages']:>5} messages  last used {time.ctime(s['updated'])}")
+    else:
+        if args.trace:
+            tracer.enable()
+        try:
+            asyncio.run(chat(session_id=args.session, db_path=args.db))
+        except KeyboardInterrupt:
+            print("\nExiting. Goodbye!")
+        finally:
+            if args.trace:
+                print(f"Trace written to {tracer.export(args.trace)}")
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+Multi-session asyncio HTTP server for the vacation planner.
+
+One process hosts many conversations. Each session owns its WindowedMemory
+(and its SimpleAgent); every session shares the model, the tool registry,
+the tool executor / worker pool and the pooled HTTP session.
+
+    python vacation_server.py --port 8080 --max-sessions 200 --max-concurrent-llm 4
+    python vacation_server.py --max-concurrent-llm 8 --max-batch 8   # batched decoding on the HF model
+
+Endpoints (JSON in, JSON out):
+
+    POST   /sessions                     -> {"session_id": "..."}
+    POST   /sessions/<id>/messages       {"message": "..."} -> {"answer": "..."}
+    DELETE /sessions/<id>
+    GET    /health
+    GET    /metrics
+
+Admission control: at most --max-sessions live sessions (503 beyond that),
+at most --max-pending turns queued or running across all sessions (429),
+and one turn at a time per session (429). Sessions idle for longer than
+--idle-timeout seconds are evicted.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from async_http import HTTPError, start_http_server
+from lazy_model import LazyLLM
+from metrics import metrics
+from tool_worker_pool import SlotLimiter
+from trip_prefetcher import TripPrefetcher
+from vacation_planner_agent import (
+    MODEL_MAX_BATCH,
+    MODEL_NAME,
+    build_shared_components,
+    build_vacation_agent,
+    load_shared_model,
+)
+from windowed_memory import WindowedMemory
+
+# =========================
+#   SHARED LLM LIMIT
+# =========================
+
+class ConcurrencyLimitedLLM:
+    """
+    Wraps the shared model so at most `max_concurrent` generations run at once,
+    whatever the number of sessions. Async and sync calls share the same
+    slots. Everything else is forwarded unchanged.
+    """
+
+    def __init__(self, llm, max_concurrent: int = 4):
+        self._llm = llm
+        self.max_concurrent = max_concurrent
+        self._slots = SlotLimiter(max_concurrent)
+
+    async def _acquire(self):
+        metrics.gauge("server.llm_waiting", self._slots.waiting + 1)
+        try:
+            await self._slots.acquire()
+        finally:
+            metrics.gauge("server.llm_waiting", self._slots.waiting)
+
+    async def ainvoke(self, *args, **kwargs):
+        await self._acquire()
+        try:
+            return await self._llm.ainvoke(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    async def astream(self, *args, **kwargs):
+        await self._acquire()
+        try:
+            async for chunk in self._llm.astream(*args, **kwargs):
+                yield chunk
+        finally:
+            self._slots.release()
+
+    def invoke(self, *args, **kwargs):
+        self._slots.acquire_blocking()
+        try:
+            return self._llm.invoke(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def stream(self, *args, **kwargs):
+        if not hasattr(self._llm, "stream"):
+            raise NotImplementedError("wrapped model has no stream()")
+        self._slots.acquire_blocking()
+        try:
+            yield from self._llm.stream(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+
+# =========================
+#   SESSIONS
+# =========================
+
+class Session:
+
+    def __init__(self, session_id, agent, memory):
+        self.id = session_id
+        self.agent = agent
+        self.memory = memory
+        self.created = self.last_active = time.monotonic()
+        self.turns = 0
+        self.lock = asyncio.Lock()  # one turn at a time per session
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+
+class VacationServer:
+
+    def __init__(self, shared=None, max_sessions=200, max_pending=400, max_concurrent_llm=4, max_batch=MODEL_MAX_BATCH,
+                 idle_timeout=900.0, turn_timeout=300.0, memory_factory=WindowedMemory):
+        if shared is None:
+            llm = LazyLLM(lambda: load_shared_model(max_batch), name=MODEL_NAME)
+            llm = ConcurrencyLimitedLLM(llm, max_concurrent_llm)
+            shared = build_shared_components(llm)
+            self._owns_shared = True
+        else:
+            self._owns_shared = False
+        self.shared = shared
+        self.prefetcher = TripPrefetcher(shared.executor)
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.idle_timeout = idle_timeout
+        self.turn_timeout = turn_timeout
+        self.memory_factory = memory_factory
+
+        self.sessions = {}
+        self._pending = 0
+        self._server = None
+        self._reaper = None
+
+    # ---------- lifecycle ----------
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self._server = await start_http_server(self.handle, host, port)
+        self._reaper = asyncio.create_task(self._evict_idle_loop())
+        return self._server
+
+    async def stop(self):
+        if self._reaper:
+            self._reaper.cancel()
+        self.prefetcher.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._owns_shared:
+            await asyncio.to_thread(self.shared.close)   # joins the batching thread, if any
+
+    async def _evict_idle_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 4))
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        idle = [
+            sid for sid, s in self.sessions.items()
+            if not s.lock.locked() and now - s.last_active > self.idle_timeout
+        ]
+        for sid in idle:
+            self.close_session(sid)
+        if idle:
+            metrics.incr("server.sessions_evicted", len(idle))
+        return len(idle)
+
+    # ---------- sessions ----------
+
+    def open_session(self) -> Session:
+        if len(self.sessions) >= self.max_sessions:
+            # Make room from idle sessions before refusing
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                metrics.incr("server.rejected_sessions")
+                raise HTTPError(503, "Server is at its session limit; try again later.")
+
+        memory = self.memory_factory()
+        agent = build_vacation_agent(memory=memory, shared=self.shared)
+        session = Session(uuid.uuid4().hex, agent, memory)
+        self.sessions[session.id] = session
+        metrics.gauge("server.sessions", len(self.sessions))
+        return session
+
+    def close_session(self, session_id) -> bool:
+        session = self.sessions.pop(session_id, None)
+        metrics.gauge("server.sessions", len(self.sessions))
+        return session is not None
+
+    async def run_turn(self, session: Session, message: str) -> str:
+        if self._pending >= self.max_pending:
+            metrics.incr("server.rejected_turns")
+            raise HTTPError(429, "Too many requests in flight; try again later.")
+        if session.lock.locked():
+            raise HTTPError(429, "This session is still answering its previous message.")
+
+        self._pending += 1
+        metrics.gauge("server.pending_turns", self._pending)
+        start = time.perf_counter()
+        try:
+            async with session.lock:
+                session.touch()
+                self.prefetcher.prefetch(message)
+                answer = await asyncio.wait_for(session.agent.arun(message), self.turn_timeout)
+                session.turns += 1
+                return answer
+        except asyncio.TimeoutError:
+            metrics.incr("server.turn_timeouts")
+            raise HTTPError(504, f"Agent did not answer within {self.turn_timeout}s.")
+        finally:
+            self._pending -= 1
+            session.touch()
+            metrics.gauge("server.pending_turns", self._pending)
+            metrics.observe("server.turn_s", time.perf_counter() - start)
+
+    # ---------- HTTP ----------
+
+    async def handle(self, request):
+        parts = [p for p in request.path.split("/") if p]
+
+        if request.method == "GET" and parts == ["health"]:
+            ready = getattr(self.shared.llm, "ready", True)   # False while a LazyLLM is still loading
+            return 200, {"status": "ok" if ready else "loading", "sessions": len(self.sessions), "pending_turns": self._pending}
+
+        if request.method == "GET" and parts == ["metrics"]:
+            return 200, metrics.snapshot()
+
+        if parts[:1] != ["sessions"]:
+            raise HTTPError(404, f"No route for {request.path}")
+
+        if len(parts) == 1 and request.method == "POST":
+            session = self.open_session()
+            return 201, {"session_id": session.id}
+
+        session = self.sessions.get(parts[1]) if len(parts) > 1 else None
+        if session is None:
+            raise HTTPError(404, "Unknown or expired session.")
+
+        if len(parts) == 2 and request.method == "DELETE":
+            self.close_session(session.id)
+            return 200, {"closed": session.id}
+
+        if parts[2:] == ["messages"] and request.method == "POST":
+            body = request.json()
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Body must be a JSON object.")
+            message = str(body.get("message", "")).strip()
+            if not message:
+                raise HTTPError(400, "Field 'message' is required.")
+            answer = await self.run_turn(session, message)
+            return 200, {"session_id": session.id, "answer": answer, "turns": session.turns}
+
+        raise HTTPError(405, f"{request.method} not allowed on {request.path}")
+
+
+# =========================
+#   MAIN ENTRY
+# =========================
+
+async def main():
+    parser = argparse.ArgumentParser(description="Multi-session vacation planner server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-sessions", type=int, default=200)
+    parser.add_argument("--max-pending", type=int, default=400)
+    parser.add_argument("--max-concurrent-llm", type=int, default=4)
+    parser.add_argument("--max-batch", type=int, default=MODEL_MAX_BATCH,
+                        help="HF model: generations decoded together (1 = one at a time)")
+    parser.add_argument("--idle-timeout", type=float, default=900.0, help="seconds")
+    parser.add_argument("--turn-timeout", type=float, default=300.0, help="seconds")
+    args = parser.parse_args()
+
+    server = VacationServer(
+        max_sessions=args.max_sessions,
+        max_pending=args.max_pending,
+        max_concurrent_llm=args.max_concurrent_llm,
+        max_batch=args.max_batch,
+        idle_timeout=args.idle_timeout,
+        turn_timeout=args.turn_timeout,
+    )
+    await server.start(args.host, args.port)
+    print(f"Vacation planner server listening on http://{args.host}:{args.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,220 @@
+"""
+Token-budgeted conversation memory for SimpleAgent.
+
+SimpleMemory keeps every message forever and get_history() copies the whole
+list, and the ReAct loop calls it on every step. WindowedMemory keeps:
+
+  * pinned messages (system prompts by default) that are never evicted;
+  * an optional running summary of evicted turns;
+  * a sliding window of the most recent turns, trimmed oldest-turn-first
+    whenever the total goes over `max_tokens`.
+
+A turn starts at a user message, so the user's question and the thoughts /
+observations that answered it leave the window together. The turn in
+progress is never evicted, even if it alone is over budget.
+
+get_history() returns a read-only HistoryView instead of a copy:
+len/index/slice/iterate work as on a list. It is a snapshot taken in O(1):
+it shares the memory's lists, which are only ever appended to; trimming and
+clear() swap in new lists rather than shifting the old ones, so a view is
+unaffected by messages added or evicted after it was taken.
+
+    memory = WindowedMemory(max_tokens=1500)
+    memory = WindowedMemory(max_tokens=1500, summarizer=my_summarizer)
+
+summarizer(evicted_messages, previous_summary) -> str is called synchronously
+whenever turns leave the window; its result replaces the previous summary.
+"""
+
+from collections.abc import Sequence
+
+from fairlib.core.message import Message
+
+OBSERVATION_PREFIX = "Observation:"
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def estimate_tokens(text) -> int:
+    """~4 characters per token plus per-message overhead; no tokenizer needed."""
+    return len(str(text or "")) // 4 + 4
+
+
+def pin_system_messages(msg) -> bool:
+    """Default pin rule: system prompts, but not ReAct observations stored as system."""
+    return msg.role == "system" and not str(msg.content or "").startswith(OBSERVATION_PREFIX)
+
+
+class HistoryView(Sequence):
+    """Read-only snapshot of pinned + summary + window, taken without copying."""
+
+    __slots__ = ("_pinned", "_n_pinned", "_summary", "_window", "_start", "_end")
+
+    def __init__(self, memory):
+        self._pinned = memory._pinned
+        self._n_pinned = len(memory._pinned)
+        self._summary = [memory._summary_msg] if memory._summary_msg is not None else []
+        self._window = memory._window
+        self._start = memory._start
+        self._end = len(memory._window)
+
+    def __len__(self):
+        return self._n_pinned + len(self._summary) + self._end - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+
+        if index < self._n_pinned:
+            return self._pinned[index]
+        index -= self._n_pinned
+        if index < len(self._summary):
+            return self._summary[index]
+        return self._window[self._start + index - len(self._summary)]
+
+    def __iter__(self):
+        for i in range(self._n_pinned):
+            yield self._pinned[i]
+        yield from self._summary
+        for i in range(self._start, self._end):
+            yield self._window[i]
+
+    def __repr__(self):
+        return f"HistoryView({len(self)} messages)"
+
+
+class WindowedMemory:
+    """
+    Drop-in replacement for SimpleMemory with a token budget.
+
+    max_tokens:   budget for pinned + summary + window.
+    count_tokens: text -> int; defaults to estimate_tokens (pass a tokenizer's
+                  counter for exact numbers).
+    pin:          msg -> bool; which messages are never evicted. Use
+                  lambda m: m.role in ("system", "tool") to pin tool results too.
+    summarizer:   optional hook for evicted turns (see module docstring).
+    """
+
+    def __init__(self, max_tokens: int = 1500, count_tokens=None, pin=None, summarizer=None):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+        self.pin = pin or pin_system_messages
+        self.summarizer = summarizer
+
+        self._pinned = []
+        self._pinned_tokens = 0
+
+        # Window is a list plus a start offset so evicting from the front is O(1)
+        self._window = []
+        self._window_costs = []
+        self._start = 0
+        self._window_tokens = 0
+        self._last_turn = 0  # index in _window where the current turn begins
+
+        self._summary = ""
+        self._summary_msg = None
+        self._summary_tokens = 0
+
+        self.evicted_messages = 0
+
+    # ---------- SimpleMemory interface ----------
+
+    def add_message(self, msg, pinned: bool = None):
+        cost = self.count_tokens(msg.content)
+        if pinned is None:
+            pinned = self.pin(msg)
+        if pinned:
+            self._pinned.append(msg)
+            self._pinned_tokens += cost
+        else:
+            if msg.role == "user":
+                self._last_turn = len(self._window)
+            self._window.append(msg)
+            self._window_costs.append(cost)
+            self._window_tokens += cost
+        self._trim()
+
+    def get_history(self) -> HistoryView:
+        return HistoryView(self)
+
+    async def aget_history(self) -> HistoryView:
+        return HistoryView(self)
+
+    def clear(self):
+        # New lists, not .clear(): views handed out earlier keep their contents
+        self._pinned = []
+        self._pinned_tokens = 0
+        self._window = []
+        self._window_costs = []
+        self._start = self._window_tokens = self._last_turn = 0
+        self._set_summary("")
+        self.evicted_messages = 0
+
+    # ---------- budget ----------
+
+    @property
+    def total_tokens(self) -> int:
+        return self._pinned_tokens + self._summary_tokens + self._window_tokens
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    def _trim(self):
+        if self.total_tokens <= self.max_tokens:
+            return
+
+        evicted = []
+        while self.total_tokens > self.max_tokens and self._start < self._last_turn:
+            end = self._next_turn(self._start)
+            for i in range(self._start, end):
+                evicted.append(self._window[i])
+                self._window_tokens -= self._window_costs[i]
+            self._start = end
+
+        if not evicted:
+            return
+        self.evicted_messages += len(evicted)
+        self._compact()
+        if self.summarizer is not None:
+            self._set_summary(self.summarizer(evicted, self._summary))
+
+    def _next_turn(self, i: int) -> int:
+        """Index of the first user message after position i (never past the current turn)."""
+        i += 1
+        while i < self._last_turn and self._window[i].role != "user":
+            i += 1
+        return i
+
+    def _compact(self):
+        # Drop evicted slots once they make up half the list; amortized O(1).
+        # Rebinding (not del) leaves the list that existing views index untouched.
+        if self._start and self._start * 2 >= len(self._window):
+            self._window = self._window[self._start:]
+            self._window_costs = self._window_costs[self._start:]
+            self._last_turn -= self._start
+            self._start = 0
+
+    def _set_summary(self, text):
+        self._summary = (text or "").strip()
+        if self._summary:
+            self._summary_msg = Message(role="system", content=SUMMARY_PREFIX + self._summary)
+            self._summary_tokens = self.count_tokens(self._summary_msg.content)
+        else:
+            self._summary_msg = None
+            self._summary_tokens = 0
+
+    def stats(self) -> dict:
+        return {
+            "messages": len(self.get_history()),
+            "pinned": len(self._pinned),
+            "window": len(self._window) - self._start,
+            "evicted": self.evicted_messages,
+            "tokens": self.total_tokens,
+            "max_tokens": self.max_tokens,
+        }